@@ -0,0 +1,314 @@
+"""적응형 검사(CAT) - 2PL 문항 모수 추정, 문항 정보 표, 다음 문항 선택
+
+    python adaptive.py --credentials firebase_key.json --out item_params.json   # 저장된 결과로 모수 추정
+    python adaptive.py --input results.jsonl --out item_params.json            # export.py 결과 (jsonl/csv)
+
+- 모수 추정: 2PL (P = 1 / (1 + exp(-a(θ - b)))), 응시자 능력과 문항 모수를 번갈아 갱신하는
+  결합 MAP 추정 (θ ~ N(0, 1), b ~ N(0, 2²), log a ~ N(0, 0.5²)). 응시자마다 다른 시험지를
+  받으므로 출제된 문항만으로 계산한다. 응답이 `MIN_RESPONSES`건 미만인 문항은 배점으로 정한
+  임시 값을 쓴다.
+- 정보 표: 능력 격자(-4 ~ 4, 161점)마다 문항별 정답 확률의 로그 값과, 영역별로 정보량이 큰
+  순서의 문항 목록을 미리 만들어 둔다. 한 단계에서 하는 일은 격자 크기만큼의 사후 분포 갱신과
+  정렬된 목록 앞쪽 몇 개 확인뿐이므로 문제 은행 크기와 무관하다.
+- 선택: 영역별 목표 비율(고정 시험지의 문법/어휘/읽기 비율)에서 가장 모자란 영역을 고르고,
+  현재 능력 추정치 격자에서 정보량 상위 `randomesque`개 중 하나를 무작위로 낸다. 노출률이
+  `exposure_max`를 넘은 문항은 건너뛴다.
+- 종료: 표준오차가 `target_se` 이하가 되거나 `max_items`개를 냈을 때.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+
+import numpy as np
+
+# --- [설정] 적응형 검사 ---
+THETA_GRID = np.linspace(-4.0, 4.0, 161)
+CONTENT_TARGETS = {"문법": 5 / 39, "어휘": 5 / 39, "읽기": 29 / 39}  # 고정 시험지(BLUEPRINT) 비율
+AREA_OF_TYPE = {"문법": "문법", "어휘": "어휘", "읽기": "읽기", "문맥": "읽기"}
+MIN_RESPONSES = 30
+PRIOR_B_BY_SCORE = {2: 0.0, 3: 0.8}  # 모수 추정 전 임시 난이도 (배점이 높을수록 어렵게)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+# --- 모수 추정 ---
+def calibrate_2pl(correct, presented, max_iter=200, tol=1e-4):
+    """(응시자 x 문항) 정오 / 출제 여부 행렬로 2PL 모수 추정
+
+    반환: (a, b, 문항별 응답 수, 응시자 θ)
+    """
+    mask = presented.astype(np.float64)
+    y = correct.astype(np.float64) * mask
+    n_item = mask.sum(axis=0)
+    n_person = mask.sum(axis=1)
+
+    p_item = (y.sum(axis=0) + 0.5) / (n_item + 1.0)
+    b = -np.log(p_item / (1 - p_item))
+    a = np.ones(mask.shape[1])
+    p_person = (y.sum(axis=1) + 0.5) / (n_person + 1.0)
+    theta = np.log(p_person / (1 - p_person))
+    theta = (theta - theta.mean()) / (theta.std() or 1.0)
+
+    for _ in range(max_iter):
+        # 응시자 능력 (문항 모수 고정)
+        p = _sigmoid(a * (theta[:, None] - b))
+        r = (y - p) * mask
+        w = p * (1 - p) * mask
+        step = ((r * a).sum(axis=1) - theta) / ((w * a * a).sum(axis=1) + 1.0)
+        theta = np.clip(theta + step, -4.0, 4.0)
+
+        # 문항 난이도 / 변별도 (능력 고정)
+        p = _sigmoid(a * (theta[:, None] - b))
+        r = (y - p) * mask
+        w = p * (1 - p) * mask
+        step_b = (-a * r.sum(axis=0) - b / 4.0) / (a * a * w.sum(axis=0) + 0.25)
+        b = np.clip(b + step_b, -5.0, 5.0)
+
+        p = _sigmoid(a * (theta[:, None] - b))
+        r = (y - p) * mask
+        w = p * (1 - p) * mask
+        d = theta[:, None] - b
+        log_a = np.log(a)
+        step_a = (a * (r * d).sum(axis=0) - log_a / 0.25) / (a * a * (w * d * d).sum(axis=0) + 4.0)
+        a = np.exp(np.clip(log_a + step_a, math.log(0.2), math.log(4.0)))
+
+        # 척도 고정: 응시자 능력 평균 0, 표준편차 1
+        mean, sd = theta.mean(), theta.std() or 1.0
+        theta = (theta - mean) / sd
+        b = (b - mean) / sd
+        a = a * sd
+
+        if max(np.abs(step).max(initial=0), np.abs(step_b).max(initial=0), np.abs(step_a).max(initial=0)) < tol:
+            break
+    return a, b, n_item.astype(int), theta
+
+
+class ItemParams:
+    """문항 모수 (문항 ID 순서대로 a, b, 영역, 응답 수)"""
+
+    def __init__(self, ids, a, b, areas, n=None):
+        self.ids = tuple(ids)
+        self.a = np.asarray(a, dtype=np.float64)
+        self.b = np.asarray(b, dtype=np.float64)
+        self.areas = tuple(areas)
+        self.n = np.zeros(len(self.ids), dtype=int) if n is None else np.asarray(n, dtype=int)
+        self.index = {qid: i for i, qid in enumerate(self.ids)}
+
+    @classmethod
+    def from_prior(cls, question_bank):
+        """응답 자료 없이 배점으로 정한 임시 모수 (a = 1)"""
+        questions = _objective_questions(question_bank)
+        return cls([q['id'] for q in questions], [1.0] * len(questions),
+                   [PRIOR_B_BY_SCORE.get(q['score'], 0.0) for q in questions],
+                   [AREA_OF_TYPE[q['type']] for q in questions])
+
+    @classmethod
+    def calibrate(cls, question_bank, key, matrix, presented):
+        """선택 행렬(item_analysis.build_matrix)로 추정 (응답이 적은 문항은 임시 모수)"""
+        correct = (matrix == key.answers[np.newaxis, :]) & presented
+        a, b, n, _ = calibrate_2pl(correct, presented)
+        prior = cls.from_prior(question_bank)
+        column = key.column
+        est_a = prior.a.copy()
+        est_b = prior.b.copy()
+        counts = np.zeros(len(prior.ids), dtype=int)
+        for i, qid in enumerate(prior.ids):
+            j = column[qid]
+            counts[i] = n[j]
+            if n[j] >= MIN_RESPONSES:
+                est_a[i], est_b[i] = a[j], b[j]
+        return cls(prior.ids, est_a, est_b, prior.areas, counts)
+
+    @classmethod
+    def from_file(cls, path, question_bank):
+        """저장된 모수 (문제 은행에 없는 문항은 버리고, 새 문항은 임시 모수)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = {item["id"]: item for item in json.load(f)["items"]}
+        prior = cls.from_prior(question_bank)
+        a, b, n = prior.a.copy(), prior.b.copy(), prior.n.copy()
+        for i, qid in enumerate(prior.ids):
+            if qid in saved:
+                a[i], b[i], n[i] = saved[qid]["a"], saved[qid]["b"], saved[qid].get("n", 0)
+        return cls(prior.ids, a, b, prior.areas, n)
+
+    def save(self, path):
+        items = [{"id": qid, "a": round(float(a), 4), "b": round(float(b), 4), "n": int(n), "area": area}
+                 for qid, a, b, n, area in zip(self.ids, self.a, self.b, self.n, self.areas)]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"model": "2PL", "items": items}, f, ensure_ascii=False, indent=1)
+
+
+def _objective_questions(question_bank):
+    return [q for q in question_bank.by_id.values() if q.get('type') in AREA_OF_TYPE]
+
+
+# --- 정보 표 / 선택 ---
+class InformationTable:
+    """능력 격자별 정답 확률(로그)과 영역별 정보량 순위 (시작 시 1회 계산)"""
+
+    def __init__(self, params, grid=THETA_GRID):
+        self.params = params
+        self.grid = grid
+        p = _sigmoid(params.a[None, :] * (grid[:, None] - params.b[None, :]))
+        p = np.clip(p, 1e-9, 1 - 1e-9)
+        self.log_p = np.log(p)
+        self.log_q = np.log1p(-p)
+        info = params.a[None, :] ** 2 * p * (1 - p)
+        self.area_items = {}
+        self.ranked = {}
+        for area in CONTENT_TARGETS:
+            items = np.array([i for i, item_area in enumerate(params.areas) if item_area == area], dtype=np.int32)
+            self.area_items[area] = items
+            order = np.argsort(-info[:, items], axis=1, kind='stable') if len(items) else np.zeros((len(grid), 0), int)
+            self.ranked[area] = items[order] if len(items) else order
+        self.log_prior = -0.5 * grid ** 2
+
+    def grid_index(self, theta):
+        step = self.grid[1] - self.grid[0]
+        return int(min(max(round((theta - self.grid[0]) / step), 0), len(self.grid) - 1))
+
+
+class CatState:
+    """응시자 1명의 진행 상태 (낸 문항, 응답, 능력 사후 분포)"""
+
+    def __init__(self, table):
+        self.log_post = table.log_prior.copy()
+        self.items = []  # 문항 번호 (ItemParams 순서)
+        self.responses = []
+        self.area_counts = {area: 0 for area in CONTENT_TARGETS}
+        self.used = set()
+        self.theta = 0.0
+        self.se = 1.0
+        self.finished = False
+
+
+class CatEngine:
+    """적응형 검사 진행 (프로세스 전역, 노출 횟수는 모든 세션이 공유)"""
+
+    def __init__(self, table, target_se=0.3, min_items=10, max_items=39, exposure_max=0.25,
+                 randomesque=3, content_targets=None):
+        self.table = table
+        self.params = table.params
+        self.target_se = target_se
+        self.min_items = min_items
+        self.max_items = max_items
+        self.exposure_max = exposure_max
+        self.randomesque = randomesque
+        self.content_targets = content_targets or CONTENT_TARGETS
+        self._exposures = np.zeros(len(self.params.ids), dtype=np.int64)
+        self._sessions = 0
+        self._lock = threading.Lock()
+
+    # --- 세션 ---
+    def start(self):
+        with self._lock:
+            self._sessions += 1
+        return CatState(self.table)
+
+    def replay(self, question_ids, correct):
+        """저장된 문항 / 정오로 상태 복원 (이어서 응시, 노출 횟수는 다시 세지 않음)"""
+        state = CatState(self.table)
+        for qid, is_correct in zip(question_ids, correct):
+            i = self.params.index[qid]
+            state.items.append(i)
+            state.used.add(i)
+            state.area_counts[self.params.areas[i]] += 1
+            if is_correct is not None:
+                self.record(state, qid, is_correct)
+        return state
+
+    def next_item(self, state, rng=random):
+        """다음 문항 ID (종료 조건을 만족하면 None)"""
+        if state.finished or self._should_stop(state):
+            state.finished = True
+            return None
+        g = self.table.grid_index(state.theta)
+        n = len(state.items) + 1
+        areas = sorted(self.content_targets,
+                       key=lambda area: state.area_counts[area] - self.content_targets[area] * n)
+        for area in areas:
+            candidates = self._candidates(state, self.table.ranked[area][g])
+            if candidates:
+                i = rng.choice(candidates)
+                state.items.append(i)
+                state.used.add(i)
+                state.area_counts[area] += 1
+                with self._lock:
+                    self._exposures[i] += 1
+                return self.params.ids[i]
+        state.finished = True
+        return None
+
+    def _candidates(self, state, ranked):
+        """정보량 순위에서 아직 내지 않았고 노출률이 넘지 않은 상위 randomesque개"""
+        limit = self.exposure_max * max(self._sessions, 1)
+        check_exposure = self._sessions >= 1 / self.exposure_max
+        picked, fallback = [], []
+        for i in ranked:
+            if i in state.used:
+                continue
+            if check_exposure and self._exposures[i] >= limit:
+                if len(fallback) < self.randomesque:
+                    fallback.append(int(i))
+                continue
+            picked.append(int(i))
+            if len(picked) == self.randomesque:
+                break
+        return picked or fallback
+
+    def record(self, state, qid, is_correct):
+        """응답 반영: 사후 분포 갱신 후 EAP 추정치와 표준오차 계산 (격자 크기만큼)"""
+        i = self.params.index[qid]
+        state.log_post += self.table.log_p[:, i] if is_correct else self.table.log_q[:, i]
+        state.responses.append(bool(is_correct))
+        post = np.exp(state.log_post - state.log_post.max())
+        post /= post.sum()
+        grid = self.table.grid
+        state.theta = float(post @ grid)
+        state.se = float(math.sqrt(max(post @ (grid - state.theta) ** 2, 0.0)))
+
+    def _should_stop(self, state):
+        answered = len(state.responses)
+        if answered >= self.max_items:
+            return True
+        return answered >= self.min_items and state.se <= self.target_se
+
+    def exposure_rates(self):
+        with self._lock:
+            return self._exposures / max(self._sessions, 1)
+
+
+def main():
+    from item_analysis import build_matrix, iter_records_from_file, iter_records_from_firestore
+    from question_bank import QuestionBank
+    from scoring import AnswerKey
+
+    parser = argparse.ArgumentParser(description="2PL 문항 모수 추정 (적응형 검사용)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--credentials', help="Firebase 서비스 계정 키(JSON) 경로")
+    source.add_argument('--input', help="export.py로 내보낸 결과 파일 (.jsonl / .csv)")
+    parser.add_argument('--problems', default='problems.json')
+    parser.add_argument('--out', default='item_params.json')
+    args = parser.parse_args()
+
+    bank = QuestionBank.from_file(args.problems)
+    key = AnswerKey(bank)
+    if args.input:
+        records = iter_records_from_file(args.input)
+    else:
+        from export import init_firestore
+        records = iter_records_from_firestore(init_firestore(args.credentials))
+    matrix, presented = build_matrix(key, records)
+    params = ItemParams.calibrate(bank, key, matrix, presented)
+    params.save(args.out)
+    calibrated = int((params.n >= MIN_RESPONSES).sum())
+    print(f"응시자 {matrix.shape[0]}명, 문항 {len(params.ids)}개 중 {calibrated}개 추정 "
+          f"(나머지는 임시 모수) -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
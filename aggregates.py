@@ -0,0 +1,249 @@
+"""결과 집계 문서 (결과를 기록할 때마다 증분 갱신, 관리자 대시보드용)
+
+결과 문서를 훑지 않고도 응시 현황을 볼 수 있도록, 결과를 기록하는 batch에 집계 변경분을
+`firestore.Increment`로 함께 기록한다. 같은 문서에 쓰기가 몰리지 않도록 집계는
+`SHARD_COUNT`개 문서에 나누어 쌓고, 조회할 때 합친다 (결과 수와 무관하게 읽기 `SHARD_COUNT`회).
+변경분은 저장된 문서를 트랜잭션 안에서 읽어 계산하므로, 같은 기록이 두 번 반영되어도
+(재시도, 복구, 재채점) 집계는 한 번만 바뀐다.
+
+    python aggregates.py --credentials firebase_key.json --rebuild   # 기존 결과로 집계 다시 만들기
+"""
+import argparse
+import random
+
+from firestore_ops import increment, run_transaction, server_timestamp
+
+# --- [설정] 집계 문서 ---
+STATS_COLLECTION = 'result_stats'
+SHARD_COUNT = 10
+SCORE_BIN = 10  # 총점 구간 폭 (점)
+DURATION_BIN_MIN = 5  # 응시 시간 구간 폭 (분)
+DURATION_BINS = 10  # 마지막 구간은 그 이상 전부
+SECTION_FIELDS = {
+    "문법": "score_grammar",
+    "어휘": "score_vocab",
+    "읽기": "score_reading",
+    "쓰기": "score_writing",
+}
+WRITING_STATUSES = ('pending', 'done', 'failed')
+
+
+def _shard_id(shard):
+    return f"shard_{shard:02d}"
+
+
+def _number(value):
+    """문서 필드의 수 (export CSV에서 읽은 문자열 / 빈 값은 변환, 없으면 0)"""
+    if isinstance(value, str):
+        try:
+            value = float(value) if value.strip() else 0
+        except ValueError:
+            return 0
+        return int(value) if value.is_integer() else value
+    return value or 0
+
+
+def score_bin(score, max_score=100):
+    top = (max(max_score, SCORE_BIN) - 1) // SCORE_BIN * SCORE_BIN
+    return f"{min(max(int(score or 0), 0) // SCORE_BIN * SCORE_BIN, top):03d}"
+
+
+def duration_bin(duration_sec):
+    minutes = max(int(duration_sec or 0), 0) // 60
+    return f"{min(minutes // DURATION_BIN_MIN, DURATION_BINS - 1) * DURATION_BIN_MIN:02d}"
+
+
+def result_delta(doc):
+    """결과 문서 1건이 집계에 더하는 값 ({필드: 수}, 중첩 map은 'a.b' 키)"""
+    total_score = _number(doc.get("total_score"))
+    duration_sec = _number(doc.get("duration_sec"))
+    delta = {
+        "completed": 1,
+        "total_score_sum": total_score,
+        "duration_sum": duration_sec,
+        f"score_hist.{score_bin(total_score, _number(doc.get('max_score')) or 100)}": 1,
+        f"duration_hist.{duration_bin(duration_sec)}": 1,
+        f"writing.{doc.get('writing_status') or 'done'}": 1,
+    }
+    for field in SECTION_FIELDS.values():
+        delta[f"section_sum.{field}"] = _number(doc.get(field))
+    return delta
+
+
+def change_delta(before, after):
+    """결과 문서가 before -> after로 바뀔 때의 집계 변경분 (0인 항목 제외)"""
+    delta = result_delta(after)
+    for key, value in result_delta(before).items():
+        delta[key] = delta.get(key, 0) - value
+    return {key: value for key, value in delta.items() if value}
+
+
+def merge_delta(total, delta):
+    for key, value in delta.items():
+        total[key] = total.get(key, 0) + value
+    return total
+
+
+def add_to_batch(batch, db, delta, shard=None):
+    """집계 변경분을 임의의 shard 문서에 증분 기록하도록 batch에 추가 (쓰기 1건)"""
+    if not delta:
+        return
+    fields = {}
+    for key, value in delta.items():
+        target = fields
+        parts = key.split('.')
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = increment(value)
+    shard = random.randrange(SHARD_COUNT) if shard is None else shard
+    batch.set(db.collection(STATS_COLLECTION).document(_shard_id(shard)), fields, merge=True)
+
+
+def with_total(before, update):
+    """영역 점수 변경에 맞춘 total_score를 채운 변경 필드 (total_score를 주었으면 그대로)"""
+    changed = [field for field in SECTION_FIELDS.values() if field in update]
+    if "total_score" in update or not changed:
+        return update
+    total_score = _number(before.get("total_score")) + sum(
+        _number(update[field]) - _number(before.get(field)) for field in changed)
+    return dict(update, total_score=total_score)
+
+
+def update_results(db, updates, written=None):
+    """결과 문서들을 갱신하고, 저장된 문서 기준 집계 변경분을 같은 트랜잭션에 기록
+
+    결과 문서를 바꾸는 쓰기(쓰기 채점 반영, 재채점)는 모두 이 함수를 거친다. `updated_at`을
+    서버 시각으로 올려 증분 내보내기가 바뀐 결과를 다시 내보내게 한다.
+    영역 점수만 바꾸고 total_score를 주지 않으면, 총점은 트랜잭션 안에서 읽은 문서의 총점에
+    영역 점수 변화만큼 더해 정한다 (다른 쓰기가 먼저 바꾼 영역 점수를 되돌리지 않음).
+    updates: {결과 문서 ID: 변경 필드}
+    written: dict를 주면 {결과 문서 ID: 실제로 기록한 변경 필드(계산한 total_score 포함)}를 채움
+    반환: 문서가 없어 갱신하지 않은 ID 목록
+    """
+    from result_store import RESULTS_COLLECTION
+    references = [db.collection(RESULTS_COLLECTION).document(doc_id) for doc_id in updates]
+
+    def apply(transaction):
+        delta, missing, applied = {}, [], {}
+        for snapshot in db.get_all(references, transaction=transaction):
+            if not snapshot.exists:
+                missing.append(snapshot.id)
+                continue
+            before = snapshot.to_dict()
+            update = applied[snapshot.id] = with_total(before, updates[snapshot.id])
+            transaction.update(snapshot.reference, dict(update, updated_at=server_timestamp()))
+            merge_delta(delta, change_delta(before, dict(before, **update)))
+        add_to_batch(transaction, db, delta)
+        return missing, applied
+
+    missing, applied = run_transaction(db, apply)
+    if written is not None:
+        written.update(applied)
+    return missing
+
+
+def read_stats(db):
+    """shard 문서를 합친 집계 (읽기 SHARD_COUNT회)"""
+    total = {}
+    for shard in range(SHARD_COUNT):
+        doc = db.collection(STATS_COLLECTION).document(_shard_id(shard)).get()
+        if doc.exists:
+            _sum_into(total, doc.to_dict())
+    return summarize(total)
+
+
+def _sum_into(total, data):
+    for key, value in data.items():
+        if isinstance(value, dict):
+            _sum_into(total.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)):
+            total[key] = total.get(key, 0) + value
+
+
+def summarize(total):
+    """합친 집계를 대시보드 값으로 정리 (평균, 구간별 분포)"""
+    completed = total.get("completed", 0)
+    section_sum = total.get("section_sum", {})
+    writing = total.get("writing", {})
+    return {
+        "completed": completed,
+        "avg_total": total.get("total_score_sum", 0) / completed if completed else 0.0,
+        "avg_duration_min": total.get("duration_sum", 0) / completed / 60 if completed else 0.0,
+        "section_avg": {
+            label: section_sum.get(field, 0) / completed if completed else 0.0
+            for label, field in SECTION_FIELDS.items()
+        },
+        # 쓰기 평균은 채점이 끝난 답안 기준
+        "writing_avg": section_sum.get("score_writing", 0) / writing.get("done", 0) if writing.get("done") else 0.0,
+        "writing": {status: writing.get(status, 0) for status in WRITING_STATUSES},
+        "score_hist": dict(sorted(total.get("score_hist", {}).items())),
+        "duration_hist": dict(sorted(total.get("duration_hist", {}).items())),
+    }
+
+
+def draw_charts(stats):
+    """대시보드 그림 (총점 분포, 응시 시간 분포, 영역별 평균) matplotlib Figure 목록
+
+    pyplot 전역 상태를 쓰지 않으므로 여러 세션이 동시에 그려도 안전하고 닫을 필요가 없다.
+    """
+    from matplotlib.figure import Figure
+
+    figures = []
+    for title, hist, bin_width, xlabel in [
+        ("Total score", stats["score_hist"], SCORE_BIN, "score"),
+        ("Duration", stats["duration_hist"], DURATION_BIN_MIN, "minutes"),
+    ]:
+        fig = Figure(figsize=(5, 2.6))
+        ax = fig.subplots()
+        ax.bar([int(k) for k in hist], list(hist.values()), width=bin_width * 0.9, align='edge', color='#4C78A8')
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel("students")
+        fig.tight_layout()
+        figures.append(fig)
+
+    fig = Figure(figsize=(5, 2.6))
+    ax = fig.subplots()
+    labels = ["grammar", "vocab", "reading", "writing"]
+    values = list(stats["section_avg"].values())
+    values[-1] = stats["writing_avg"]
+    ax.bar(labels, values, color='#F58518')
+    ax.set_title("Average score by section")
+    fig.tight_layout()
+    figures.append(fig)
+    return figures
+
+
+def rebuild(db):
+    """기존 결과 문서 전체로 집계를 다시 만듦 (shard 문서를 덮어씀, 결과 수에 비례)"""
+    from export import iter_result_docs
+    delta = {}
+    count = 0
+    for doc in iter_result_docs(db):
+        merge_delta(delta, result_delta(doc.to_dict()))
+        count += 1
+    batch = db.batch()
+    for shard in range(SHARD_COUNT):
+        batch.set(db.collection(STATS_COLLECTION).document(_shard_id(shard)), {})
+    add_to_batch(batch, db, delta, shard=0)
+    batch.commit()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="결과 집계 문서 조회 / 재생성")
+    parser.add_argument('--credentials', required=True, help="Firebase 서비스 계정 키 파일")
+    parser.add_argument('--rebuild', action='store_true', help="기존 결과로 집계 다시 만들기")
+    args = parser.parse_args()
+
+    from export import init_firestore
+    db = init_firestore(args.credentials)
+    if args.rebuild:
+        print(f"결과 {rebuild(db)}건으로 집계를 다시 만들었습니다.")
+    stats = read_stats(db)
+    print(f"완료 {stats['completed']}명, 평균 총점 {stats['avg_total']:.1f}, "
+          f"평균 응시 시간 {stats['avg_duration_min']:.1f}분, 쓰기 {stats['writing']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,31 @@
 import streamlit as st
-import firebase_admin
-from firebase_admin import credentials, firestore
-import google.generativeai as genai
-import pandas as pd
 import random
 import time
-import hashlib
-import json
+import datetime
 import os
-import math
+import tempfile
+
+import aggregates
+from adaptive import CatEngine, InformationTable, ItemParams
+from export import EXPORT_FORMATS, export_results, set_last_export_time
+from grading import DEFAULT_WRITING_QUESTION, WRITING_MAX_SCORE, default_writing_analysis, make_grader
+from grading_cache import CachedGrader, GradingCache
+from autosave import AutosaveBuffer, STATUS_IN_PROGRESS
+from bank_snapshots import BankRegistry, UnknownBankVersion
+from deadlines import DeadlineRegistry
+from exam_codes import CodeAllocator, lookup_result
+from grading_queue import GradingQueue, STATUS_DONE, STATUS_FAILED, new_job
+from item_details import pack_details
+from memory_store import MemoryFirestore
+import metrics
+from result_store import ResultStore, submission_id
+from system_status import SystemStatusCache
+import question_view
 
 # --- [설정] 시험 제한 시간 (50분) ---
 TEST_DURATION_SEC = 50 * 60 
+KST = datetime.timezone(datetime.timedelta(hours=9))
+EXPORT_MIME_TYPES = {"csv": "text/csv", "jsonl": "application/jsonl", "parquet": "application/vnd.apache.parquet"}
 
 # --- [데이터] 한국 대학교 리스트 ---
 KOREAN_UNIVERSITIES = sorted([
@@ -80,81 +94,280 @@ hide_streamlit_style = """
 st.set_page_config(page_title="한국어 간이 레벨 테스트", layout="wide")
 st.markdown(hide_streamlit_style, unsafe_allow_html=True)
 
-# (1) Gemini 설정
-try:
-    genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-except Exception as e:
-    st.error(f"Gemini API 설정 오류: {e}")
-
-# (2) Firebase 설정
-if not firebase_admin._apps:
+def get_setting(key, default=None):
+    """secrets 값 조회 (secrets 파일이 없으면 기본값)"""
     try:
+        return st.secrets.get(key, default)
+    except Exception:
+        return default
+
+# 외부 서비스 클라이언트는 처음 필요할 때 만든다 (Firestore: 첫 DB 조회, Gemini: 첫 쓰기 채점)
+
+# (1) Firebase 설정 (DB_BACKEND = "memory" 이면 메모리 DB 사용, 에뮬레이터는 FIRESTORE_EMULATOR_HOST)
+@st.cache_resource
+def _connect_db():
+    """프로세스 전역 DB 클라이언트"""
+    if get_setting("DB_BACKEND", "firestore") == "memory":
+        return MemoryFirestore()
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    if not firebase_admin._apps:
         key_dict = dict(st.secrets["FIREBASE_KEY"])
         if "private_key" in key_dict:
             key_dict["private_key"] = key_dict["private_key"].replace("\\n", "\n")
-        cred = credentials.Certificate(key_dict)
-        firebase_admin.initialize_app(cred)
+        firebase_admin.initialize_app(credentials.Certificate(key_dict))
+    return firestore.client()
+
+def get_db():
+    """DB 클라이언트 (연결할 수 없으면 오류를 표시하고 중단)"""
+    try:
+        return _connect_db()
     except Exception as e:
         st.error(f"🔥 데이터베이스 연결 오류: {e}")
         st.stop()
 
+# --- 2. 유틸리티 함수 ---
+@st.cache_resource
+def get_code_allocator():
+    """수험번호 발급기 (대학교 접두어별 카운터에서 번호를 CODE_BLOCK_SIZE개씩 예약, 프로세스당 1개)"""
+    return CodeAllocator(get_db(), block_size=int(get_setting("CODE_BLOCK_SIZE", 10)))
+
+# --- [문제 은행] 파일이 바뀌면 백그라운드에서 새 버전을 만들고, 세션은 시작한 버전을 계속 사용 ---
+@st.cache_resource
+def get_bank_registry():
+    """문제 은행 버전 관리 (problems.json / 문항 이미지 변경 감시, 버전 원본은 DB에 공유 보관, 프로세스당 1개)"""
+    registry = BankRegistry(
+        get_db(),
+        poll_sec=float(get_setting("BANK_POLL_SEC", 2.0)),
+        image_cache_bytes=int(get_setting("IMAGE_CACHE_BYTES", 16 * 1024 * 1024)),
+    )
+    registry.start()
+    return registry
+
+def session_bank():
+    """이 세션의 문제 은행 스냅샷 (처음 접속할 때의 버전에 고정)"""
+    registry = get_bank_registry()
+    if st.session_state.get('bank_version') is None:
+        st.session_state.bank_version = registry.current().version
+    return registry.get(st.session_state.bank_version)
+
+# --- [적응형 검사] TEST_MODE = "adaptive" 이면 능력 추정치에 맞춰 문항을 하나씩 출제 ---
+ADAPTIVE = get_setting("TEST_MODE", "fixed") == "adaptive"
+
+@st.cache_resource
+def load_cat_engine(bank_version):
+    """문항 모수(ITEM_PARAMS_PATH, 없으면 배점으로 정한 임시 값)와 정보 표 (문제 은행 버전당 1회)"""
+    bank = get_bank_registry().get(bank_version).bank
+    path = get_setting("ITEM_PARAMS_PATH", "item_params.json")
+    if os.path.exists(path):
+        params = ItemParams.from_file(path, bank)
+    else:
+        print(f"문항 모수 파일 없음 ({path}): 임시 모수로 적응형 검사 진행")
+        params = ItemParams.from_prior(bank)
+    return CatEngine(
+        InformationTable(params),
+        target_se=float(get_setting("CAT_TARGET_SE", 0.3)),
+        min_items=int(get_setting("CAT_MIN_ITEMS", 10)),
+        max_items=int(get_setting("CAT_MAX_ITEMS", 39)),
+    )
+
+# 이번 실행(세션)에서 쓰는 문제 은행 (fragment도 등록된 실행의 값을 그대로 사용)
 try:
-    db = firestore.client()
-except Exception as e:
-    st.error("🔥 Firebase 클라이언트를 생성할 수 없습니다.")
+    SNAPSHOT = session_bank()
+    QUESTION_BANK = SNAPSHOT.bank
+    ANSWER_KEY = SNAPSHOT.key
+    ASSETS = SNAPSHOT.assets
+except UnknownBankVersion as e:
+    # 다른 버전의 문제 은행으로 대신하면 출제 문항과 채점 기준이 섞이므로 진행하지 않음
+    st.error(f"시험을 시작한 문제 은행을 찾을 수 없습니다. 관리자에게 문의해주세요. ({e})")
     st.stop()
+except Exception as e:
+    st.error(f"문제 로드 오류: {e}")
+    SNAPSHOT = None
+    QUESTION_BANK = None
+    ANSWER_KEY = None
+    ASSETS = None
+
+# --- [시스템 상태 관리] Firestore를 이용한 전역 설정 (프로세스 전역 캐시) ---
+@st.cache_resource
+def get_status_cache():
+    """시스템 상태 캐시 (TTL + 스냅샷 리스너)"""
+    status_cache = SystemStatusCache(get_db(), ttl_sec=float(get_setting("STATUS_CACHE_TTL_SEC", 5.0)))
+    status_cache.start_listener()
+    return status_cache
 
-# --- 2. 유틸리티 함수 ---
-def make_code(univ_name, name):
-    univ_hash = hashlib.sha256(univ_name.encode()).hexdigest()[:2].upper()
-    rand_num = random.randint(100, 999)
-    return f"{univ_hash}대{rand_num}"
-
-@st.cache_data
-def load_all_problems():
-    try:
-        with open('problems.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        all_problems = []
-        for key in ['SET_A', 'SET_B', 'SET_C', 'SET_D', 'SET_E']:
-            if key in data:
-                all_problems.extend(data[key])
-        return all_problems
-    except Exception as e:
-        st.error(f"문제 로드 오류: {e}")
-        return []
-
-ALL_QUESTIONS_POOL = load_all_problems()
-
-# --- [시스템 상태 관리] Firestore를 이용한 전역 설정 ---
 def get_system_status():
-    """시험 활성화 여부를 DB에서 가져옴"""
-    try:
-        doc_ref = db.collection('config').document('settings')
-        doc = doc_ref.get()
-        if doc.exists:
-            return doc.to_dict().get('is_active', True)
-        else:
-            doc_ref.set({'is_active': True})
-            return True
-    except Exception as e:
-        # 오류 시 기본값 True (접속 허용)
-        return True
+    """시험 활성화 여부 (캐시에서 조회, 만료 시에만 DB 조회)"""
+    return get_status_cache().get()
 
 def update_system_status(status):
     """시험 활성화 여부를 DB에 저장"""
     try:
-        db.collection('config').document('settings').set({'is_active': status}, merge=True)
+        get_status_cache().set(status)
     except Exception as e:
         st.error(f"설정 저장 오류: {e}")
 
+# --- [쓰기 채점 캐시] 같은 답안은 모델을 다시 부르지 않음 ---
+@st.cache_resource
+def get_grading_cache():
+    """쓰기 채점 결과 캐시 (GRADING_CACHE_PATH를 주면 SQLite 파일에도 저장)"""
+    return GradingCache(
+        max_entries=int(get_setting("GRADING_CACHE_SIZE", 1024)),
+        path=get_setting("GRADING_CACHE_PATH"),
+    )
+
+# --- [쓰기 채점기] 첫 채점 때 생성 (Gemini 라이브러리 import / 설정도 이때) ---
+@st.cache_resource
+def get_grader():
+    """쓰기 채점기 (GRADER_BACKEND = "fake" 이면 로컬 가짜 채점기)"""
+    backend = get_setting("GRADER_BACKEND", "gemini")
+    if backend == "gemini":
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
+        except Exception as e:
+            print(f"Gemini API 설정 오류: {e}")
+    return CachedGrader(make_grader(backend), get_grading_cache())
+
+# --- [쓰기 채점 큐] 프로세스 전역 워커 풀 ---
+@st.cache_resource
+def get_grading_queue():
+    """쓰기 채점 작업 큐 (프로세스당 1개)"""
+    grading_queue = GradingQueue(
+        get_db(), get_grader(),
+        max_workers=int(get_setting("GRADING_WORKERS", 4)),
+        max_attempts=int(get_setting("GRADING_MAX_ATTEMPTS", 5)),
+    )
+    grading_queue.start()
+    # 결과 문서가 Firestore에 기록된 뒤에 채점을 시작 (hold 된 작업)
+    get_result_store().add_commit_listener(grading_queue.release)
+    metrics.gauge("grading_in_flight", grading_queue.in_flight)
+    return grading_queue
+
+# --- [시험 마감] 서버 기준 마감 시각 ---
+@st.cache_resource
+def get_deadline_registry():
+    """수험번호별 마감 시각 (프로세스당 1개)"""
+    registry = DeadlineRegistry()
+    metrics.gauge("active_sessions", registry.__len__)
+    return registry
+
+# --- [답안 자동 저장] 응시 중 답안 변경분을 모아 주기적으로 기록 ---
+@st.cache_resource
+def get_autosave():
+    """답안 자동 저장 버퍼 (프로세스당 1개)"""
+    autosave = AutosaveBuffer(get_db(), interval_sec=float(get_setting("AUTOSAVE_INTERVAL_SEC", 20.0)))
+    autosave.start()
+    metrics.gauge("autosave_pending", autosave.pending)
+    return autosave
+
+def resume_session(code, name):
+    """저장된 응시 기록으로 세션 복원 (성공하면 True)"""
+    data = get_autosave().load(code)
+    if not data or data.get('status') != STATUS_IN_PROGRESS:
+        return False
+    if (data.get('user_info') or {}).get('name') != name:
+        return False
+    try:
+        get_bank_registry().get(data.get('bank_version'))  # 시작한 문제 은행 버전으로 계속
+    except UnknownBankVersion as e:
+        st.error(f"시험을 시작한 문제 은행을 찾을 수 없어 이어서 응시할 수 없습니다. 관리자에게 문의해주세요. ({e})")
+        st.stop()
+    st.session_state.user_info = data['user_info']
+    st.session_state.bank_version = data.get('bank_version')
+    st.session_state.question_ids = tuple(data['question_ids'])
+    st.session_state.answers = dict(data.get('answers') or {})
+    st.session_state.answers['writing'] = data.get('writing', '')
+    st.session_state.answer_times = dict(data.get('answer_times') or {})
+    st.session_state.start_time = data['start_time']
+    # 마감 시각은 처음 시작한 시각 기준 (이미 지났으면 시험 화면에서 바로 자동 제출)
+    get_deadline_registry().start(code, TEST_DURATION_SEC, now=data['start_time'])
+    st.session_state.page = 'test'
+    return True
+
+# --- [결과 저장] 로컬 WAL + 백그라운드 일괄 기록 ---
+@st.cache_resource
+def get_result_store():
+    """결과 저장소 (프로세스당 1개, 시작 시 미기록 결과 복구)"""
+    result_store = ResultStore(
+        get_db(),
+        wal_dir=get_setting("RESULT_WAL_DIR", ".wal"),
+        batch_size=int(get_setting("RESULT_BATCH_SIZE", 100)),
+        flush_interval_sec=float(get_setting("RESULT_FLUSH_INTERVAL_SEC", 1.0)),
+    )
+    result_store.start()
+    metrics.gauge("results_pending", result_store.pending)
+    return result_store
+
+# --- [지표] 구간별 소요 시간 / 외부 호출 수 내보내기 ---
+@st.cache_resource
+def start_metrics_export():
+    """METRICS_PORT를 주면 /metrics (Prometheus 텍스트), METRICS_LOG_INTERVAL_SEC를 주면 주기적 로그 요약"""
+    port = get_setting("METRICS_PORT")
+    if port:
+        try:
+            metrics.REGISTRY.serve(int(port))
+        except OSError as e:
+            print(f"지표 엔드포인트 시작 오류: {e}")
+    metrics.REGISTRY.start_reporter(float(get_setting("METRICS_LOG_INTERVAL_SEC", 0)))
+    return metrics.REGISTRY
+
+def render_metrics_panel():
+    """관리자 사이드바: 응시 중 세션, 채점 중 답안, 구간별 p95"""
+    gauges = metrics.REGISTRY.gauges()
+    col1, col2 = st.columns(2)
+    col1.metric("응시 중", gauges.get("active_sessions", 0))
+    col2.metric("채점 중", gauges.get("grading_in_flight", 0))
+    stages = metrics.REGISTRY.stages()
+    if stages:
+        st.dataframe(
+            [{"구간": name, "횟수": s["count"], "p50 (ms)": round(s["p50"] * 1e3, 1),
+              "p95 (ms)": round(s["p95"] * 1e3, 1)} for name, s in stages.items()],
+            hide_index=True,
+        )
+    calls = metrics.REGISTRY.counters("external_calls")
+    errors = metrics.REGISTRY.counters("errors")
+    st.caption(
+        "외부 호출: " + (", ".join(f"{dict(labels).get('service')} {n}" for labels, n in sorted(calls.items())) or "-")
+        + " / 오류: " + (", ".join(f"{dict(labels).get('stage')} {n}" for labels, n in sorted(errors.items())) or "-")
+    )
+
+# --- [관리자 대시보드] 증분 집계 문서만 읽음 (결과 수와 무관하게 읽기 SHARD_COUNT회) ---
+@st.cache_data(ttl=float(get_setting("DASHBOARD_TTL_SEC", 10)), show_spinner=False)
+def load_result_stats():
+    """결과 집계 (여러 관리자 화면이 TTL 동안 같은 값을 공유)"""
+    return aggregates.read_stats(get_db())
+
+def render_dashboard():
+    """응시 현황: 완료 수, 평균, 쓰기 채점 현황, 총점 / 응시 시간 분포, 영역별 평균"""
+    st.subheader("📊 응시 현황")
+    stats = load_result_stats()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("완료", f"{stats['completed']}명")
+    c2.metric("평균 총점", f"{stats['avg_total']:.1f}점")
+    c3.metric("평균 응시 시간", f"{stats['avg_duration_min']:.1f}분")
+    c4.metric("쓰기 채점 대기", stats['writing']['pending'])
+    if not stats['completed']:
+        st.info("아직 제출된 결과가 없습니다.")
+        return
+    st.caption(
+        "영역별 평균: " + ", ".join(f"{label} {value:.1f}" for label, value in stats['section_avg'].items()
+                                    if label != "쓰기")
+        + f", 쓰기 {stats['writing_avg']:.1f} (채점 완료 {stats['writing']['done']}건 / 실패 {stats['writing']['failed']}건)"
+    )
+    for col, fig in zip(st.columns(3), aggregates.draw_charts(stats)):
+        col.pyplot(fig)
+
 # --- 3. 메인 앱 로직 ---
 def main():
+    start_metrics_export()
     st.title("🇰🇷 한국어 실력 진단 평가 (연구용)")
     
     # 세션 상태 초기화
     if 'page' not in st.session_state: st.session_state.page = 'login'
     if 'answers' not in st.session_state: st.session_state.answers = {}
+    if 'answer_times' not in st.session_state: st.session_state.answer_times = {}
     if 'start_time' not in st.session_state: st.session_state.start_time = None
     if 'end_time' not in st.session_state: st.session_state.end_time = None
     if 'is_admin' not in st.session_state: st.session_state.is_admin = False # 관리자 여부
@@ -189,27 +402,100 @@ def main():
             
         status_text = "🟢 응시 가능" if new_status else "🔴 응시 불가 (점검중)"
         st.sidebar.caption(f"현재 상태: {status_text}")
+        status_metrics = get_status_cache().metrics
+        st.sidebar.caption(
+            f"상태 캐시: 적중 {status_metrics['hits']} / 미스 {status_metrics['misses']} / "
+            f"오류 {status_metrics['errors']} (적중률 {get_status_cache().hit_rate():.0%})"
+        )
+        grading_cache = get_grading_cache()
+        st.sidebar.caption(
+            f"채점 캐시: 적중 {grading_cache.stats['hits']} / 미스 {grading_cache.stats['misses']} "
+            f"(적중률 {grading_cache.hit_rate():.0%}, {len(grading_cache)}건 보관)"
+        )
+        deadline_registry = get_deadline_registry()
+        st.sidebar.caption(
+            f"진행 중인 시험: {len(deadline_registry)}건 / "
+            f"마감 자동 제출 {deadline_registry.stats['auto_submitted']}건"
+        )
+        bank_registry = get_bank_registry()
+        st.sidebar.caption(
+            f"문제 은행: 버전 {bank_registry.current().version} (이 세션 {st.session_state.bank_version}) / "
+            f"재적재 {bank_registry.stats['reloads']}회 / 오류 {bank_registry.stats['failures']}회"
+        )
+        if bank_registry.last_error:
+            st.sidebar.warning(f"문제 파일 오류로 이전 버전 사용 중: {bank_registry.last_error}")
+        if ASSETS is not None:
+            st.sidebar.caption(
+                f"문항 이미지: 사용 불가 {len(ASSETS.missing)}개 / 캐시 {ASSETS.cache_bytes() // 1024} KiB "
+                f"(적중 {ASSETS.stats['hits']} / 인코딩 {ASSETS.stats['misses']})"
+            )
+        autosave_stats = get_autosave().stats
+        st.sidebar.caption(
+            f"답안 자동 저장: 변경 {autosave_stats['recorded']}건 -> "
+            f"쓰기 {autosave_stats['writes']}건 (batch {autosave_stats['batches']}회, 오류 {autosave_stats['failures']})"
+        )
+
+        with st.sidebar.expander("📈 실시간 지표"):
+            render_metrics_panel()
+        st.sidebar.toggle("📊 응시 현황 대시보드", key="show_dashboard")
 
         st.sidebar.markdown("---")
         if st.sidebar.button("로그아웃"):
             st.session_state.is_admin = False
             st.rerun()
 
-        with st.sidebar.expander("데이터 다운로드"):
-            if st.button("결과 CSV 다운로드"):
-                docs = db.collection("korean_test_results").stream()
-                data = []
-                for doc in docs:
-                    d = doc.to_dict()
-                    if 'timestamp' in d and d['timestamp']:
-                        d['timestamp'] = d['timestamp'].isoformat()
-                    data.append(d)
-                if data:
-                    df = pd.DataFrame(data)
-                    csv = df.to_csv(index=False).encode('utf-8-sig')
-                    st.download_button("CSV 파일 받기", csv, "results.csv", "text/csv")
+        with st.sidebar.expander("수험번호로 결과 찾기"):
+            lookup_code = st.text_input("수험번호", key="lookup_code").strip()
+            if lookup_code:
+                doc = lookup_result(get_db(), lookup_code)
+                if doc is None:
+                    st.write("결과가 없습니다.")
                 else:
-                    st.write("데이터가 없습니다.")
+                    data = doc.to_dict()
+                    st.write(f"{data.get('name_enc')} / 총점 {data.get('total_score')}점 "
+                             f"(쓰기 {data.get('writing_status') or 'done'})")
+                    st.caption(f"결과 문서 ID: {doc.id}")
+
+        with st.sidebar.expander("데이터 다운로드"):
+            export_format = st.selectbox("형식", EXPORT_FORMATS, key="export_format")
+            export_range = st.date_input("기간 (선택)", value=(), key="export_range")
+            export_incremental = st.checkbox("지난 내보내기 이후 결과만", key="export_incremental")
+            if st.button("결과 다운로드"):
+                since = until = None
+                if len(export_range) >= 1:
+                    since = datetime.datetime.combine(export_range[0], datetime.time.min, KST)
+                if len(export_range) == 2:
+                    until = datetime.datetime.combine(export_range[1] + datetime.timedelta(days=1), datetime.time.min, KST)
+
+                # 페이지 단위로 조회하며 임시 파일에 바로 기록 (전체 결과를 메모리에 올리지 않음)
+                fd, export_path = tempfile.mkstemp(suffix=f".{export_format}")
+                os.close(fd)
+                try:
+                    # 증분 기준 시각은 파일을 받을 때 갱신 (받지 않으면 다음에 다시 내보냄)
+                    count, _, watermark = export_results(get_db(), export_path, fmt=export_format,
+                                                         since=since, until=until, incremental=export_incremental,
+                                                         question_bank=get_bank_registry().current().bank,
+                                                         advance_watermark=False)
+                    if count:
+                        on_download = {"on_click": "ignore"}
+                        if watermark is not None:
+                            on_download = {"on_click": set_last_export_time, "args": (get_db(), watermark)}
+                        with open(export_path, 'rb') as f:
+                            st.download_button(f"{export_format.upper()} 파일 받기 ({count}건)", f,
+                                               f"results.{export_format}", EXPORT_MIME_TYPES[export_format],
+                                               **on_download)
+                    else:
+                        st.write("데이터가 없습니다.")
+                except ImportError:
+                    st.error("Parquet 내보내기에는 pyarrow가 필요합니다.")
+                except Exception as e:
+                    st.error(f"내보내기 오류: {e}")
+                finally:
+                    os.remove(export_path)
+
+    if st.session_state.is_admin and st.session_state.get("show_dashboard"):
+        render_dashboard()
+        st.markdown("---")
 
     # --- [시스템 상태 확인] ---
     is_system_active = get_system_status()
@@ -224,38 +510,11 @@ def main():
         st.warning("🔧 현재 [관리자 테스트 모드]입니다. 일반 사용자는 접속할 수 없습니다.")
 
     # --- 문제 출제 로직 (100점 만점) ---
-    if 'shuffled_questions' not in st.session_state and ALL_QUESTIONS_POOL:
-        grammar_pool = [q for q in ALL_QUESTIONS_POOL if q['type'] == '문법']
-        vocab_pool = [q for q in ALL_QUESTIONS_POOL if q['type'] == '어휘']
-        
-        reading_graph_pool = [q for q in ALL_QUESTIONS_POOL if q['type'] == '읽기' and '그래프' in q['question']]
-        reading_2pt_normal_pool = [q for q in ALL_QUESTIONS_POOL if q['type'] == '읽기' and q['score'] == 2 and '그래프' not in q['question']]
-        reading_3pt_pool = [q for q in ALL_QUESTIONS_POOL if q['type'] == '읽기' and q['score'] == 3]
-        
-        writing_pool = [q for q in ALL_QUESTIONS_POOL if q['type'] == '쓰기']
-        
-        try:
-            sel_grammar = random.sample(grammar_pool, 5)
-            sel_vocab = random.sample(vocab_pool, 5)
-            
-            if reading_graph_pool:
-                sel_reading_graph = random.sample(reading_graph_pool, 1)
-                sel_reading_normal = random.sample(reading_2pt_normal_pool, 19)
-                sel_reading_2 = sel_reading_graph + sel_reading_normal
-            else:
-                sel_reading_2 = random.sample(reading_2pt_normal_pool, 20)
-                
-            sel_reading_3 = random.sample(reading_3pt_pool, 9)
-            sel_writing = random.sample(writing_pool, 1)
-            
-            sel_reading = sel_reading_2 + sel_reading_3
-            random.shuffle(sel_reading)
-            
-            st.session_state.shuffled_questions = sel_grammar + sel_vocab + sel_reading + sel_writing
-            
-        except ValueError:
-            st.error("문제 데이터 부족 (데이터 풀 확인 필요)")
-            st.session_state.shuffled_questions = []
+    # 세션에는 문항 ID tuple과 시드만 저장 (문항 본문은 QUESTION_BANK에서 공유)
+    if 'question_ids' not in st.session_state and QUESTION_BANK:
+        st.session_state.question_seed = random.getrandbits(64)
+        with metrics.span("question_draw"):
+            st.session_state.question_ids = QUESTION_BANK.draw_form_ids(st.session_state.question_seed)
 
     # --- 페이지 1: 로그인 ---
     if st.session_state.page == 'login':
@@ -316,11 +575,20 @@ def main():
                     "name": name,
                     "univ": final_univ_name,
                     "email": full_email,
-                    "code": make_code(final_univ_name, name)
+                    "code": get_code_allocator().allocate(final_univ_name)
                 }
                 st.session_state.page = 'warning'
                 st.rerun()
 
+        with st.expander("🔄 이어서 응시하기 (접속이 끊긴 경우)"):
+            resume_code = st.text_input("수험번호", key="resume_code")
+            resume_name = st.text_input("이름", key="resume_name")
+            if st.button("이어서 응시"):
+                if resume_session(resume_code.strip(), resume_name.strip()):
+                    st.rerun()
+                else:
+                    st.warning("진행 중인 시험을 찾을 수 없습니다. 수험번호와 이름을 확인해주세요.")
+
     # --- 페이지 1.5: 시험 시작 전 경고 ---
     elif st.session_state.page == 'warning':
         st.warning("⚠️ 주의사항을 확인해주세요")
@@ -338,20 +606,41 @@ def main():
         col1, col2 = st.columns([1, 4])
         if col1.button("✅ 네, 시작합니다", type="primary"):
             st.session_state.start_time = time.time()
+            code = st.session_state.user_info['code']
+            if ADAPTIVE:
+                # 객관식은 시험 화면에서 하나씩 출제하고, 쓰기 문항만 미리 정해 둠
+                _, writing_question = QUESTION_BANK.split_form(st.session_state.question_ids)
+                st.session_state.question_ids = (writing_question['id'],) if writing_question else ()
+                st.session_state.cat_state = load_cat_engine(SNAPSHOT.version).start()
+            get_deadline_registry().start(code, TEST_DURATION_SEC, now=st.session_state.start_time)
+            get_autosave().begin(code, {
+                "bank_version": SNAPSHOT.version,
+                "user_info": st.session_state.user_info,
+                "question_ids": list(st.session_state.question_ids),
+                "start_time": st.session_state.start_time,
+                "answers": {},
+                "answer_times": {},
+                "writing": "",
+            })
             st.session_state.page = 'test'
             st.rerun()
 
     # --- 페이지 2: 시험 진행 ---
     elif st.session_state.page == 'test':
-        elapsed_time = time.time() - st.session_state.start_time
-        remaining_time = TEST_DURATION_SEC - elapsed_time
-        
+        code = st.session_state.user_info['code']
+        remaining_time = get_deadline_registry().remaining(code)
+        if remaining_time is None:
+            # 서버 재시작 등으로 마감 기록이 없으면 세션의 시작 시각으로 다시 등록
+            get_deadline_registry().start(code, TEST_DURATION_SEC, now=st.session_state.start_time)
+            remaining_time = get_deadline_registry().remaining(code)
+
         if remaining_time <= 0:
-            st.session_state.end_time = time.time()
-            st.session_state.page = 'scoring'
-            st.rerun()
-        
-        # 타이머
+            auto_submit(code)
+
+        # 마감 감시: 이 fragment만 주기적으로 실행되고, 마감되면 새로고침 없이 제출
+        watch_deadline(code)
+
+        # 타이머 (표시용, 0이 되면 서버의 자동 제출을 기다림)
         st.components.v1.html(
             f"""
             <div id="timer-display" class="fixed-timer" style="
@@ -369,7 +658,6 @@ def main():
                   if(timeleft <= 0){{
                     clearInterval(downloadTimer);
                     document.getElementById("timer-display").innerHTML = "시간 종료! 제출 중...";
-                    window.parent.location.reload();
                   }} else {{
                     var minutes = Math.floor(timeleft / 60);
                     var seconds = Math.floor(timeleft % 60);
@@ -387,221 +675,247 @@ def main():
         st.subheader(f"수험번호: {st.session_state.user_info['code']}")
         st.markdown("---")
         
-        questions = st.session_state.shuffled_questions
-        obj_questions = [q for q in questions if q.get('type') != '쓰기']
-        writing_question_list = [q for q in questions if q.get('type') == '쓰기']
-        writing_question = writing_question_list[0] if writing_question_list else None
-
-        for idx, q in enumerate(obj_questions):
-            st.markdown(
-                f"""<div class="prevent-copy notranslate" translate="no">
-                <strong>{idx+1}. [{q.get('type', '일반')}]</strong> {q['question']}
-                </div>""", 
-                unsafe_allow_html=True
-            )
-            
-            if 'passage' in q and q['passage']:
-                st.markdown(f"""
-                <div class="prevent-copy notranslate" translate="no" style="background-color: #333333; color: #ffffff; padding: 15px; border-radius: 10px; margin-bottom: 10px;">
-                    {q['passage'].replace('\n', '<br>')}
-                </div>
-                """, unsafe_allow_html=True)
-
-            if 'image' in q and q['image']:
-                if os.path.exists(q['image']):
-                    st.image(q['image'])
-            
-            options = q.get('options', [])
-            current_ans = st.session_state.answers.get(q['id'], None)
-            
-            choice = st.radio(
-                f"{idx+1}번 답안 선택", 
-                options, 
-                key=f"q_{q['id']}", 
-                index=options.index(current_ans) if current_ans in options else None,
-                label_visibility="collapsed"
-            )
-            st.session_state.answers[q['id']] = choice
-            st.markdown("---")
-        
-        if writing_question:
-            st.markdown(
-                f"""<div class="prevent-copy notranslate" translate="no">
-                <strong>[쓰기]</strong> {writing_question['question']}
-                </div>""", 
-                unsafe_allow_html=True
-            )
-            
-            if 'passage' in writing_question and writing_question['passage']:
-                st.markdown(f"""
-                <div class="prevent-copy notranslate" translate="no" style="background-color: #333333; color: #ffffff; padding: 15px; border-radius: 10px; margin-bottom: 10px;">
-                    {writing_question['passage'].replace('\n', '<br>')}
-                </div>
-                """, unsafe_allow_html=True)
-
-            if 'image' in writing_question and writing_question['image']:
-                if os.path.exists(writing_question['image']):
-                    st.image(writing_question['image'])
-            
-            writing_ans = st.text_area(
-                "답안을 작성하세요 (200~300자)", 
-                height=200,
-                key="writing_area",
-                value=st.session_state.answers.get('writing', '')
-            )
-            st.session_state.answers['writing'] = writing_ans
+        obj_questions, writing_question = QUESTION_BANK.split_form(st.session_state.question_ids)
+
+        show_writing = True
+        if ADAPTIVE:
+            # 쓰기 문항은 객관식이 끝난 뒤에 표시
+            show_writing = render_adaptive_step(code, obj_questions, writing_question)
         else:
+            # 문항별 fragment: 답을 고르면 해당 문항만 다시 실행됨
+            for idx, q in enumerate(obj_questions):
+                render_question(idx + 1, q['id'])
+
+        if not writing_question:
             st.warning("쓰기 문제가 로드되지 않았습니다.")
+        elif show_writing:
+            render_writing_question(writing_question['id'])
 
         st.markdown("---")
         if st.button("🏁 답안 제출하기", type="primary"):
             st.session_state.end_time = time.time()
             st.session_state.page = 'scoring'
+            get_deadline_registry().finish(code)
+            get_autosave().finish(code)
             st.rerun()
 
     # --- 페이지 3: 채점 및 결과 ---
     elif st.session_state.page == 'scoring':
         st.title("채점 결과")
         
-        with st.spinner("AI가 채점 및 분석 중입니다... (약 10~20초 소요)"):
-            
-            questions = st.session_state.shuffled_questions
-            scores = {"문법": 0, "어휘": 0, "읽기": 0, "쓰기": 0}
-            max_scores = {"문법": 0, "어휘": 0, "읽기": 0, "쓰기": 0}
-            
-            score_obj = 0
-            total_max_score = 0
-            details = {}
-            writing_q_text = "그래프 해석" 
-
-            for q in questions:
-                total_max_score += q['score']
-                q_type = q.get('type')
-                
-                if q_type in max_scores:
-                    max_scores[q_type] += q['score']
-                
-                if q_type == '쓰기':
-                    writing_q_text = q['question']
-                    continue
-                
-                user_choice = st.session_state.answers.get(q['id'])
-                is_correct = False
-                
-                if user_choice and 'options' in q:
-                    try:
-                        if user_choice in q['options']:
-                            choice_idx = q['options'].index(user_choice)
-                            if choice_idx == q['answer']:
-                                point = q['score']
-                                score_obj += point
-                                is_correct = True
-                                if q_type in scores:
-                                    scores[q_type] += point
-                    except:
-                        pass
-                
-                details[q['id']] = {
-                    "type": q_type,
-                    "user_ans": user_choice,
-                    "correct": is_correct,
-                    "score_earned": q['score'] if is_correct else 0
-                }
+        # 채점 / 저장은 제출 후 한 번만 (이후 rerun은 세션에 보관한 결과로 화면만 그림)
+        if 'result' not in st.session_state:
+            with st.spinner("채점 중입니다..."), metrics.span("scoring"):
+                st.session_state.result = score_and_save()
+        result = st.session_state.result
 
-            user_writing = st.session_state.answers.get('writing', '')
-            writing_analysis = {
-                "score": 0,
-                "breakdown": {"content": 0, "structure": 0, "grammar": 0},
-                "feedback": "답안이 없습니다.",
-                "correction": ""
-            }
+        st.success("🎉 객관식 채점이 완료되었습니다!")
 
-            if user_writing:
-                try:
-                    model = genai.GenerativeModel('gemini-flash-latest')
-                    prompt = f"""
-                    당신은 한국어 능력 시험(TOPIK) 전문 채점관입니다. 
-                    아래 학생의 쓰기 답안을 3~4급 수준을 기준으로 평가하고, JSON 포맷으로 출력하세요.
-
-                    [문제] {writing_q_text}
-                    [학생 답안] {user_writing}
-                    [평가 기준 (총 13점)]
-                    1. 내용(5점), 2. 구성(4점), 3. 언어(4점)
-
-                    [출력 포맷 (JSON)]
-                    {{
-                        "score": <총점 숫자 0~13>,
-                        "breakdown": {{ "content": <0~5>, "structure": <0~4>, "grammar": <0~4> }},
-                        "feedback": "<피드백 한 문단>",
-                        "correction": "<교정본>"
-                    }}
-                    """
-                    response = model.generate_content(prompt)
-                    response_text = response.text.strip().replace("```json", "").replace("```", "")
-                    writing_analysis = json.loads(response_text)
-                    scores["쓰기"] = writing_analysis.get("score", 0)
-                except Exception as e:
-                    print(f"쓰기 채점 오류: {e}")
-                    writing_analysis["feedback"] = "채점 중 오류가 발생했습니다."
-
-            total_score = score_obj + scores["쓰기"]
-            
-            if st.session_state.end_time and st.session_state.start_time:
-                duration = st.session_state.end_time - st.session_state.start_time
-            else:
-                duration = TEST_DURATION_SEC
-
-            doc_data = {
-                "name_enc": st.session_state.user_info['name'],
-                "univ_enc": st.session_state.user_info['code'],
-                "email": st.session_state.user_info['email'],
-                "total_score": total_score,
-                "max_score": total_max_score,
-                "score_grammar": scores["문법"],
-                "score_vocab": scores["어휘"],
-                "score_reading": scores["읽기"],
-                "score_writing": scores["쓰기"],
-                "details_obj": str(details),
-                "writing_original": user_writing,
-                "writing_analysis": writing_analysis,
-                "duration_sec": int(duration),
-                "timestamp": firestore.SERVER_TIMESTAMP
-            }
-            
-            db.collection("korean_test_results").add(doc_data)
-            
-        st.success("🎉 채점이 완료되었습니다!")
-        
-        col1, col2 = st.columns(2)
-        safe_max_score = total_max_score if total_max_score > 0 else 100
-        progress_value = total_score / safe_max_score
-        if progress_value > 1.0: progress_value = 1.0
-        
-        col1.metric("총점", f"{total_score}점 / {safe_max_score}점")
-        col1.progress(progress_value)
-        
-        st.subheader("📊 영역별 점수")
-        c1, c2, c3, c4 = st.columns(4)
-        c1.metric("문법", f"{scores['문법']} / {max_scores['문법']}")
-        c2.metric("어휘", f"{scores['어휘']} / {max_scores['어휘']}")
-        c3.metric("읽기", f"{scores['읽기']} / {max_scores['읽기']}")
-        c4.metric("쓰기", f"{scores['쓰기']} / {max_scores['쓰기']}")
-        
-        st.markdown("---")
-        st.subheader("📝 쓰기 AI 분석 결과")
-        if user_writing:
-            wa = writing_analysis
-            st.write(f"**[세부 점수]** 내용: {wa['breakdown']['content']}/5, 구성: {wa['breakdown']['structure']}/4, 언어: {wa['breakdown']['grammar']}/4")
-            st.info(f"**💡 피드백:**\n{wa['feedback']}")
-            with st.expander("원문 및 교정본 비교 보기"):
-                c_a, c_b = st.columns(2)
-                c_a.text_area("내 답안", user_writing, height=150, disabled=True)
-                c_b.text_area("AI 교정본", wa['correction'], height=150, disabled=True)
-        else:
-            st.warning("제출된 쓰기 답안이 없습니다.")
+        render_result(**result)
 
         st.info("수고하셨습니다. 창을 닫으셔도 됩니다.")
         st.stop()
 
+# --- [채점 화면] 제출 시 1회 채점 및 저장 ---
+def score_and_save():
+    """객관식 채점, 결과 저장, 쓰기 채점 등록 (화면 표시에 필요한 값 반환)"""
+    questions = QUESTION_BANK.resolve(st.session_state.question_ids)
+    # 답은 보기 위치(index)로 저장되어 있어 정답 위치와 바로 비교
+    scores, score_obj, max_scores, total_max_score, details = ANSWER_KEY.score_form(
+        questions, st.session_state.answers)
+    writing_questions = [q for q in questions if q.get('type') == '쓰기']
+    writing_q_text = writing_questions[0]['question'] if writing_questions else DEFAULT_WRITING_QUESTION
+    answer_secs = {
+        qid: answered_at - (st.session_state.start_time or answered_at)
+        for qid, answered_at in st.session_state.answer_times.items()
+    }
+
+    user_writing = st.session_state.answers.get('writing', '')
+
+    if st.session_state.end_time and st.session_state.start_time:
+        duration = st.session_state.end_time - st.session_state.start_time
+    else:
+        duration = TEST_DURATION_SEC
+
+    # 객관식 점수는 바로 저장하고, 쓰기는 채점 큐에 맡김
+    doc_data = {
+        "name_enc": st.session_state.user_info['name'],
+        "univ_enc": st.session_state.user_info['code'],
+        "email": st.session_state.user_info['email'],
+        "total_score": score_obj,
+        "max_score": total_max_score,
+        "score_grammar": scores["문법"],
+        "score_vocab": scores["어휘"],
+        "score_reading": scores["읽기"],
+        "score_writing": 0,
+        "items": pack_details(details, answer_secs),
+        "writing_qid": writing_questions[0]['id'] if writing_questions else None,
+        "bank_version": SNAPSHOT.version,
+        "writing_original": user_writing,
+        "writing_analysis": default_writing_analysis(
+            "채점 대기 중입니다." if user_writing else "답안이 없습니다."),
+        "writing_status": "pending" if user_writing else STATUS_DONE,
+        "duration_sec": int(duration)
+    }
+    theta = None
+    if ADAPTIVE and 'cat_state' in st.session_state:
+        # 마지막 문항은 '다음 문항'을 누르지 않고 제출했을 수 있음
+        engine, state = load_cat_engine(SNAPSHOT.version), st.session_state.cat_state
+        current = QUESTION_BANK.by_id[engine.params.ids[state.items[-1]]] if state.items else None
+        if current and len(state.responses) < len(state.items) and st.session_state.answers.get(current['id']) is not None:
+            engine.record(state, current['id'], st.session_state.answers[current['id']] == current['answer'])
+        theta = (round(state.theta, 3), round(state.se, 3))
+        doc_data.update({"test_mode": "adaptive", "theta": theta[0], "theta_se": theta[1]})
+
+    # 로컬 WAL에 먼저 기록하고 Firestore 기록은 백그라운드에서 일괄 처리 (timestamp는 제출 시각)
+    # 문서 ID는 수험번호 + 시작 시각으로 정해지므로 같은 응시를 두 번 저장해도 문서는 하나
+    result_id = submission_id(st.session_state.user_info['code'], st.session_state.start_time)
+    # 제출 시점에는 DB를 부르지 않음: 채점 작업 문서는 결과와 같은 트랜잭션에 기록되고,
+    # 채점 큐에는 메모리에만 등록했다가 결과 문서가 기록되면 (기록 알림) 채점 시작
+    grading_job = new_job(result_id, writing_q_text, user_writing) if user_writing else None
+    get_result_store().save(result_id, doc_data, grading_job=grading_job)
+    if user_writing:
+        get_grading_queue().submit(result_id, writing_q_text, user_writing, hold=True)
+
+    return {
+        "result_id": result_id,
+        "score_obj": score_obj,
+        "total_max_score": total_max_score,
+        "scores": scores,
+        "max_scores": max_scores,
+        "user_writing": user_writing,
+        "theta": theta,
+    }
+
+# --- [시험 화면] 적응형 검사: 현재 문항 1개 ---
+def render_adaptive_step(code, obj_questions, writing_question):
+    """현재 문항과 '다음 문항' 버튼 (객관식이 끝났으면 True)"""
+    engine = load_cat_engine(SNAPSHOT.version)
+    answers = st.session_state.answers
+    obj_ids = [q['id'] for q in obj_questions]
+    if 'cat_state' not in st.session_state:
+        # 이어서 응시: 답한 문항은 응답으로, 답하지 않은 마지막 문항은 현재 문항으로 복원
+        st.session_state.cat_state = engine.replay(obj_ids, [
+            None if answers.get(qid) is None else answers[qid] == QUESTION_BANK.by_id[qid]['answer']
+            for qid in obj_ids])
+    state = st.session_state.cat_state
+
+    if not state.finished and len(state.responses) == len(state.items):
+        qid = engine.next_item(state)
+        if qid is not None:
+            obj_ids.append(qid)
+            st.session_state.question_ids = tuple(obj_ids) + ((writing_question['id'],) if writing_question else ())
+            get_autosave().record(code, {"question_ids": list(st.session_state.question_ids)})
+    if state.finished:
+        st.info(f"객관식 문항이 끝났습니다 ({len(state.items)}문항). 쓰기 문항을 작성한 뒤 제출해주세요.")
+        return True
+
+    current = obj_ids[-1]
+    render_question(len(obj_ids), current)
+    if st.button("다음 문항 ▶", type="primary"):
+        if answers.get(current) is None:
+            st.warning("답을 선택해주세요.")
+        else:
+            engine.record(state, current, answers[current] == QUESTION_BANK.by_id[current]['answer'])
+            st.rerun()
+    return False
+
+# --- [시험 화면] 마감 감시 ---
+def auto_submit(code):
+    """마감된 세션을 세션에 있는 답안 그대로 제출 (채점 화면으로 전체 rerun, 새로고침 없음)"""
+    registry = get_deadline_registry()
+    st.session_state.end_time = min(time.time(), registry.deadline(code) or time.time())
+    st.session_state.page = 'scoring'
+    registry.finish(code, auto=True)
+    get_autosave().finish(code)
+    st.rerun()
+
+@st.fragment(run_every=float(get_setting("DEADLINE_CHECK_SEC", 5)))
+def watch_deadline(code):
+    """서버 기준으로 마감 여부 확인 (화면 요소 없음)"""
+    if get_deadline_registry().is_expired(code):
+        auto_submit(code)
+
+# --- [시험 화면] 문항 단위 fragment ---
+@st.fragment
+def render_question(number, qid):
+    """객관식 문항 1개 (답을 고르면 이 fragment만 다시 실행, 바뀐 답은 자동 저장 버퍼로)"""
+    answers = st.session_state.answers
+    previous = answers.get(qid)
+    with metrics.span("fragment.question"):
+        question_view.render_question(number, QUESTION_BANK.by_id[qid], answers,
+                                      st.session_state.answer_times, assets=ASSETS)
+    if answers.get(qid) != previous:
+        get_autosave().record_answer(st.session_state.user_info['code'], qid, answers[qid],
+                                     st.session_state.answer_times.get(qid))
+
+@st.fragment
+def render_writing_question(qid):
+    """쓰기 문항"""
+    answers = st.session_state.answers
+    previous = answers.get('writing', '')
+    question_view.render_writing_question(QUESTION_BANK.by_id[qid], answers, assets=ASSETS)
+    if answers['writing'] != previous:
+        get_autosave().record_writing(st.session_state.user_info['code'], answers['writing'])
+
+# --- [결과 화면] 쓰기 채점 중일 때만 주기적으로 확인 ---
+def graded_writing(result_id):
+    """쓰기 채점이 끝났으면 분석 결과를 세션에 보관하고 반환 (채점 중이면 None)"""
+    if st.session_state.get('writing_analysis') is None:
+        status, wa = get_grading_queue().get_status(result_id)
+        if status in (STATUS_DONE, STATUS_FAILED) and wa is not None:
+            st.session_state.writing_analysis = wa
+    return st.session_state.get('writing_analysis')
+
+@st.fragment(run_every=3)
+def poll_writing_result(result_id):
+    """채점 중일 때만 호출: 채점이 끝나면 결과 화면 전체를 한 번 다시 그리고 확인을 멈춤"""
+    if graded_writing(result_id) is not None:
+        st.rerun(scope="app")
+
+def render_result(result_id, score_obj, total_max_score, scores, max_scores, user_writing, theta=None):
+    """총점/영역별 점수/쓰기 분석 결과 표시 (적응형 검사면 능력 추정치도)"""
+    wa = graded_writing(result_id) if user_writing else None
+    is_graded = not user_writing or wa is not None
+    score_writing = wa.get("score", 0) if wa else 0
+    total_score = score_obj + score_writing
+
+    col1, col2 = st.columns(2)
+    safe_max_score = total_max_score if total_max_score > 0 else 100
+    progress_value = total_score / safe_max_score
+    if progress_value > 1.0: progress_value = 1.0
+    
+    total_label = f"{total_score}점 / {safe_max_score}점"
+    if not is_graded:
+        total_label += " (쓰기 채점 중)"
+    col1.metric("총점", total_label)
+    col1.progress(progress_value)
+    if theta is not None:
+        col2.metric("추정 능력 (θ)", f"{theta[0]:+.2f}", help=f"표준오차 {theta[1]:.2f}")
+    
+    st.subheader("📊 영역별 점수")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("문법", f"{scores['문법']} / {max_scores['문법']}")
+    c2.metric("어휘", f"{scores['어휘']} / {max_scores['어휘']}")
+    c3.metric("읽기", f"{scores['읽기']} / {max_scores['읽기']}")
+    c4.metric("쓰기", f"{score_writing if is_graded else '-'} / {max_scores['쓰기'] or WRITING_MAX_SCORE}")
+    
+    st.markdown("---")
+    st.subheader("📝 쓰기 AI 분석 결과")
+    if not user_writing:
+        st.warning("제출된 쓰기 답안이 없습니다.")
+    elif not is_graded:
+        st.info("✍️ AI가 쓰기 답안을 채점하고 있습니다... 결과는 완료되는 대로 이 화면에 표시됩니다.")
+        poll_writing_result(result_id)
+    else:
+        st.write(f"**[세부 점수]** 내용: {wa['breakdown']['content']}/5, 구성: {wa['breakdown']['structure']}/4, 언어: {wa['breakdown']['grammar']}/4")
+        st.info(f"**💡 피드백:**\n{wa['feedback']}")
+        with st.expander("원문 및 교정본 비교 보기"):
+            c_a, c_b = st.columns(2)
+            c_a.text_area("내 답안", user_writing, height=150, disabled=True)
+            c_b.text_area("AI 교정본", wa['correction'], height=150, disabled=True)
+
 if __name__ == "__main__":
-    main()
+    # 전체 rerun 1회 소요 시간 (시작할 때의 화면 기준, fragment만 다시 실행될 때는 제외)
+    with metrics.span(f"page.{st.session_state.get('page', 'login')}"):
+        main()
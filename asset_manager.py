@@ -0,0 +1,101 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+# --- [설정] 문항 이미지 ---
+MAX_IMAGE_WIDTH = 730      # 본문 영역 폭(px)보다 큰 이미지는 줄여서 보냄
+PALETTE_COLORS = 64        # 그래프 이미지는 팔레트 PNG로 충분
+MAX_CACHE_BYTES = 16 * 1024 * 1024
+
+
+class AssetManager:
+    """문항 이미지 관리 (시작 시 한 번 검사, 최적화된 바이트를 크기 제한 LRU에 보관)
+
+    st.image에 파일 경로를 넘기면 rerun 마다 파일을 읽고, RGB 이미지는 JPEG(품질 90)로
+    다시 인코딩해서 보낸다. 여기서는 이미지를 본문 폭 이하로 줄인 팔레트 PNG로 한 번만
+    인코딩해 두는데, 팔레트 PNG는 st.image가 변환 없이 그대로 내보내므로 같은 이미지는
+    항상 같은 바이트 -> 같은 미디어 URL(내용 해시)이 되어 브라우저 캐시가 유효하다.
+    (WebP는 st.image가 PNG/JPEG로 다시 변환하기 때문에 쓰지 않는다.)
+    """
+
+    def __init__(self, max_width=MAX_IMAGE_WIDTH, colors=PALETTE_COLORS, max_cache_bytes=MAX_CACHE_BYTES):
+        self.max_width = max_width
+        self.colors = colors
+        self.max_cache_bytes = max_cache_bytes
+        self.missing = {}  # 경로 -> 사유
+        self._valid = set()
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "original_bytes": 0, "encoded_bytes": 0}
+
+    def validate(self, paths):
+        """이미지 파일을 한 번씩 열어 검사 (헤더만 읽음). 반환: 사용할 수 없는 경로 dict"""
+        for path in set(paths):
+            if not os.path.exists(path):
+                self.missing[path] = "파일 없음"
+                continue
+            try:
+                from PIL import Image
+                with Image.open(path) as image:
+                    image.verify()
+            except ImportError:
+                pass
+            except Exception as e:
+                self.missing[path] = f"이미지 오류: {e}"
+                continue
+            self._valid.add(path)
+        return self.missing
+
+    def validate_bank(self, question_bank):
+        return self.validate(q['image'] for q in question_bank.by_id.values() if q.get('image'))
+
+    def image(self, q):
+        """문항 이미지 바이트 (이미지가 없거나 사용할 수 없으면 None)"""
+        path = q.get('image')
+        if not path or path not in self._valid:
+            return None
+        with self._lock:
+            data = self._cache.get(path)
+            if data is not None:
+                self._cache.move_to_end(path)
+                self.stats["hits"] += 1
+                return data
+        data = self._encode(path)
+        with self._lock:
+            self.stats["misses"] += 1
+            if path not in self._cache:
+                self._cache[path] = data
+                self._cache_bytes += len(data)
+                while self._cache_bytes > self.max_cache_bytes and len(self._cache) > 1:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_bytes -= len(evicted)
+                    self.stats["evictions"] += 1
+        return data
+
+    def _encode(self, path):
+        with open(path, 'rb') as f:
+            original = f.read()
+        self.stats["original_bytes"] += len(original)
+        try:
+            from PIL import Image
+        except ImportError:
+            return original
+
+        image = Image.open(io.BytesIO(original))
+        if image.width > self.max_width:
+            height = round(image.height * self.max_width / image.width)
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+            image = image.resize((self.max_width, height), Image.LANCZOS)
+        if image.mode != 'P':
+            method = Image.Quantize.FASTOCTREE if image.mode == 'RGBA' else Image.Quantize.MEDIANCUT
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB').quantize(self.colors, method=method)
+        out = io.BytesIO()
+        image.save(out, format='PNG', optimize=True)
+        data = out.getvalue()
+        self.stats["encoded_bytes"] += len(data)
+        return data
+
+    def cache_bytes(self):
+        return self._cache_bytes
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import metrics
+
+# --- [설정] 응시 중 답안 자동 저장 ---
+SESSIONS_COLLECTION = 'exam_sessions'
+STATUS_IN_PROGRESS = 'in_progress'
+STATUS_SUBMITTED = 'submitted'
+
+
+class AutosaveBuffer:
+    """응시 중인 답안의 변경분을 모아 주기적으로 저장 (수험번호별 `exam_sessions` 문서)
+
+    답을 고를 때마다 바로 쓰지 않고 변경된 필드만 메모리에 모아 두었다가,
+    flusher 스레드가 `interval_sec`마다 모든 세션의 변경분을 Firestore batch로 한 번에
+    기록한다. 같은 필드를 여러 번 바꾸면 마지막 값만 기록되므로, 세션 하나당 쓰기는
+    주기마다 최대 1회다. 다시 접속하면 `load()`로 저장된 답안을 불러와 이어서 응시한다.
+    """
+
+    def __init__(self, db, interval_sec=20.0, batch_size=400):
+        self.db = db
+        self.interval_sec = interval_sec
+        self.batch_size = min(batch_size, 500)  # Firestore batch 최대 500건
+        self._pending = {}  # 수험번호 -> {필드: 값}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self.stats = {"recorded": 0, "writes": 0, "batches": 0, "failures": 0}
+
+    # --- 생명주기 ---
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._flusher, name="autosave-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """남은 변경분을 기록하고 flusher 종료"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    # --- 기록 ---
+    def begin(self, code, session):
+        """시험 시작 시 세션 정보 전체 기록 (수험자 정보, 출제 문항, 시작 시각 등)"""
+        self.record(code, dict(session, status=STATUS_IN_PROGRESS))
+
+    def record_answer(self, code, qid, choice, answered_at=None):
+        fields = {"answers": {qid: choice}}
+        if answered_at is not None:
+            fields["answer_times"] = {qid: answered_at}
+        self.record(code, fields)
+
+    def record_writing(self, code, text):
+        self.record(code, {"writing": text})
+
+    def finish(self, code):
+        self.record(code, {"status": STATUS_SUBMITTED})
+
+    def record(self, code, fields):
+        """변경분을 모아 둠 (중첩 map은 필드 단위로 합쳐짐)"""
+        with self._lock:
+            _merge(self._pending.setdefault(code, {}), fields)
+            self.stats["recorded"] += 1
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    # --- 조회 ---
+    def load(self, code):
+        """저장된 세션 (아직 기록되지 않은 변경분 포함, 없으면 None)"""
+        doc = self.db.collection(SESSIONS_COLLECTION).document(code).get()
+        data = doc.to_dict() if doc.exists else None
+        with self._lock:
+            pending = self._pending.get(code)
+            if pending:
+                data = _merge(data or {}, pending)
+        return data
+
+    # --- 백그라운드 기록 ---
+    def _flusher(self):
+        while not self._stopped.wait(self.interval_sec):
+            self.flush()
+
+    def flush(self):
+        """모아 둔 변경분을 batch로 기록 (실패하면 다음 주기에 다시 시도)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        for start in range(0, len(items), self.batch_size):
+            chunk = items[start:start + self.batch_size]
+            try:
+                with metrics.span('firestore.autosave_flush'):
+                    batch = self.db.batch()
+                    for code, fields in chunk:
+                        ref = self.db.collection(SESSIONS_COLLECTION).document(code)
+                        batch.set(ref, dict(fields, updated_at=time.time()), merge=True)
+                    metrics.count('external_calls', service='firestore')
+                    batch.commit()
+                self.stats["writes"] += len(chunk)
+                self.stats["batches"] += 1
+            except Exception as e:
+                print(f"답안 자동 저장 오류: {e}")
+                self.stats["failures"] += 1
+                # 그 사이 새로 들어온 변경분이 더 최신이므로 그 아래에 되돌려 놓음
+                with self._lock:
+                    for code, fields in items[start:]:
+                        self._pending[code] = _merge(fields, self._pending.get(code, {}))
+                return
+
+
+def _merge(target, fields):
+    for key, value in fields.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = dict(value) if isinstance(value, dict) else value
+    return target
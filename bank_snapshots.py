@@ -0,0 +1,229 @@
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+import metrics
+from asset_manager import AssetManager
+from question_bank import QuestionBank
+from scoring import AnswerKey
+
+# --- [설정] 문제 은행 버전 ---
+SNAPSHOT_DIR = '.bank_snapshots'  # 버전별 problems.json 로컬 사본 (공유 보관본의 캐시)
+VERSIONS_COLLECTION = 'bank_versions'  # 버전별 problems.json 공유 보관본 (모든 서버 / 재채점용)
+VERSION_LENGTH = 12
+
+
+class UnknownBankVersion(LookupError):
+    """메모리 / 로컬 사본 / 공유 보관본 어디에도 없는 문제 은행 버전"""
+
+
+class BankSnapshot:
+    """한 버전의 문제 은행 (읽기 전용: 문제 은행, 정답 키 / 이미지는 디스크의 현재 파일)
+
+    version은 problems.json 내용의 해시라서, 내용이 같으면 언제 읽어도 같다. 보관본에도
+    problems.json만 들어가므로 문항 이미지는 버전에 고정되지 않는다: 이미지 파일을 바꾸면
+    모든 버전이 새 이미지를 보여 준다. 응시 중인 시험의 이미지를 바꾸지 않으려면 새 파일
+    이름으로 추가하고 problems.json에서 가리키게 한다 (새 버전이 됨).
+    """
+
+    def __init__(self, version, source, image_cache_bytes, bank=None):
+        self.version = version
+        self.source = source
+        self.bank = bank or QuestionBank.from_bytes(source)
+        self.key = AnswerKey(self.bank)
+        self.image_cache_bytes = image_cache_bytes
+        self.refresh_assets()
+
+    def refresh_assets(self):
+        """이미지 파일을 다시 검사하고 인코딩 캐시를 새로 시작 (이미지 파일이 바뀌었을 때)"""
+        assets = AssetManager(max_cache_bytes=self.image_cache_bytes)
+        assets.validate_bank(self.bank)
+        self.assets = assets
+
+
+def content_version(source):
+    """problems.json 바이트로 버전 해시 계산 (이미지는 보관하지 않으므로 넣지 않음)"""
+    return hashlib.sha256(source).hexdigest()[:VERSION_LENGTH]
+
+
+class BankRegistry:
+    """문제 은행 버전 관리 (파일 변경 감시 + 백그라운드 재적재 + 세션별 버전 고정)
+
+    watcher 스레드가 `poll_sec`마다 problems.json과 이미지 폴더의 (수정 시각, 크기)만
+    확인하고, 바뀌었으면 다시 읽어 검증한 뒤 새 스냅샷을 `current()`로 공개한다.
+    검증에 실패하면 기존 스냅샷을 계속 쓴다. 세션은 시작할 때의 버전을 들고 있다가
+    `get(version)`으로 같은 스냅샷을 받으므로, 응시 도중 문제 파일이 바뀌어도 섞이지 않는다.
+    이미지만 바뀌었으면 버전은 그대로 두고 메모리의 모든 스냅샷이 이미지를 다시 읽는다.
+    최근 `keep`개 버전만 메모리에 두고, 그보다 오래된 버전은 보관해 둔 원본으로 다시 만든다.
+    원본은 `db`의 `bank_versions/{버전}` 문서에 보관하므로, 다른 서버에서 시작한 세션을 이어
+    받거나 서버가 교체된 뒤 재채점해도 같은 버전을 찾을 수 있다. 어디에도 없는 버전은 현재
+    버전으로 대신하지 않고 `UnknownBankVersion`을 낸다.
+    """
+
+    def __init__(self, db=None, problems_path='problems.json', assets_dir=os.path.join('assets', 'images'),
+                 snapshot_dir=SNAPSHOT_DIR, poll_sec=2.0, keep=4, image_cache_bytes=16 * 1024 * 1024):
+        self.db = db
+        self.problems_path = problems_path
+        self.assets_dir = assets_dir
+        self.snapshot_dir = snapshot_dir
+        self.poll_sec = poll_sec
+        self.keep = keep
+        self.image_cache_bytes = image_cache_bytes
+        self._snapshots = OrderedDict()  # 버전 -> 스냅샷 (최근 사용 순)
+        self._current = None
+        self._signature = None
+        self._image_signature = None  # 마지막으로 스냅샷에 반영한 이미지 파일 목록
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self.stats = {"reloads": 0, "failures": 0, "archive_loads": 0}
+        self.last_error = None
+
+        self.reload()
+        if self._current is None:
+            raise ValueError(f"문제 은행을 불러올 수 없습니다: {self.last_error}")
+
+    # --- 생명주기 ---
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._watch, name="bank-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _watch(self):
+        while not self._stopped.wait(self.poll_sec):
+            if self._file_signature() != self._signature:
+                self.reload()
+
+    def _file_signature(self):
+        """변경 감지용 (경로, 수정 시각, 크기) 목록 (내용은 읽지 않음)"""
+        entries = []
+        paths = [self.problems_path]
+        for root, _, files in os.walk(self.assets_dir):
+            paths.extend(os.path.join(root, name) for name in files)
+        for path in sorted(paths):
+            try:
+                stat = os.stat(path)
+                entries.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                entries.append((path, None, None))
+        return tuple(entries)
+
+    # --- 적재 ---
+    def reload(self):
+        """파일을 다시 읽어 내용이 바뀌었으면 새 스냅샷 공개 (반환: 현재 버전)"""
+        signature = self._file_signature()
+        try:
+            with metrics.span('bank.reload'):
+                with open(self.problems_path, 'rb') as f:
+                    source = f.read()
+                bank = QuestionBank.from_bytes(source)  # 검증 실패 시 ValueError
+                version = content_version(source)
+                if self._image_signature is not None and signature[1:] != self._image_signature:
+                    # 이미지 파일이 바뀜: 버전과 무관하게 모든 스냅샷이 새 이미지를 씀
+                    with self._lock:
+                        snapshots = list(self._snapshots.values())
+                    for snapshot in snapshots:
+                        snapshot.refresh_assets()
+                self._image_signature = signature[1:]
+                if self._current is None or version != self._current.version:
+                    snapshot = self._snapshots.get(version) or BankSnapshot(
+                        version, source, self.image_cache_bytes, bank)
+                    self._archive(version, source)
+                    with self._lock:
+                        self._remember(snapshot)
+                        self._current = snapshot
+                    self.stats["reloads"] += 1
+                    print(f"문제 은행 버전 {version} 적용 (문항 {len(snapshot.bank)}개, "
+                          f"사용 불가 이미지 {len(snapshot.assets.missing)}개)")
+            self.last_error = None
+        except Exception as e:
+            print(f"문제 은행 재적재 오류 (기존 버전 유지): {e}")
+            self.stats["failures"] += 1
+            self.last_error = str(e)
+            if not isinstance(e, ValueError):
+                signature = None  # 파일 내용 문제가 아니면 (공유 보관 실패 등) 다음 확인 때 다시 시도
+        self._signature = signature
+        return self._current.version if self._current else None
+
+    def _archive(self, version, source):
+        """공유 보관본과 로컬 사본 기록 (공유 보관에 실패하면 예외: 그 버전은 공개하지 않음)"""
+        _write_local(version, source, self.snapshot_dir)
+        if self.db is None:
+            return
+        reference = self.db.collection(VERSIONS_COLLECTION).document(version)
+        if not reference.get().exists:
+            reference.set({"source_zlib": zlib.compress(source), "size": len(source)})
+
+    def _remember(self, snapshot):
+        """_lock 보유 상태에서 호출"""
+        self._snapshots[snapshot.version] = snapshot
+        self._snapshots.move_to_end(snapshot.version)
+        while len(self._snapshots) > self.keep:
+            oldest = next(iter(self._snapshots))
+            if oldest == getattr(self._current, 'version', None):
+                self._snapshots.move_to_end(oldest)
+                continue
+            self._snapshots.pop(oldest)
+
+    # --- 조회 ---
+    def current(self):
+        return self._current
+
+    def get(self, version):
+        """세션이 고정한 버전의 스냅샷 (메모리에 없으면 보관본에서 복원, 보관본도 없으면 UnknownBankVersion)"""
+        if version is None:
+            return self._current
+        with self._lock:
+            snapshot = self._snapshots.get(version)
+            if snapshot is not None:
+                self._snapshots.move_to_end(version)
+                return snapshot
+        source = load_archived(version, self.snapshot_dir, self.db)
+        if source is None:
+            raise UnknownBankVersion(f"문제 은행 버전 {version}의 보관본이 없습니다.")
+        snapshot = BankSnapshot(version, source, self.image_cache_bytes)
+        self.stats["archive_loads"] += 1
+        with self._lock:
+            self._remember(snapshot)
+        return snapshot
+
+    def versions(self):
+        with self._lock:
+            return list(self._snapshots)
+
+
+def _write_local(version, source, snapshot_dir):
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        path = os.path.join(snapshot_dir, f"{version}.json")
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(source)
+    except OSError as e:
+        print(f"문제 은행 버전 로컬 사본 오류 ({version}): {e}")
+
+
+def load_archived(version, snapshot_dir=SNAPSHOT_DIR, db=None):
+    """보관된 버전의 problems.json 바이트 (로컬 사본 -> db 공유 보관본 순, 없으면 None)"""
+    try:
+        with open(os.path.join(snapshot_dir, f"{version}.json"), 'rb') as f:
+            return f.read()
+    except OSError:
+        pass
+    if db is None:
+        return None
+    doc = db.collection(VERSIONS_COLLECTION).document(version).get()
+    if not doc.exists:
+        return None
+    source = zlib.decompress(doc.get("source_zlib"))
+    _write_local(version, source, snapshot_dir)
+    return source
@@ -0,0 +1,145 @@
+"""적응형 검사(CAT) 모의 실험: 같은 측정 정밀도에 필요한 문항 수
+
+problems.json 문항에 "참" 2PL 모수를 임의로 정하고 (a ~ lognormal(0, 0.3), b ~ 배점별 임시
+난이도 + N(0, 1)), 참 능력 θ ~ N(0, 1)인 모의 응시자의 응답을 만든다.
+
+1. 모수 추정: 고정 시험지(draw_form) 응답으로 calibrate_2pl을 돌려 참 모수와 비교
+2. 정밀도: 고정 시험지 39문항의 EAP 표준오차 중앙값을 목표로 CAT를 진행해, 평균 문항 수 /
+   능력 추정 RMSE / 최대 노출률 / 영역 비율을 고정 시험지와 비교
+3. 선택 시간: 문제 은행을 복제해 키워도 한 단계(선택 + 갱신) 시간이 그대로인지 확인
+
+    python benchmarks/bench_adaptive.py --examinees 1000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from adaptive import (  # noqa: E402
+    CONTENT_TARGETS, CatEngine, InformationTable, ItemParams, calibrate_2pl,
+)
+from question_bank import QuestionBank  # noqa: E402
+
+
+def true_params(prior, rng):
+    return ItemParams(prior.ids, np.exp(rng.normal(0, 0.3, len(prior.ids))),
+                      prior.b + rng.normal(0, 1, len(prior.ids)), prior.areas)
+
+
+def answer(params, i, theta, rng):
+    return rng.random() < 1 / (1 + np.exp(-params.a[i] * (theta - params.b[i])))
+
+
+def fixed_forms(bank, params, thetas, rng):
+    """고정 시험지 응답 (출제 여부 / 정오 행렬)"""
+    presented = np.zeros((len(thetas), len(params.ids)), dtype=bool)
+    for row, seed in enumerate(range(len(thetas))):
+        for qid in bank.draw_form_ids(seed):
+            if qid in params.index:
+                presented[row, params.index[qid]] = True
+    logits = params.a[None, :] * (thetas[:, None] - params.b[None, :])
+    correct = (rng.random(presented.shape) < 1 / (1 + np.exp(-logits))) & presented
+    return presented, correct
+
+
+def replicate(params, copies, rng):
+    """문제 은행을 copies배로 복제 (모수는 약간씩 흔듦)"""
+    n = len(params.ids)
+    return ItemParams([f"{qid}#{c}" for c in range(copies) for qid in params.ids],
+                      np.tile(params.a, copies) * np.exp(rng.normal(0, 0.05, n * copies)),
+                      np.tile(params.b, copies) + rng.normal(0, 0.1, n * copies),
+                      params.areas * copies)
+
+
+def run_cat(engine, params, thetas, rng, py_rng):
+    items, errors, reached, step_times = [], [], 0, []
+    areas = {area: 0 for area in CONTENT_TARGETS}
+    for theta in thetas:
+        state = engine.start()
+        while True:
+            started = time.perf_counter()
+            qid = engine.next_item(state, py_rng)
+            if qid is None:
+                break
+            engine.record(state, qid, answer(params, params.index[qid], theta, rng))
+            step_times.append(time.perf_counter() - started)
+        items.append(len(state.items))
+        errors.append(state.theta - theta)
+        reached += state.se <= engine.target_se
+        for area, count in state.area_counts.items():
+            areas[area] += count
+    total = sum(areas.values())
+    return {
+        "items": statistics.mean(items),
+        "rmse": float(np.sqrt(np.mean(np.square(errors)))),
+        "reached": reached / len(thetas),
+        "max_exposure": float(engine.exposure_rates().max()),
+        "areas": {area: count / total for area, count in areas.items()},
+        "step_us": statistics.median(step_times) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--examinees', type=int, default=1000)
+    parser.add_argument('--calibration-examinees', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    rng = np.random.default_rng(args.seed)
+    py_rng = random.Random(args.seed)
+    bank = QuestionBank.from_file('problems.json')
+    truth = true_params(ItemParams.from_prior(bank), rng)
+    table = InformationTable(truth)
+
+    # 1. 모수 추정
+    thetas = rng.normal(0, 1, args.calibration_examinees)
+    presented, correct = fixed_forms(bank, truth, thetas, rng)
+    started = time.perf_counter()
+    a, b, n, _ = calibrate_2pl(correct, presented)
+    elapsed = time.perf_counter() - started
+    ok = n >= 30
+    print(f"모수 추정: 응시자 {len(thetas)}명, 문항 {ok.sum()}/{len(n)}개 (응답 30건 이상), {elapsed:.1f}초")
+    print(f"  b 상관 {np.corrcoef(b[ok], truth.b[ok])[0, 1]:.3f} / RMSE {np.sqrt(np.mean((b[ok] - truth.b[ok]) ** 2)):.3f}, "
+          f"a 상관 {np.corrcoef(a[ok], truth.a[ok])[0, 1]:.3f}")
+
+    # 2. 고정 시험지 vs CAT (같은 목표 정밀도)
+    thetas = rng.normal(0, 1, args.examinees)
+    presented, correct = fixed_forms(bank, truth, thetas, rng)
+    log_post = table.log_prior[None, :] + np.where(
+        presented[:, None, :], np.where(correct[:, None, :], table.log_p[None], table.log_q[None]), 0).sum(axis=2)
+    post = np.exp(log_post - log_post.max(axis=1, keepdims=True))
+    post /= post.sum(axis=1, keepdims=True)
+    est = post @ table.grid
+    se = np.sqrt((post * (table.grid[None, :] - est[:, None]) ** 2).sum(axis=1))
+    target_se = float(np.median(se))
+    fixed_rmse = float(np.sqrt(np.mean((est - thetas) ** 2)))
+    print(f"\n고정 시험지: 39문항, 표준오차 중앙값 {target_se:.3f}, RMSE {fixed_rmse:.3f}")
+
+    engine = CatEngine(table, target_se=target_se, max_items=39)
+    result = run_cat(engine, truth, thetas, rng, py_rng)
+    print(f"CAT (목표 표준오차 {target_se:.3f}): 평균 {result['items']:.1f}문항 "
+          f"({1 - result['items'] / 39:.0%} 감소), RMSE {result['rmse']:.3f}, 목표 도달 {result['reached']:.0%}, "
+          f"최대 노출률 {result['max_exposure']:.2f}")
+    print("  영역 비율: " + ", ".join(f"{area} {share:.2f} (목표 {CONTENT_TARGETS[area]:.2f})"
+                                    for area, share in result['areas'].items()))
+
+    # 3. 문제 은행 크기별 한 단계 시간
+    print("\n문제 은행 크기별 한 단계(선택 + 사후 분포 갱신) 시간")
+    for copies in (1, 10, 50):
+        params = truth if copies == 1 else replicate(truth, copies, rng)
+        engine = CatEngine(InformationTable(params), target_se=target_se, max_items=39)
+        result = run_cat(engine, params, thetas[:200], rng, py_rng)
+        print(f"  문항 {len(params.ids):6d}개: 중앙값 {result['step_us']:6.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
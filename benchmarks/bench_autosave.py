@@ -0,0 +1,83 @@
+"""응시 중 답안 자동 저장의 분당 DB 쓰기 수 비교 (모의 시간)
+
+응시자 N명이 50분 동안 39문항에 답하고 (일부는 답을 바꿈) 쓰기 답안을 조금씩
+작성하는 상황을 만들어, 변경마다 바로 쓰는 방식과 AutosaveBuffer(주기마다 변경분을
+모아 batch 기록)의 쓰기 수를 메모리 Firestore로 센다.
+
+    python benchmarks/bench_autosave.py --students 300 --interval 20
+"""
+import argparse
+import os
+import random
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from autosave import SESSIONS_COLLECTION, AutosaveBuffer  # noqa: E402
+from memory_store import MemoryFirestore  # noqa: E402
+
+TEST_MINUTES = 50
+
+
+def make_events(students, rng):
+    """(시각(초), 수험번호, 종류, 값) 목록"""
+    events = []
+    for s in range(students):
+        code = f"S{s:04d}"
+        for q in range(39):
+            t = rng.uniform(0, TEST_MINUTES * 60 * 0.8)
+            events.append((t, code, "answer", (f"Q{q:02d}", rng.randrange(4))))
+            if rng.random() < 0.2:  # 답 바꾸기
+                events.append((t + rng.uniform(1, 120), code, "answer", (f"Q{q:02d}", rng.randrange(4))))
+        for k in range(30):  # 쓰기 답안은 입력창을 벗어날 때마다 반영
+            events.append((rng.uniform(TEST_MINUTES * 60 * 0.5, TEST_MINUTES * 60), code, "writing", "가" * (k * 10)))
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+def direct(events):
+    db = MemoryFirestore()
+    for t, code, kind, value in events:
+        ref = db.collection(SESSIONS_COLLECTION).document(code)
+        if kind == "answer":
+            ref.set({"answers": {value[0]: value[1]}}, merge=True)
+        else:
+            ref.set({"writing": value}, merge=True)
+    return db.stats
+
+
+def buffered(events, interval):
+    db = MemoryFirestore()
+    autosave = AutosaveBuffer(db, interval_sec=interval)
+    next_flush = interval
+    for t, code, kind, value in events:
+        while t >= next_flush:
+            autosave.flush()
+            next_flush += interval
+        if kind == "answer":
+            autosave.record_answer(code, value[0], value[1], t)
+        else:
+            autosave.record_writing(code, value)
+    autosave.flush()
+    return db.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=300)
+    parser.add_argument('--interval', type=float, default=20.0, help="자동 저장 주기(초)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    events = make_events(args.students, random.Random(args.seed))
+    print(f"응시자 {args.students}명, 답안 변경 {len(events)}건 ({TEST_MINUTES}분)")
+    for label, stats in [("변경마다 바로 기록", direct(events)),
+                         (f"자동 저장 버퍼 ({args.interval:g}초)", buffered(events, args.interval))]:
+        requests = stats["commits"] or stats["writes"]
+        print(f"  {label:<22} 문서 쓰기 {stats['writes']:7d}건 ({stats['writes'] / TEST_MINUTES:7.0f}/분)  "
+              f"요청 {requests:7d}회 ({requests / TEST_MINUTES:7.1f}/분)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""문제 은행 무중단 교체: 변경 감지 지연 / 재적재 시간 / 응시 중 세션 고정 / 재채점 재현 확인
+
+임시 폴더에 problems.json 복사본을 두고 BankRegistry watcher를 띄운 뒤
+
+1. 응시 중인 세션처럼 현재 버전을 고정하고, 그 버전 정답 키로 모든 문항을 맞힌 결과를 만든다.
+2. 파일에서 첫 문항의 정답을 바꿔 저장하고, 새 버전이 공개될 때까지 걸린 시간을 잰다.
+3. 고정한 세션의 스냅샷은 그대로인지, 새 버전 정답 키로는 점수가 바뀌고 `rescore_as_submitted`
+   (결과의 bank_version 보관본으로 채점)로는 원래 점수가 재현되는지 확인한다.
+4. 로컬 사본이 없는 다른 서버(빈 보관 폴더, 같은 DB)도 공유 보관본으로 같은 버전을 찾는지,
+   어디에도 없는 버전은 현재 버전으로 대신하지 않고 오류를 내는지 확인한다.
+5. 깨진 JSON을 저장하면 기존 버전이 유지되는지 확인한다.
+
+하나라도 실패하면 종료 코드 1.
+
+    python benchmarks/bench_bank_reload.py --poll-sec 0.2
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import metrics  # noqa: E402
+from bank_snapshots import BankRegistry, UnknownBankVersion  # noqa: E402
+from item_details import pack_details  # noqa: E402
+from memory_store import MemoryFirestore  # noqa: E402
+from scoring import rescore, rescore_as_submitted  # noqa: E402
+
+
+def wait_for_version(registry, old_version, timeout):
+    started = time.perf_counter()
+    while registry.current().version == old_version:
+        if time.perf_counter() - started > timeout:
+            return None
+        time.sleep(0.005)
+    return time.perf_counter() - started
+
+
+def perfect_record(snapshot):
+    """스냅샷 정답 키 기준 만점 결과 (bank_version 포함)"""
+    key = snapshot.key
+    details = {qid: {"choice": int(answer)} for qid, answer in zip(key.question_ids, key.answers)}
+    data = {"items": pack_details(details), "bank_version": snapshot.version, "score_writing": 0}
+    row = rescore(key, [("r0", data)])[0]
+    data.update({field: row[field] for field in
+                 ["score_grammar", "score_vocab", "score_reading", "total_score"]})
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--poll-sec', type=float, default=0.2)
+    parser.add_argument('--edits', type=int, default=5, help="정답 변경 반복 횟수")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix='bench_bank_')
+    shutil.copy(os.path.join(ROOT, 'problems.json'), work)
+    os.symlink(os.path.abspath(os.path.join(ROOT, 'assets')), os.path.join(work, 'assets'))
+    os.chdir(work)
+
+    db = MemoryFirestore()
+    registry = BankRegistry(db, poll_sec=args.poll_sec, image_cache_bytes=0)
+    registry.start()
+    pinned = registry.current()
+    record = perfect_record(pinned)
+    first_qid = pinned.key.question_ids[0]
+    original_answer = int(pinned.key.answers[0])
+
+    with open('problems.json', 'r', encoding='utf-8') as f:
+        problems = json.load(f)
+    first = next(q for qs in problems.values() for q in qs if q['id'] == first_qid)
+
+    delays = []
+    for i in range(args.edits):
+        old_version = registry.current().version
+        first['answer'] = (original_answer + 1 + i % 3) % len(first['options'])
+        with open('problems.json', 'w', encoding='utf-8') as f:
+            json.dump(problems, f, ensure_ascii=False)
+        delays.append(wait_for_version(registry, old_version, timeout=args.poll_sec * 20 + 5))
+    detected = [d for d in delays if d is not None]
+    reload_ms = metrics.REGISTRY.quantile('bank.reload', 0.5) * 1e3
+
+    current = registry.current()
+    rescored = rescore(current.key, [("r0", record)])[0]
+    shutil.rmtree(registry.snapshot_dir)  # 서버 교체로 로컬 사본이 사라짐
+    reproduced = rescore_as_submitted([("r0", record)], current.key, registry.snapshot_dir, db)
+    other = BankRegistry(db, snapshot_dir=os.path.join(work, 'other_replica'), image_cache_bytes=0)
+    try:
+        other.get('000000000000')
+        unknown_rejected = False
+    except UnknownBankVersion:
+        unknown_rejected = True
+
+    with open('problems.json', 'w', encoding='utf-8') as f:
+        f.write('{"SET_A": [')
+    failures = registry.stats["failures"]
+    deadline = time.time() + args.poll_sec * 20 + 5
+    while registry.stats["failures"] == failures and time.time() < deadline:
+        time.sleep(0.01)
+    registry.stop()
+
+    checks = {
+        "변경 감지": len(detected) == args.edits,
+        "세션 고정 버전 유지": registry.get(pinned.version) is not None
+        and int(registry.get(pinned.version).key.answers[0]) == original_answer,
+        "새 버전 정답 반영": int(current.key.answers[0]) != original_answer,
+        "새 정답 키로 점수 변경": rescored["changed"],
+        "bank_version으로 점수 재현": not reproduced[0]["changed"],
+        "다른 서버에서 같은 버전": int(other.get(pinned.version).key.answers[0]) == original_answer,
+        "없는 버전은 오류": unknown_rejected,
+        "깨진 파일은 기존 버전 유지": registry.stats["failures"] > failures
+        and registry.current().version == current.version,
+    }
+    print(f"문항 {len(pinned.bank)}개, poll {args.poll_sec:.2f}초, 정답 변경 {args.edits}회")
+    if detected:
+        print(f"  새 버전 공개까지: 중앙값 {statistics.median(detected) * 1e3:.0f} ms / 최대 {max(detected) * 1e3:.0f} ms "
+              f"(재적재 자체 {reload_ms:.1f} ms)")
+    print(f"  메모리 보관 버전 {len(registry.versions())}개, stats {registry.stats}")
+    for label, ok in checks.items():
+        print(f"  {label:<20} {'OK' if ok else 'FAIL'}")
+    shutil.rmtree(work, ignore_errors=True)
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""수험번호 발급: 기존 임의 번호의 충돌 vs 카운터 발급기의 중복 / 비용, 수험번호로 결과 찾기
+
+1. 기존 방식 (해시 2자리 + randint(100, 999)): 한 대학교 응시자 수별 충돌 발생 비율
+2. CodeAllocator: 여러 프로세스(발급기 여러 개, 같은 DB) x 스레드가 동시에 로그인할 때
+   중복 수, 트랜잭션 수, 1건당 발급 시간
+3. 결과 N건 기록 후 수험번호로 결과 찾기: 색인 조회의 문서 읽기 수
+
+하나라도 중복이 있거나 결과를 찾지 못하면 종료 코드 1.
+
+    python benchmarks/bench_codes.py --logins 20000 --processes 4 --threads 16
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from exam_codes import CodeAllocator, lookup_result  # noqa: E402
+from memory_store import MemoryFirestore  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+
+UNIVERSITIES = ["서울대학교", "연세대학교", "고려대학교", "부산대학교", "전남대학교"]
+
+
+def legacy_collision_rate(students, trials, rng):
+    collided = 0
+    for _ in range(trials):
+        numbers = [rng.randint(100, 999) for _ in range(students)]
+        collided += len(set(numbers)) < students
+    return collided / trials
+
+
+def concurrent_logins(allocators, threads, logins, rng):
+    codes, times = [], []
+    lock = threading.Lock()
+    plan = [(allocators[i % len(allocators)], rng.choice(UNIVERSITIES)) for i in range(logins)]
+
+    def worker(part):
+        local_codes, local_times = [], []
+        for allocator, univ in part:
+            started = time.perf_counter()
+            local_codes.append(allocator.allocate(univ))
+            local_times.append(time.perf_counter() - started)
+        with lock:
+            codes.extend(local_codes)
+            times.extend(local_times)
+
+    workers = [threading.Thread(target=worker, args=(plan[i::threads],)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return codes, times, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=20000)
+    parser.add_argument('--processes', type=int, default=4, help="같은 DB를 쓰는 발급기 수")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--block-size', type=int, default=10)
+    parser.add_argument('--results', type=int, default=5000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    print("기존 방식: 한 대학교 응시자 수별 수험번호 충돌 발생 비율")
+    for students in (10, 30, 50, 100, 200):
+        print(f"  {students:4d}명: {legacy_collision_rate(students, 2000, rng):6.1%}")
+
+    db = MemoryFirestore()
+    allocators = [CodeAllocator(db, block_size=args.block_size) for _ in range(args.processes)]
+    codes, times, elapsed = concurrent_logins(allocators, args.threads, args.logins, rng)
+    duplicates = len(codes) - len(set(codes))
+    reservations = sum(allocator.stats["reservations"] for allocator in allocators)
+    print(f"\nCodeAllocator: 로그인 {len(codes)}건 (발급기 {args.processes}개 x 스레드 {args.threads}개, "
+          f"block {args.block_size}) {elapsed:.2f}초")
+    print(f"  중복 {duplicates}건, 트랜잭션 {reservations}회 (로그인 {len(codes) / max(reservations, 1):.1f}건당 1회), "
+          f"발급 시간 중앙값 {statistics.median(times) * 1e6:.1f} µs / p99 "
+          f"{sorted(times)[int(len(times) * 0.99)] * 1e6:.1f} µs")
+
+    store = ResultStore(db, wal_dir=tempfile.mkdtemp(prefix='bench_codes_'))
+    sample = codes[:args.results]
+    for start in range(0, len(sample), 100):
+        store._commit([{"id": f"r{i:06d}", "submitted_at": time.time(),
+                        "data": {"univ_enc": sample[i], "name_enc": f"응시자{i}", "total_score": i % 100}}
+                       for i in range(start, min(len(sample), start + 100))])
+    probes = rng.sample(range(len(sample)), min(200, len(sample)))
+    reads = db.stats["reads"]
+    started = time.perf_counter()
+    found = sum(lookup_result(db, sample[i]).id == f"r{i:06d}" for i in probes)
+    lookup_us = (time.perf_counter() - started) / len(probes) * 1e6
+    print(f"\n수험번호로 결과 찾기 (결과 {len(sample)}건): {found}/{len(probes)}건 일치, "
+          f"1건당 문서 읽기 {(db.stats['reads'] - reads) / len(probes):.1f}회, {lookup_us:.1f} µs")
+    sys.exit(0 if duplicates == 0 and found == len(probes) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""응시자 N명이 로그인부터 결과 확인까지 진행하는 전체 과정 부하 측정 (성능 기준선)
+
+Streamlit AppTest로 app.py를 메모리 DB / 가짜 채점기로 실행한다. 응시자마다 로그인 ->
+주의사항 -> 시험(문항마다 생각하는 시간을 두고 답을 고르고 일부는 답을 바꿈, 마지막에
+쓰기 작성) -> 제출 -> 결과 확인 순서의 행동을 모의 시각에 배치하고, 모든 응시자의
+행동을 모의 시각 순서대로 하나씩 실행한다 (AppTest는 동시에 실행할 수 없음).
+
+보고 항목
+- 행동 종류별 rerun 지연 p50 / p95 (AppTest는 fragment만 다시 실행하지 못하므로 답 선택도
+  전체 rerun 기준, 즉 실제보다 보수적인 값)
+- 응시자 1명당 메모리 (모두 시험 화면에 있을 때의 RSS 증가분 / 인원)
+- Firestore 읽기/쓰기/batch 수, 모델(가짜 채점기) 호출 수
+
+    python benchmarks/bench_cohort.py --students 20
+"""
+import argparse
+import gc
+import heapq
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from grading import FakeGrader  # noqa: E402
+from grading_cache import GradingCache  # noqa: E402
+from memory_store import MemoryFirestore  # noqa: E402
+from tests.apptest_helpers import find, login, new_session, start_exam, submit, wait_for_background  # noqa: E402
+
+
+def rss_bytes():
+    """현재 프로세스 RSS (리눅스 /proc, 없으면 None)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+class Student:
+    """응시자 1명의 행동 순서 (각 행동은 (이전 행동 후 생각하는 시간, 행동 이름, 함수))"""
+
+    def __init__(self, number, at, rng, answer_secs):
+        self.number = number
+        self.at = at
+        self.rng = rng
+        self.answer_secs = answer_secs
+
+    def plan(self):
+        """행동 생성기 (앞 행동을 실행한 뒤에 다음 행동을 만들므로 시험 화면의 문항 수를 알 수 있음)"""
+        rng = self.rng
+        yield rng.uniform(0, 60), 'open', self.open
+        yield rng.uniform(20, 40), 'login', self.login
+        yield rng.uniform(10, 30), 'start', self.start
+        order = list(range(len(self.at.radio)))
+        for index in order:
+            yield rng.lognormvariate(0, 0.5) * self.answer_secs, 'answer', lambda i=index: self.answer(i)
+        for index in rng.sample(order, k=max(1, len(order) // 8)):  # 검토하며 답 바꾸기
+            yield rng.uniform(5, 20), 'answer', lambda i=index: self.answer(i)
+        for length in (80, 160, 240):  # 쓰기: 입력창을 벗어날 때마다 반영
+            yield rng.uniform(60, 180), 'write', lambda n=length: self.write(n)
+        yield rng.uniform(5, 20), 'submit', self.submit
+        yield rng.uniform(3, 10), 'view_result', self.view_result
+
+    def open(self):
+        self.at.run()
+
+    def login(self):
+        login(self.at, self.number, univ_index=self.number)
+
+    def start(self):
+        start_exam(self.at)
+
+    def answer(self, index):
+        radio = self.at.radio[index]
+        radio.set_value(self.rng.randrange(len(radio.options))).run()
+
+    def write(self, length):
+        text = ('그래프를 보면 대학생의 독서 시간이 해마다 줄어들고 있다. ' * 20)[:length]
+        self.at.text_area(key='writing_area').set_value(text).run()
+
+    def submit(self):
+        submit(self.at)
+
+    def view_result(self):
+        self.at.run()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(len(values) * pct)) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=20)
+    parser.add_argument('--answer-secs', type=float, default=60.0, help="문항당 평균 생각하는 시간(모의 시각, 초)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    wal_dir = tempfile.mkdtemp(prefix='bench_cohort_')
+    warmup = new_session(wal_dir)
+    warmup.run()  # 문제 은행 / 캐시 / DB 클라이언트 준비 (측정 제외)
+    db = find(MemoryFirestore)
+    db_before = dict(db.stats)
+    gc.collect()
+    rss_before = rss_bytes()
+
+    rng = random.Random(args.seed)
+    students = [Student(i, new_session(wal_dir), random.Random(rng.getrandbits(32)), args.answer_secs)
+                for i in range(args.students)]
+    plans = {}
+    events = []  # (모의 시각, 응시자 번호, 행동 이름, 함수)
+    for student in students:
+        plans[student.number] = student.plan()
+        delay, name, action = next(plans[student.number])
+        heapq.heappush(events, (delay, student.number, name, action))
+
+    latencies = defaultdict(list)
+    errors = 0
+    on_test = set()
+    peak = (0, rss_before)
+    started = time.perf_counter()
+    while events:
+        sim_time, number, name, action = heapq.heappop(events)
+        t0 = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            errors += 1
+            print(f"응시자 {number} {name} 실패: {e}")
+            continue
+        latencies[name].append(time.perf_counter() - t0)
+        if students[number].at.exception:
+            errors += 1
+        if name == 'start':
+            on_test.add(number)
+            if len(on_test) >= peak[0]:
+                gc.collect()
+                peak = (len(on_test), rss_bytes())
+        elif name == 'submit':
+            on_test.discard(number)
+        step = next(plans[number], None)
+        if step is not None:
+            heapq.heappush(events, (sim_time + step[0], number, step[1], step[2]))
+    wall = time.perf_counter() - started
+
+    wait_for_background(timeout=120)
+
+    print(f"응시자 {args.students}명, rerun {sum(len(v) for v in latencies.values())}회, "
+          f"실행 시간 {wall:.1f}초, 오류 {errors}건")
+    print(f"  {'행동':<12} {'횟수':>6} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    all_latencies = []
+    for name in ('open', 'login', 'start', 'answer', 'write', 'submit', 'view_result'):
+        values = latencies.get(name)
+        if not values:
+            continue
+        all_latencies += values
+        print(f"  {name:<12} {len(values):>6} {statistics.median(values) * 1e3:>10.1f} "
+              f"{percentile(values, 0.95) * 1e3:>10.1f}")
+    print(f"  {'전체':<12} {len(all_latencies):>6} {statistics.median(all_latencies) * 1e3:>10.1f} "
+          f"{percentile(all_latencies, 0.95) * 1e3:>10.1f}")
+
+    if rss_before and peak[1] and peak[0]:
+        print(f"메모리: 시험 화면 {peak[0]}명일 때 RSS +{(peak[1] - rss_before) / 2**20:.1f} MiB "
+              f"(1명당 {(peak[1] - rss_before) / peak[0] / 1024:.0f} KiB)")
+
+    stats = {k: db.stats[k] - db_before.get(k, 0) for k in db.stats}
+    print(f"Firestore: 읽기 {stats['reads']} / 쓰기 {stats['writes']} / batch {stats['commits']} "
+          f"(응시자 1명당 쓰기 {stats['writes'] / args.students:.1f})")
+    grader = find(FakeGrader)
+    cache = find(GradingCache)
+    if grader is not None:
+        print(f"모델 호출: {grader.calls}회 (채점 캐시 적중 {cache.stats['hits'] if cache else 0}회)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""관리자 대시보드 1회 조회 비용: 결과 전체 조회 vs 증분 집계 문서
+
+결과 N건을 ResultStore와 같은 경로(batch + 집계 변경분)로 메모리 Firestore에 기록한 뒤,
+결과 문서를 모두 읽어 통계를 내는 방식과 집계 shard 문서만 읽는 방식의 문서 읽기 수와
+시간을 비교하고, 두 방식의 통계가 같은지 확인한다.
+
+    python benchmarks/bench_dashboard.py --results 1000 5000 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import aggregates  # noqa: E402
+from export import iter_result_docs  # noqa: E402
+from memory_store import MemoryFirestore  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+
+
+def fake_result(rng):
+    sections = {"score_grammar": rng.randint(0, 10), "score_vocab": rng.randint(0, 10),
+                "score_reading": rng.randint(0, 67)}
+    writing = rng.randint(0, 13)
+    return dict(sections, score_writing=writing, total_score=sum(sections.values()) + writing,
+                max_score=100, duration_sec=rng.randint(600, 3000), writing_status='done')
+
+
+def scan_stats(db):
+    total = {}
+    for doc in iter_result_docs(db):
+        aggregates.merge_delta(total, aggregates.result_delta(doc.to_dict()))
+    nested = {}
+    for key, value in total.items():
+        target = nested
+        parts = key.split('.')
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return aggregates.summarize(nested)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--results', type=int, nargs='+', default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for n in args.results:
+        db = MemoryFirestore()
+        store = ResultStore(db, wal_dir=tempfile.mkdtemp(prefix='bench_dashboard_'))
+        for start in range(0, n, 100):
+            store._commit([{"id": f"r{i:06d}", "submitted_at": time.time() + i, "data": fake_result(rng)}
+                           for i in range(start, min(n, start + 100))])
+
+        print(f"결과 {n}건")
+        outputs = []
+        for label, read in [("결과 전체 조회", scan_stats), ("집계 문서", aggregates.read_stats)]:
+            reads = db.stats["reads"]
+            started = time.perf_counter()
+            outputs.append(read(db))
+            elapsed = time.perf_counter() - started
+            print(f"  {label:<14} 문서 읽기 {db.stats['reads'] - reads:6d}회  {elapsed * 1e3:8.1f} ms")
+        print(f"  통계 일치: {outputs[0] == outputs[1]}")
+
+
+if __name__ == '__main__':
+    main()
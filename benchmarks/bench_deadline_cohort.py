@@ -0,0 +1,91 @@
+"""같은 시각에 시작한 응시자 집단이 한꺼번에 마감될 때의 부하 측정
+
+기존 방식: 0초가 되면 브라우저가 페이지를 새로고침 -> 응시자마다 새 세션이 만들어져
+app.py 전체가 처음부터 실행되고 (로그인 화면), 세션에 있던 답안은 사라진다.
+현재 방식: 서버의 마감 감시 fragment가 마감을 확인하고 세션에 있는 답안 그대로 채점
+화면으로 rerun 한다 (새로고침 없음). 결과는 WAL에 기록된 뒤 일괄 flush 되고, 쓰기는
+채점 큐로 간다.
+
+Streamlit AppTest로 app.py를 메모리 DB / 가짜 채점기로 실행한다. AppTest는 동시에
+실행할 수 없으므로 마감된 세션들의 rerun을 차례로 처리하고, 그 합을 서버가 감당해야
+하는 작업량으로 본다. 같은 프로세스에서 돌기 때문에 마감 registry, 결과 저장소,
+채점 큐는 gc로 찾아서 조작/관찰한다.
+
+    python benchmarks/bench_deadline_cohort.py --sessions 30
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from deadlines import DeadlineRegistry  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+from tests.apptest_helpers import find, login, new_session, start_exam, wait_for_background  # noqa: E402
+
+
+def start_test(at, number):
+    """로그인 -> 주의사항 -> 시험 화면까지 진행하고 답안 일부 작성"""
+    at.run()
+    login(at, number)
+    start_exam(at)
+    for radio in at.radio[:10]:
+        radio.set_value(0)
+    at.text_area(key='writing_area').set_value('시간이 다 되어 자동으로 제출되는 답안입니다. ' * 8)
+    at.run()
+    return at
+
+
+def timed_run(at):
+    started = time.perf_counter()
+    at.run()
+    return time.perf_counter() - started
+
+
+def report(label, latencies, wall):
+    ms = sorted(t * 1e3 for t in latencies)
+    print(f"{label:<24} 세션 {len(ms)}개  전체 {wall:6.2f}초  "
+          f"세션당 중앙값 {statistics.median(ms):7.1f} ms  p95 {ms[max(0, int(len(ms) * 0.95) - 1)]:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=30)
+    args = parser.parse_args()
+
+    wal_dir = tempfile.mkdtemp(prefix='bench_deadline_')
+    print(f"응시자 {args.sessions}명 시험 화면까지 준비 중...")
+    sessions = [start_test(new_session(wal_dir), i) for i in range(args.sessions)]
+    registry = find(DeadlineRegistry)
+
+    # 기존 방식: 모든 브라우저가 새로고침 -> 새 세션 N개가 app.py를 처음부터 실행
+    started = time.perf_counter()
+    legacy = [timed_run(new_session(wal_dir)) for _ in sessions]
+    report("새로고침 (기존)", legacy, time.perf_counter() - started)
+    print(f"{'':<24} 제출된 답안 0 / {len(sessions)} (새 세션에는 답안이 없음)")
+
+    # 현재 방식: 모든 세션의 마감을 같은 시각으로 당긴 뒤 감시 fragment의 rerun 처리
+    expire_at = time.time() - 0.001
+    for code in list(registry._deadlines):
+        registry._deadlines[code] = expire_at
+    started = time.perf_counter()
+    current = [timed_run(at) for at in sessions]
+    wall = time.perf_counter() - started
+    report("서버 자동 제출 (현재)", current, wall)
+    result_store = find(ResultStore)  # 첫 제출 때 만들어짐
+    submitted = sum(at.session_state.page == 'scoring' for at in sessions)
+    print(f"{'':<24} 제출된 답안 {submitted} / {len(sessions)}, "
+          f"결과 저장 {result_store.stats['saved']}건, "
+          f"자동 제출 {registry.stats['auto_submitted']}건")
+
+    wait_for_background()
+    print(f"{'':<24} DB 기록 + 쓰기 채점 완료까지 {time.perf_counter() - started:.2f}초 "
+          f"(flush 배치 {result_store.stats['batches']}회)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""쓰기 채점 응답 파싱 성공률 비교 (기존 fence 제거 + json.loads vs 현재 추출/검증)
+
+tests/test_parse_writing.py의 응답 모음(모델이 실제로 돌려준 적이 있는 형태)으로 각 방식이
+채점 결과를 얻어내는 비율과 응답 1건당 파싱 시간을 잰다. 기존 방식에서 실패한 응답은
+"채점 중 오류가 발생했습니다"(0점)로 처리되고 나중에 다시 채점해야 했다. 현재 방식의
+기대 점수 확인은 pytest가 한다.
+
+    python benchmarks/bench_parse_writing.py
+"""
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from grading import WRITING_MAX_SCORE, parse_writing_response  # noqa: E402
+from tests.test_parse_writing import CORPUS  # noqa: E402
+
+
+def legacy_parse(response_text):
+    cleaned = response_text.strip().replace("```json", "").replace("```", "")
+    return json.loads(cleaned)
+
+
+def legacy_ok(text):
+    try:
+        result = legacy_parse(text)
+        return isinstance(result, dict) and 0 <= int(result["score"]) <= WRITING_MAX_SCORE
+    except Exception:
+        return False
+
+
+def current_score(text):
+    try:
+        return parse_writing_response(text)["score"]
+    except ValueError:
+        return None
+
+
+def main():
+    gradable = [case for case in CORPUS if case[2] is not None]
+    legacy_hits = sum(legacy_ok(text) for _, text, _ in gradable)
+    current_hits = sum(current_score(text) is not None for _, text, _ in gradable)
+
+    print(f"채점 가능한 응답 {len(gradable)}건 (전체 {len(CORPUS)}건)")
+    print(f"  기존 방식: {legacy_hits}건 성공 ({legacy_hits / len(gradable):.0%})")
+    print(f"  현재 방식: {current_hits}건 성공 ({current_hits / len(gradable):.0%})")
+
+    texts = [text for _, text, _ in CORPUS]
+    per_call = timeit.timeit(lambda: [current_score(t) for t in texts], number=200) / (200 * len(texts))
+    print(f"  현재 방식 파싱 시간: 응답당 {per_call * 1e6:.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""세션당 시험지 추출 비용 벤치마크
+
+기존 방식(세션마다 전체 문제를 리스트 컴프리헨션으로 6번 훑은 뒤 random.sample)과
+QuestionBank.draw_form을 비교한다.
+
+    python benchmarks/bench_question_draw.py --sessions 5000 --threads 32
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from question_bank import QuestionBank, SET_KEYS  # noqa: E402
+
+
+def legacy_draw(all_questions, rng):
+    """기존 app.py의 세션별 출제 로직"""
+    grammar_pool = [q for q in all_questions if q['type'] == '문법']
+    vocab_pool = [q for q in all_questions if q['type'] == '어휘']
+    reading_graph_pool = [q for q in all_questions if q['type'] == '읽기' and '그래프' in q['question']]
+    reading_2pt_normal_pool = [q for q in all_questions if q['type'] == '읽기' and q['score'] == 2 and '그래프' not in q['question']]
+    reading_3pt_pool = [q for q in all_questions if q['type'] == '읽기' and q['score'] == 3]
+    writing_pool = [q for q in all_questions if q['type'] == '쓰기']
+
+    sel_reading = (rng.sample(reading_graph_pool, 1) + rng.sample(reading_2pt_normal_pool, 19)
+                   + rng.sample(reading_3pt_pool, 9))
+    rng.shuffle(sel_reading)
+    return (rng.sample(grammar_pool, 5) + rng.sample(vocab_pool, 5)
+            + sel_reading + rng.sample(writing_pool, 1))
+
+
+def run(label, draw, sessions, threads):
+    rngs = [random.Random(i) for i in range(sessions)]
+
+    start = time.perf_counter()
+    for rng in rngs:
+        draw(rng)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(draw, rngs))
+    concurrent = time.perf_counter() - start
+
+    print(f"{label:<14} {serial / sessions * 1e6:>10.1f} us/세션 (순차)"
+          f"   {concurrent:>7.3f} s 총 ({sessions}세션, {threads}스레드)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--problems', default='problems.json')
+    args = parser.parse_args()
+
+    with open(args.problems, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    all_questions = [q for key in SET_KEYS for q in data.get(key, [])]
+
+    start = time.perf_counter()
+    bank = QuestionBank(data)
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    print(f"문제 은행: {len(bank)}문항, 색인 {build_ms:.1f} ms (프로세스당 1회)")
+    run("legacy", lambda rng: legacy_draw(all_questions, rng), args.sessions, args.threads)
+    run("QuestionBank", bank.draw_form, args.sessions, args.threads)
+
+
+if __name__ == '__main__':
+    main()
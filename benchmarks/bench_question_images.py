@@ -0,0 +1,73 @@
+"""시험지 1부의 문항 이미지 전송량 / 렌더링 CPU 비교
+
+기존 방식: st.image(파일 경로) -> rerun 마다 파일을 읽고 RGB PNG를 JPEG(품질 90)로
+다시 인코딩. 현재 방식: AssetManager가 본문 폭 이하 팔레트 PNG로 한 번 인코딩해 둔
+바이트를 st.image에 넘김 (변환 없이 그대로 전송). st.image 내부에서 실제로 수행되는
+형식 결정/크기 조정 단계를 그대로 호출해 전송되는 바이트를 잰다.
+
+    python benchmarks/bench_question_images.py --sessions 200
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from streamlit.elements.lib.image_utils import (  # noqa: E402
+    MAXIMUM_CONTENT_WIDTH,
+    _ensure_image_size_and_format,
+    _validate_image_format_string,
+)
+from streamlit.elements.lib.layout_utils import LayoutConfig  # noqa: E402
+
+from asset_manager import AssetManager  # noqa: E402
+from question_bank import QuestionBank  # noqa: E402
+
+
+def served_bytes(image):
+    """st.image(image)가 미디어 파일로 내보내는 바이트 (경로면 파일을 읽음)"""
+    if isinstance(image, str):
+        with open(image, 'rb') as f:
+            image = f.read()
+    image_format = _validate_image_format_string(image, "auto")
+    return _ensure_image_size_and_format(image, LayoutConfig(width=MAXIMUM_CONTENT_WIDTH), image_format)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=200)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    bank = QuestionBank.from_file('problems.json')
+    assets = AssetManager()
+    missing = assets.validate_bank(bank)
+    print(f"이미지 {len({q['image'] for q in bank.by_id.values() if q.get('image')})}개 중 사용 불가 {len(missing)}개")
+
+    forms = [bank.resolve(bank.draw_form_ids(seed)) for seed in range(args.sessions)]
+    for label, to_image in [
+        ("파일 경로 (기존)", lambda q: q['image'] if q.get('image') and os.path.exists(q['image']) else None),
+        ("AssetManager (현재)", assets.image),
+    ]:
+        total = 0
+        images = 0
+        started = time.process_time()
+        for form in forms:
+            for q in form:
+                image = to_image(q)
+                if image:
+                    total += len(served_bytes(image))
+                    images += 1
+        cpu = time.process_time() - started
+        print(f"  {label:<20} 세션당 {total / len(forms) / 1024:7.1f} KiB  "
+              f"(이미지 {images / len(forms):.1f}개)  렌더링 CPU 세션당 {cpu / len(forms) * 1e3:6.2f} ms")
+
+    unchanged = all(served_bytes(assets.image(q)) is assets.image(q)
+                    for q in bank.by_id.values() if assets.image(q))
+    print(f"  최적화된 이미지가 st.image에서 변환 없이 전송됨: {unchanged}, 캐시 {assets.cache_bytes() / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""세션당 메모리 사용량 벤치마크
+
+기존 방식: `@st.cache_data`가 호출마다 문제 목록의 복사본을 돌려주므로, 각 세션의
+`shuffled_questions`는 문항 dict 40개(지문, 보기 포함)의 독립된 사본을 들고 있었다.
+현재 방식: 세션에는 문항 ID tuple과 시드만 저장하고 본문은 QuestionBank에서 공유한다.
+
+    python benchmarks/bench_session_memory.py --sessions 500
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from question_bank import QuestionBank  # noqa: E402
+
+
+def measure(label, make_session, sessions):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    store = [make_session(i) for i in range(sessions)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_session = (after - before) / sessions
+    print(f"{label:<20} {per_session / 1024:>8.2f} KiB/세션   "
+          f"{(after - before) / 1024 / 1024:>7.2f} MiB 총 ({sessions}세션)")
+    del store
+    return per_session
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=500)
+    parser.add_argument('--problems', default='problems.json')
+    args = parser.parse_args()
+
+    bank = QuestionBank.from_file(args.problems)
+
+    def legacy_session(i):
+        form = bank.draw_form(random.Random(i))
+        return {"shuffled_questions": [copy.deepcopy(dict(q, options=list(q['options']))) for q in form]}
+
+    def id_session(i):
+        seed = random.Random(i).getrandbits(64)
+        return {"question_seed": seed, "question_ids": bank.draw_form_ids(seed)}
+
+    legacy = measure("문항 dict 사본", legacy_session, args.sessions)
+    compact = measure("문항 ID tuple + 시드", id_session, args.sessions)
+    print(f"세션당 {legacy / compact:.0f}배 감소")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""새 프로세스에서 첫 화면(로그인)이 그려질 때까지 걸리는 시간
+
+매번 새 파이썬 프로세스를 띄워 AppTest로 app.py를 한 번 실행하고, 프로세스 시작부터
+첫 실행 완료까지의 시간과 그 사이 불러온 무거운 모듈을 기록한다. 메모리 DB로
+실행하므로 네트워크 연결 시간은 포함되지 않는다.
+
+기존 방식(모듈 최상단에서 firebase_admin / google.generativeai / pandas import,
+Gemini 설정)은 같은 모듈들을 먼저 import 한 뒤 app.py를 실행하는 것으로 재현한다.
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+HEAVY_MODULES = ['firebase_admin', 'google.cloud.firestore', 'google.generativeai', 'pandas', 'matplotlib']
+EAGER_IMPORTS = ['firebase_admin', 'firebase_admin.firestore', 'google.generativeai', 'pandas']
+
+CHILD = r"""
+import json, os, sys, time, warnings
+started = time.perf_counter()
+warnings.simplefilter('ignore')
+os.chdir(sys.argv[1])
+sys.path.insert(0, sys.argv[1])
+import importlib
+for name in json.loads(sys.argv[2]):
+    importlib.import_module(name)
+if json.loads(sys.argv[2]):
+    import google.generativeai as genai
+    genai.configure(api_key='unused')
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('app.py', default_timeout=60)
+at.secrets['GEMINI_API_KEY'] = 'unused'
+at.secrets['DB_BACKEND'] = 'memory'
+at.run()
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "elapsed": elapsed,
+    "page": at.session_state.page,
+    "loaded": [m for m in json.loads(sys.argv[3]) if m in sys.modules],
+}))
+"""
+
+
+def run_once(eager):
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD, ROOT, json.dumps(eager), json.dumps(HEAVY_MODULES)],
+        capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for label, eager in [("최상단 import (기존)", EAGER_IMPORTS), ("지연 초기화 (현재)", [])]:
+        runs = [run_once(eager) for _ in range(args.repeat)]
+        times = [r["elapsed"] for r in runs]
+        print(f"{label:<20} 첫 화면까지 중앙값 {statistics.median(times):5.2f}초 "
+              f"(최소 {min(times):.2f} / 최대 {max(times):.2f}, {args.repeat}회)  "
+              f"불러온 모듈: {', '.join(runs[-1]['loaded']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""시험 화면 답 선택 1회당 서버 CPU 시간 측정
+
+기존 방식: 답을 하나 고를 때마다 39문항 전체를 다시 그림 (지문 replace, os.path.exists,
+options.index 를 매번 수행). 현재 방식: 고른 문항의 fragment만 다시 실행되고 지문 HTML /
+이미지 확인 / 보기 위치는 문항 ID별로 캐시됨. Streamlit AppTest로 실제 위젯을 만들며,
+스크립트 안에서 렌더링 구간의 스레드 CPU 시간을 잰다.
+
+    python benchmarks/bench_test_page.py --clicks 40
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from question_bank import QuestionBank  # noqa: E402
+
+
+def legacy_page(root, question_ids):
+    """기존 시험 화면: 매 클릭마다 전체 객관식 문항 렌더링"""
+    import os
+    import sys
+    import time
+    import streamlit as st
+    sys.path.insert(0, root)
+    from question_bank import QuestionBank
+
+    @st.cache_resource
+    def load_bank():
+        return QuestionBank.from_file(os.path.join(root, 'problems.json'))
+
+    os.chdir(root)
+    bank = load_bank()
+    if 'answers' not in st.session_state:
+        st.session_state.answers = {}
+    if 'cpu' not in st.session_state:
+        st.session_state.cpu = []
+
+    start = time.thread_time()
+    for idx, q in enumerate(bank.resolve(question_ids)):
+        st.markdown(
+            f"""<div class="prevent-copy notranslate" translate="no">
+            <strong>{idx+1}. [{q.get('type', '일반')}]</strong> {q['question']}
+            </div>""",
+            unsafe_allow_html=True
+        )
+        if 'passage' in q and q['passage']:
+            passage = q['passage'].replace('\n', '<br>')
+            st.markdown(f"""
+            <div class="prevent-copy notranslate" translate="no" style="background-color: #333333; color: #ffffff; padding: 15px; border-radius: 10px; margin-bottom: 10px;">
+                {passage}
+            </div>
+            """, unsafe_allow_html=True)
+        if 'image' in q and q['image']:
+            if os.path.exists(q['image']):
+                st.image(q['image'])
+        options = list(q.get('options', []))
+        current_ans = st.session_state.answers.get(q['id'], None)
+        choice = st.radio(
+            f"{idx+1}번 답안 선택",
+            options,
+            key=f"q_{q['id']}",
+            index=options.index(current_ans) if current_ans in options else None,
+            label_visibility="collapsed"
+        )
+        st.session_state.answers[q['id']] = choice
+        st.markdown("---")
+    st.session_state.cpu.append(time.thread_time() - start)
+
+
+def fragment_rerun(root, question_ids):
+    """현재 시험 화면: 클릭한 문항의 fragment만 다시 실행"""
+    import os
+    import sys
+    import time
+    import streamlit as st
+    sys.path.insert(0, root)
+    import question_view
+    from question_bank import QuestionBank
+
+    @st.cache_resource
+    def load_bank():
+        return QuestionBank.from_file(os.path.join(root, 'problems.json'))
+
+    os.chdir(root)
+    bank = load_bank()
+    if 'answers' not in st.session_state:
+        st.session_state.answers = {}
+    if 'cpu' not in st.session_state:
+        st.session_state.cpu = []
+
+    number = st.session_state.get('clicked', 0)
+    start = time.thread_time()
+    question_view.render_question(number + 1, bank.by_id[question_ids[number]], st.session_state.answers)
+    st.session_state.cpu.append(time.thread_time() - start)
+
+
+def measure(label, script, question_ids, clicks, rng):
+    at = AppTest.from_function(script, args=(ROOT, question_ids), default_timeout=30)
+    at.run()
+    for _ in range(clicks):
+        clicked = rng.randrange(len(question_ids))
+        at.session_state['clicked'] = clicked
+        if script is fragment_rerun:
+            at.run()  # 클릭할 문항의 fragment 표시
+        radio = at.radio(key=f"q_{question_ids[clicked]}")
+        radio.set_value(rng.choice(radio.options)).run()
+    cpu_ms = [t * 1e3 for t in at.session_state.cpu[1:]]
+    print(f"{label:<22} 중앙값 {statistics.median(cpu_ms):7.2f} ms   "
+          f"p95 {sorted(cpu_ms)[int(len(cpu_ms) * 0.95) - 1]:7.2f} ms   (클릭 {clicks}회)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clicks', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    bank = QuestionBank.from_file(os.path.join(ROOT, 'problems.json'))
+    obj_questions, _ = bank.split_form(bank.draw_form_ids(args.seed))
+    question_ids = tuple(q['id'] for q in obj_questions)
+
+    measure("전체 재렌더링 (기존)", legacy_page, question_ids, args.clicks, random.Random(args.seed))
+    measure("문항 fragment (현재)", fragment_rerun, question_ids, args.clicks, random.Random(args.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import heapq
+import threading
+import time
+
+
+class DeadlineRegistry:
+    """수험번호별 시험 마감 시각 (프로세스 전역, 서버 시각 기준)
+
+    마감 시각은 시험을 시작할 때 한 번 정해지고, 같은 수험번호로 다시 시작해도
+    바뀌지 않는다. 브라우저 타이머는 표시용일 뿐이며, 마감 여부는 항상 여기서 판단한다.
+    제출하지 않고 떠난 세션의 기록은 마감 후 keep_sec가 지나면 정리된다.
+    """
+
+    def __init__(self, keep_sec=3600):
+        self.keep_sec = keep_sec
+        self._deadlines = {}
+        self._heap = []  # (마감 시각, 수험번호): 오래된 기록 정리용
+        self._lock = threading.Lock()
+        self.stats = {"started": 0, "finished": 0, "auto_submitted": 0, "swept": 0}
+
+    def start(self, code, duration_sec, now=None):
+        """시험 시작: 마감 시각을 등록하고 반환 (이미 있으면 기존 마감 시각 유지)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._sweep(now)
+            deadline = self._deadlines.get(code)
+            if deadline is None:
+                deadline = now + duration_sec
+                self._deadlines[code] = deadline
+                heapq.heappush(self._heap, (deadline, code))
+                self.stats["started"] += 1
+            return deadline
+
+    def deadline(self, code):
+        return self._deadlines.get(code)
+
+    def remaining(self, code, now=None):
+        """남은 시간(초, 음수면 지남). 등록되지 않은 수험번호는 None"""
+        deadline = self._deadlines.get(code)
+        if deadline is None:
+            return None
+        return deadline - (time.time() if now is None else now)
+
+    def is_expired(self, code, now=None):
+        remaining = self.remaining(code, now)
+        return remaining is not None and remaining <= 0
+
+    def finish(self, code, auto=False):
+        """답안 제출 완료 (auto: 마감으로 자동 제출)"""
+        with self._lock:
+            if self._deadlines.pop(code, None) is not None:
+                self.stats["finished"] += 1
+                if auto:
+                    self.stats["auto_submitted"] += 1
+
+    def _sweep(self, now):
+        while self._heap and self._heap[0][0] + self.keep_sec < now:
+            deadline, code = heapq.heappop(self._heap)
+            if self._deadlines.get(code) == deadline:
+                del self._deadlines[code]
+                self.stats["swept"] += 1
+
+    def __len__(self):
+        return len(self._deadlines)
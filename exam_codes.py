@@ -0,0 +1,146 @@
+"""수험번호 발급 / 수험번호로 결과 찾기
+
+수험번호는 "대학교 해시 2자리 + 대 + 일련번호" (예: "3F대0007")이다. 일련번호는 접두어마다
+Firestore 카운터 문서(`exam_code_counters/{접두어}`)에서 트랜잭션으로 `block_size`개씩
+예약해 프로세스 안에서 나누어 주므로, 동시에 로그인해도 겹치지 않고 로그인 1건당 비용은
+메모리 연산 1회 (트랜잭션은 `block_size`건마다 1회)이다. 예전 수험번호(임의의 3자리)와
+겹치지 않도록 일련번호는 4자리 이상으로 쓴다.
+
+결과를 기록할 때 `exam_codes/{수험번호}` 색인 문서에 결과 문서 ID를 함께 기록하므로,
+`lookup_result()`는 결과 수와 무관하게 문서 2건만 읽는다.
+
+    python exam_codes.py --credentials firebase_key.json --rebuild-index   # 기존 결과로 색인 만들기
+    python exam_codes.py --credentials firebase_key.json --lookup 3F대0007
+"""
+import argparse
+import hashlib
+import threading
+
+from firestore_ops import run_transaction
+import metrics
+
+# --- [설정] 수험번호 ---
+COUNTERS_COLLECTION = 'exam_code_counters'
+CODES_COLLECTION = 'exam_codes'  # 수험번호 -> 결과 문서 ID 색인
+PREFIX_LENGTH = 2
+SEQUENCE_DIGITS = 4
+
+
+def code_prefix(univ_name):
+    return hashlib.sha256(univ_name.encode()).hexdigest()[:PREFIX_LENGTH].upper()
+
+
+def format_code(prefix, sequence):
+    return f"{prefix}대{sequence:0{SEQUENCE_DIGITS}d}"
+
+
+def _reserve_block(transaction, counter_ref, block_size):
+    """카운터를 block_size만큼 올리고 예약한 구간 [start, end) 반환"""
+    snapshot = counter_ref.get(transaction=transaction)
+    start = (snapshot.get("next") if snapshot.exists else None) or 1
+    transaction.set(counter_ref, {"next": start + block_size})
+    return start, start + block_size
+
+
+class CodeAllocator:
+    """접두어별 원자적 카운터로 겹치지 않는 수험번호 발급 (프로세스당 1개)
+
+    접두어마다 예약해 둔 번호 구간에서 차례로 꺼내고, 다 쓰면 트랜잭션으로 다음 구간을
+    예약한다. 프로세스가 재시작되면 쓰지 않은 번호는 건너뛴다 (번호에 빈칸이 생길 뿐 겹치지 않음).
+    """
+
+    def __init__(self, db, block_size=10):
+        self.db = db
+        self.block_size = max(int(block_size), 1)
+        self._blocks = {}  # 접두어 -> [다음 번호, 구간 끝]
+        self._locks = {}  # 접두어 -> 예약 잠금 (다른 접두어의 발급은 기다리지 않음)
+        self._lock = threading.Lock()
+        self.stats = {"allocated": 0, "reservations": 0}
+
+    def allocate(self, univ_name):
+        prefix = code_prefix(univ_name)
+        with self._lock:
+            prefix_lock = self._locks.setdefault(prefix, threading.Lock())
+        with prefix_lock:
+            block = self._blocks.get(prefix)
+            if block is None or block[0] >= block[1]:
+                block = self._blocks[prefix] = list(self._reserve(prefix))
+            sequence = block[0]
+            block[0] += 1
+        self.stats["allocated"] += 1
+        return format_code(prefix, sequence)
+
+    def _reserve(self, prefix):
+        counter_ref = self.db.collection(COUNTERS_COLLECTION).document(prefix)
+        with metrics.span('firestore.code_reserve'):
+            metrics.count('external_calls', service='firestore')
+            block = run_transaction(self.db, _reserve_block, counter_ref, self.block_size)
+        self.stats["reservations"] += 1
+        return block
+
+
+def add_index_to_batch(batch, db, code, result_id, timestamp=None):
+    """수험번호 색인 문서에 결과 문서 ID를 기록하도록 batch에 추가 (쓰기 1건)"""
+    batch.set(db.collection(CODES_COLLECTION).document(code),
+              {"result_id": result_id, "timestamp": timestamp}, merge=True)
+
+
+def lookup_result(db, code):
+    """수험번호의 결과 문서 스냅샷 (없으면 None)
+
+    색인이 없으면 (색인 도입 전 결과) `univ_enc` 조회로 찾는다.
+    """
+    from result_store import RESULTS_COLLECTION
+    index = db.collection(CODES_COLLECTION).document(code).get()
+    result_id = index.get("result_id") if index.exists else None
+    if result_id:
+        doc = db.collection(RESULTS_COLLECTION).document(result_id).get()
+        if doc.exists:
+            return doc
+    matches = list(db.collection(RESULTS_COLLECTION).where("univ_enc", "==", code).limit(1).stream())
+    return matches[0] if matches else None
+
+
+def rebuild_index(db):
+    """기존 결과 문서 전체로 수험번호 색인을 만듦 (같은 수험번호는 가장 최근 결과, 결과 수에 비례)"""
+    from export import iter_result_docs
+    latest = {}
+    for doc in iter_result_docs(db):
+        data = doc.to_dict()
+        code = data.get("univ_enc")
+        if not code:
+            continue
+        timestamp = data.get("timestamp")
+        if code not in latest or (timestamp and (latest[code][1] is None or timestamp > latest[code][1])):
+            latest[code] = (doc.id, timestamp)
+    items = list(latest.items())
+    for start in range(0, len(items), 500):
+        batch = db.batch()
+        for code, (result_id, timestamp) in items[start:start + 500]:
+            add_index_to_batch(batch, db, code, result_id, timestamp)
+        batch.commit()
+    return len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수험번호 색인 재생성 / 수험번호로 결과 찾기")
+    parser.add_argument('--credentials', required=True, help="Firebase 서비스 계정 키 파일")
+    parser.add_argument('--rebuild-index', action='store_true', help="기존 결과로 수험번호 색인 만들기")
+    parser.add_argument('--lookup', help="결과를 찾을 수험번호")
+    args = parser.parse_args()
+
+    from export import init_firestore
+    db = init_firestore(args.credentials)
+    if args.rebuild_index:
+        print(f"수험번호 {rebuild_index(db)}개의 색인을 만들었습니다.")
+    if args.lookup:
+        doc = lookup_result(db, args.lookup)
+        if doc is None:
+            print(f"{args.lookup}: 결과 없음")
+        else:
+            data = doc.to_dict()
+            print(f"{args.lookup}: {doc.id} ({data.get('name_enc')}, 총점 {data.get('total_score')})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+"""결과 내보내기 (페이지 단위 커서 조회 + 행 단위 스트리밍 기록)
+
+    python export.py --credentials firebase_key.json --format csv results.csv
+    python export.py --credentials firebase_key.json --since 2025-03-01 --format jsonl results.jsonl
+    python export.py --credentials firebase_key.json --incremental results.csv   # 지난 내보내기 이후 기록된 결과
+
+증분 내보내기는 제출 시각(`timestamp`)이 아니라 결과 문서가 마지막으로 기록된 서버 시각
+(`updated_at`) 기준이다. 결과는 제출보다 늦게 기록될 수 있고 (일괄 기록 주기, 재시도,
+재시작 후 복구), 기록된 뒤에도 쓰기 채점 / 재채점으로 점수가 바뀐다. 제출 시각이나 처음
+기록된 시각(`stored_at`) 기준이면 늦게 기록되거나 내보낸 뒤에 바뀐 결과를 영영 건너뛰게 된다.
+바뀐 결과는 다음 증분 내보내기에 다시 나오므로, 받는 쪽은 doc_id 기준으로 덮어써야 한다.
+"""
+import argparse
+import csv
+import datetime
+import json
+
+from item_details import unpack_details
+
+# --- [설정] 내보내기 ---
+RESULTS_COLLECTION = 'korean_test_results'
+EXPORT_STATE_DOCUMENT = ('config', 'export_state')
+WATERMARK_FIELD = 'updated_at'  # 증분 내보내기 기준 필드 (결과 문서를 기록할 때마다 서버 시각)
+EXPORT_PAGE_SIZE = 500
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+MAX_ITEMS = 39  # 객관식 문항 수
+
+BASE_COLUMNS = [
+    "doc_id", "timestamp", "name_enc", "univ_enc", "email",
+    "total_score", "max_score", "score_grammar", "score_vocab", "score_reading", "score_writing",
+    "duration_sec", "writing_status", "writing_qid", "writing_original",
+    "test_mode", "theta", "theta_se", "bank_version",
+]
+WRITING_COLUMNS = [
+    "writing_score", "writing_content", "writing_structure", "writing_grammar",
+    "writing_feedback", "writing_correction",
+]
+ITEM_FIELDS = ["id", "type", "ans", "choice", "correct", "score", "sec"]
+ITEM_COLUMNS = [f"item{i:02d}_{field}" for i in range(1, MAX_ITEMS + 1) for field in ITEM_FIELDS]
+EXPORT_COLUMNS = BASE_COLUMNS + WRITING_COLUMNS + ITEM_COLUMNS
+
+
+def init_firestore(key_path):
+    """서비스 계정 키 파일로 Firestore 클라이언트 생성 (CLI용)"""
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(key_path))
+    return firestore.client()
+
+
+def iter_result_docs(db, since=None, until=None, page_size=EXPORT_PAGE_SIZE, field='timestamp'):
+    """field(기본 timestamp) 순으로 결과 문서를 페이지 단위로 조회 (한 페이지만 메모리에 유지)"""
+    query = db.collection(RESULTS_COLLECTION)
+    if since is not None:
+        query = query.where(field, '>', since)
+    if until is not None:
+        query = query.where(field, '<', until)
+    query = query.order_by(field)
+
+    last_doc = None
+    while True:
+        page_query = query.limit(page_size)
+        if last_doc is not None:
+            page_query = page_query.start_after(last_doc)
+        docs = list(page_query.stream())
+        yield from docs
+        if len(docs) < page_size:
+            return
+        last_doc = docs[-1]
+
+
+def unflatten_details(row):
+    """내보낸 행의 item 열들을 {문항ID: 결과} dict로 복원"""
+    details = {}
+    for i in range(1, MAX_ITEMS + 1):
+        prefix = f"item{i:02d}_"
+        qid = row.get(prefix + "id")
+        if not qid:
+            continue
+        choice = row.get(prefix + "choice")
+        details[qid] = {
+            "type": row.get(prefix + "type"),
+            "user_ans": row.get(prefix + "ans"),
+            "choice": int(choice) if choice not in (None, "") else None,
+            "correct": row.get(prefix + "correct") in (True, "True"),
+            "score_earned": int(row.get(prefix + "score") or 0),
+        }
+    return details
+
+
+def _iso(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def flatten_result(doc_id, data, question_bank=None):
+    """결과 문서 1건을 EXPORT_COLUMNS 기준의 평평한 행으로 변환
+
+    question_bank가 주어지면 문항 영역과 고른 보기 문자열을 채워 넣는다.
+    """
+    row = {col: data.get(col) for col in BASE_COLUMNS}
+    row["doc_id"] = doc_id
+    row["timestamp"] = _iso(data.get("timestamp"))
+
+    wa = data.get("writing_analysis") or {}
+    breakdown = wa.get("breakdown") or {}
+    row.update({
+        "writing_score": wa.get("score"),
+        "writing_content": breakdown.get("content"),
+        "writing_structure": breakdown.get("structure"),
+        "writing_grammar": breakdown.get("grammar"),
+        "writing_feedback": wa.get("feedback"),
+        "writing_correction": wa.get("correction"),
+    })
+
+    for i, (qid, item) in enumerate(unpack_details(data).items(), start=1):
+        if i > MAX_ITEMS:
+            break
+        prefix = f"item{i:02d}_"
+        q = question_bank.by_id.get(qid) if question_bank else None
+        choice = item.get("choice")
+        row[prefix + "id"] = qid
+        row[prefix + "type"] = item.get("type") or (q and q.get('type'))
+        row[prefix + "ans"] = item.get("user_ans")
+        if row[prefix + "ans"] is None and q and choice is not None and 0 <= choice < len(q['options']):
+            row[prefix + "ans"] = q['options'][choice]
+        row[prefix + "choice"] = choice
+        row[prefix + "correct"] = item.get("correct")
+        row[prefix + "score"] = item.get("score_earned")
+        row[prefix + "sec"] = item.get("sec")
+    return row
+
+
+# --- 형식별 기록기 (행 단위로 바로 기록) ---
+class CsvWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, row):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, row):
+        self._file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """pyarrow가 설치된 경우에만 사용 가능 (행을 묶어 row group 단위로 기록)"""
+
+    def __init__(self, path, batch_size=EXPORT_PAGE_SIZE):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._schema = pa.schema([(col, pa.string()) for col in EXPORT_COLUMNS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._batch_size = batch_size
+        self._rows = []
+
+    def write(self, row):
+        self._rows.append({col: None if row.get(col) is None else str(row.get(col)) for col in EXPORT_COLUMNS})
+        if len(self._rows) >= self._batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+
+# --- 증분 내보내기 상태 ---
+def get_last_export_time(db):
+    """지난 증분 내보내기의 기준 시각 (없거나 다른 필드 기준으로 저장된 값이면 None -> 전체 내보내기)"""
+    doc = db.collection(EXPORT_STATE_DOCUMENT[0]).document(EXPORT_STATE_DOCUMENT[1]).get()
+    if doc.exists:
+        data = doc.to_dict()
+        if data.get('watermark_field') == WATERMARK_FIELD:
+            return data.get('last_exported_at')
+    return None
+
+
+def set_last_export_time(db, exported_at):
+    db.collection(EXPORT_STATE_DOCUMENT[0]).document(EXPORT_STATE_DOCUMENT[1]).set(
+        {'last_exported_at': exported_at, 'watermark_field': WATERMARK_FIELD}, merge=True)
+
+
+def export_results(db, path, fmt='csv', since=None, until=None, incremental=False,
+                   page_size=EXPORT_PAGE_SIZE, question_bank=None, advance_watermark=True):
+    """결과를 파일로 내보내고 (기록 행 수, 마지막 timestamp, 새 기준 시각)을 반환
+
+    incremental=True이면 지난 내보내기 이후에 기록되거나 바뀐(updated_at) 결과만 내보내고 기준
+    시각을 갱신한다. 이때 since/until(제출 시각 기준)은 조회한 문서에서 걸러낸다.
+    advance_watermark=False이면 기준 시각은 갱신하지 않고 돌려주기만 한다 (파일을 실제로
+    전달한 뒤 호출한 쪽이 `set_last_export_time`으로 갱신).
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+    last_export = get_last_export_time(db) if incremental else None
+    if last_export is not None:
+        docs = iter_result_docs(db, since=last_export, page_size=page_size, field=WATERMARK_FIELD)
+    else:
+        # 첫 증분 내보내기는 전체 (updated_at이 없는 예전 결과 포함)
+        docs = iter_result_docs(db, since=since, until=until, page_size=page_size)
+
+    writer = WRITERS[fmt](path)
+    count = 0
+    last_timestamp = watermark = None
+    try:
+        for doc in docs:
+            data = doc.to_dict()
+            timestamp = data.get('timestamp')
+            if since is not None and (timestamp is None or timestamp <= since):
+                continue
+            if until is not None and (timestamp is None or timestamp >= until):
+                continue
+            writer.write(flatten_result(doc.id, data, question_bank))
+            count += 1
+            last_timestamp = timestamp or last_timestamp
+            updated_at = data.get(WATERMARK_FIELD)
+            if updated_at is not None and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+    finally:
+        writer.close()
+
+    if not incremental:
+        watermark = None
+    if advance_watermark and watermark is not None:
+        set_last_export_time(db, watermark)
+    return count, last_timestamp, watermark
+
+
+def _parse_date(value):
+    return datetime.datetime.fromisoformat(value).replace(tzinfo=datetime.timezone.utc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="korean_test_results 내보내기")
+    parser.add_argument('output')
+    parser.add_argument('--credentials', required=True, help="Firebase 서비스 계정 키(JSON) 경로")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--since', type=_parse_date, help="이 시각 이후 결과만 (ISO 8601, UTC)")
+    parser.add_argument('--until', type=_parse_date, help="이 시각 이전 결과만 (ISO 8601, UTC)")
+    parser.add_argument('--incremental', action='store_true', help="지난 내보내기 이후 결과만")
+    parser.add_argument('--page-size', type=int, default=EXPORT_PAGE_SIZE)
+    parser.add_argument('--problems', default='problems.json', help="문항 영역/보기 문자열을 채울 문제 파일")
+    args = parser.parse_args()
+
+    from question_bank import QuestionBank
+    db = init_firestore(args.credentials)
+    count, last_timestamp, _ = export_results(
+        db, args.output, fmt=args.format, since=args.since, until=args.until,
+        incremental=args.incremental, page_size=args.page_size,
+        question_bank=QuestionBank.from_file(args.problems))
+    print(f"{count}건 내보냄 -> {args.output} (마지막 timestamp: {_iso(last_timestamp)})")
+
+
+if __name__ == '__main__':
+    main()
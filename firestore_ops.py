@@ -0,0 +1,44 @@
+"""Firestore / 메모리 DB 공통 연산 (트랜잭션 실행, 특수 값)
+
+결과 저장, 집계, 수험번호 발급이 운영 Firestore와 메모리 DB(`memory_store`) 어느 쪽에서도
+같은 코드로 돌도록, 클라이언트 종류에 따라 갈리는 부분만 모아 둔다. 메모리 DB를 쓰지
+않으면 `memory_store`를 불러오지 않는다.
+"""
+import sys
+
+
+def _memory_store():
+    """이미 import 된 memory_store 모듈 (없으면 None: 메모리 DB 객체가 만들어졌을 리 없음)"""
+    return sys.modules.get('memory_store')
+
+
+def run_transaction(db, func, *args):
+    """func(transaction, *args)를 트랜잭션으로 실행하고 반환값을 돌려줌
+
+    Firestore면 firestore.transactional(읽은 문서가 바뀌면 func 재실행)을, 메모리 DB면
+    memory_store의 대체 구현을 쓴다. func는 재실행될 수 있으므로 트랜잭션 밖의 상태를
+    바꾸지 않아야 한다.
+    """
+    memory_store = _memory_store()
+    if memory_store is not None and isinstance(db, memory_store.MemoryFirestore):
+        return memory_store.transactional(func)(db.transaction(), *args)
+    from google.cloud import firestore
+    return firestore.transactional(func)(db.transaction(), *args)
+
+
+def increment(value):
+    """필드 값을 value만큼 올리는 특수 값 (google-cloud-firestore가 없으면 메모리 DB용)"""
+    try:
+        from google.cloud.firestore_v1.transforms import Increment
+    except ImportError:
+        from memory_store import Increment
+    return Increment(value)
+
+
+def server_timestamp():
+    """기록 시점의 서버 시각 특수 값 (google-cloud-firestore가 없으면 메모리 DB용)"""
+    try:
+        from google.cloud.firestore_v1.transforms import SERVER_TIMESTAMP
+    except ImportError:
+        from memory_store import SERVER_TIMESTAMP
+    return SERVER_TIMESTAMP
@@ -0,0 +1,206 @@
+import json
+import hashlib
+import math
+import re
+import threading
+import time
+
+# --- [설정] 쓰기 채점 ---
+WRITING_MODEL_NAME = 'gemini-flash-latest'
+WRITING_MAX_SCORE = 13
+# 채점 프롬프트/기준을 바꾸면 올린다 (쓰기 채점 캐시 키에 포함)
+WRITING_RUBRIC_VERSION = '2024-1'
+WRITING_BREAKDOWN_MAX = {"content": 5, "structure": 4, "grammar": 4}
+DEFAULT_WRITING_QUESTION = "그래프 해석"  # 시험지에 쓰기 문항이 없을 때 채점 프롬프트에 넣는 문제
+
+
+def default_writing_analysis(feedback="답안이 없습니다."):
+    """채점 결과가 없을 때 사용하는 기본 분석 결과"""
+    return {
+        "score": 0,
+        "breakdown": {"content": 0, "structure": 0, "grammar": 0},
+        "feedback": feedback,
+        "correction": ""
+    }
+
+
+def build_writing_prompt(question_text, user_writing):
+    """쓰기 채점용 프롬프트 생성"""
+    return f"""
+    당신은 한국어 능력 시험(TOPIK) 전문 채점관입니다.
+    아래 학생의 쓰기 답안을 3~4급 수준을 기준으로 평가하고, JSON 포맷으로 출력하세요.
+
+    [문제] {question_text}
+    [학생 답안] {user_writing}
+    [평가 기준 (총 13점)]
+    1. 내용(5점), 2. 구성(4점), 3. 언어(4점)
+
+    [출력 포맷 (JSON)]
+    {{
+        "score": <총점 숫자 0~13>,
+        "breakdown": {{ "content": <0~5>, "structure": <0~4>, "grammar": <0~4> }},
+        "feedback": "<피드백 한 문단>",
+        "correction": "<교정본>"
+    }}
+    """
+
+
+class WritingResponseError(ValueError):
+    """모델 응답에서 채점 결과를 찾을 수 없음"""
+
+
+def _json_candidates(text):
+    """텍스트 안의 균형 잡힌 {...} 구간을 앞에서부터 차례로 돌려줌 (문자열 안의 괄호는 무시)"""
+    start = text.find('{')
+    while start != -1:
+        depth = 0
+        in_string = False
+        escaped = False
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == '\\':
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == '{':
+                depth += 1
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    yield text[start:i + 1]
+                    break
+        else:
+            # 닫히지 않은 객체 (응답이 중간에 끊김): 모자란 괄호를 채워서 시도
+            if not in_string:
+                yield text[start:] + '}' * depth
+        start = text.find('{', start + 1)
+
+
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+
+def extract_json_object(response_text):
+    """모델 응답(앞뒤 설명, 코드 펜스 포함 가능)에서 채점 결과 JSON 객체를 찾아 dict로 변환"""
+    for candidate in _json_candidates(response_text or ''):
+        for attempt in (candidate, _TRAILING_COMMA.sub(r'\1', candidate)):
+            try:
+                data = json.loads(attempt, strict=False)
+            except ValueError:
+                continue
+            if isinstance(data, dict) and ('score' in data or 'breakdown' in data):
+                return data
+    raise WritingResponseError(f"채점 결과 JSON을 찾을 수 없습니다: {(response_text or '')[:80]!r}")
+
+
+def _clamped_int(value, upper):
+    try:
+        number = float(str(value).split('/')[0].strip()) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(number):
+        return None
+    return max(0, min(upper, int(round(number))))
+
+
+def validate_writing_analysis(data):
+    """채점 결과 dict를 스키마에 맞게 정리 (점수는 13/5/4/4 범위로 제한)
+
+    세부 점수가 모두 있으면 총점은 세부 점수의 합으로 맞춘다.
+    총점과 세부 점수가 모두 없으면 WritingResponseError.
+    """
+    raw_breakdown = data.get('breakdown')
+    if not isinstance(raw_breakdown, dict):
+        raw_breakdown = {}
+    breakdown = {
+        field: _clamped_int(raw_breakdown.get(field), upper)
+        for field, upper in WRITING_BREAKDOWN_MAX.items()
+    }
+    score = _clamped_int(data.get('score'), WRITING_MAX_SCORE)
+    if all(value is not None for value in breakdown.values()):
+        score = sum(breakdown.values())
+    elif score is None:
+        raise WritingResponseError("채점 결과에 점수가 없습니다.")
+    return {
+        "score": score,
+        "breakdown": {field: value or 0 for field, value in breakdown.items()},
+        "feedback": _text(data.get('feedback')),
+        "correction": _text(data.get('correction')),
+    }
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def parse_writing_response(response_text):
+    """모델 응답 텍스트를 채점 결과 dict로 변환 (JSON 추출 + 스키마 검증)"""
+    return validate_writing_analysis(extract_json_object(response_text))
+
+
+class GeminiGrader:
+    """Gemini 모델을 이용한 쓰기 채점기"""
+
+    def __init__(self, model_name=WRITING_MODEL_NAME):
+        self.model_name = model_name
+
+    def grade(self, question_text, user_writing):
+        import google.generativeai as genai
+        model = genai.GenerativeModel(
+            self.model_name,
+            generation_config={"response_mime_type": "application/json"},
+        )
+        response = model.generate_content(build_writing_prompt(question_text, user_writing))
+        return parse_writing_response(response.text)
+
+
+class FakeGrader:
+    """네트워크 없이 동작하는 로컬 가짜 채점기 (오프라인 테스트용)
+
+    답안 길이와 내용 해시로 결정적인 점수를 만든다. `delay_sec`로 모델 지연을,
+    `fail_every`로 n번째 호출마다 실패를 흉내낼 수 있다.
+    """
+
+    model_name = 'fake-grader'
+
+    def __init__(self, delay_sec=0.0, fail_every=0):
+        self.delay_sec = delay_sec
+        self.fail_every = fail_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def grade(self, question_text, user_writing):
+        with self._lock:
+            self.calls += 1
+            call_no = self.calls
+        if self.delay_sec:
+            time.sleep(self.delay_sec)
+        if self.fail_every and call_no % self.fail_every == 0:
+            raise RuntimeError("가짜 채점기 실패 (의도된 오류)")
+
+        digest = hashlib.sha256(user_writing.encode('utf-8')).digest()
+        length_ratio = min(len(user_writing.strip()) / 300, 1.0)
+        content = round(5 * length_ratio)
+        structure = min(4, round(4 * length_ratio) + digest[0] % 2) if content else 0
+        grammar = min(4, round(3 * length_ratio) + digest[1] % 2) if content else 0
+        return {
+            "score": content + structure + grammar,
+            "breakdown": {"content": content, "structure": structure, "grammar": grammar},
+            "feedback": "로컬 가짜 채점기로 채점된 결과입니다.",
+            "correction": user_writing
+        }
+
+
+def make_grader(backend='gemini', **kwargs):
+    """설정값에 따라 채점기 생성 ('gemini' 또는 'fake')"""
+    if backend == 'fake':
+        return FakeGrader(**kwargs)
+    if backend == 'gemini':
+        return GeminiGrader(**kwargs)
+    raise ValueError(f"알 수 없는 채점기: {backend}")
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from grading import WRITING_RUBRIC_VERSION
+import metrics
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_writing(text):
+    """캐시 키용 답안 정규화 (유니코드 NFC, 앞뒤 공백 제거, 연속 공백/줄바꿈은 공백 하나로)"""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFC', text or '')).strip()
+
+
+def grading_cache_key(model_name, rubric_version, question_text, user_writing):
+    """(모델, 채점 기준 버전, 문제, 정규화된 답안)의 SHA-256"""
+    payload = json.dumps(
+        [model_name, rubric_version, question_text, normalize_writing(user_writing)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class GradingCache:
+    """쓰기 채점 결과 캐시 (메모리 LRU + 선택적 SQLite 파일)
+
+    같은 답안을 다시 채점할 때(시간 초과 후 재시도, 새로고침 후 재제출, 관리자 재채점)
+    모델을 다시 부르지 않고 이전 결과를 그대로 돌려준다. `path`를 주면 프로세스를
+    다시 시작해도 결과가 남는다.
+    """
+
+    def __init__(self, max_entries=1024, path=None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS grading_cache (key TEXT PRIMARY KEY, result TEXT NOT NULL)")
+            self._conn.commit()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key):
+        """캐시된 채점 결과 (없으면 None)"""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return json.loads(result)
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT result FROM grading_cache WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self._remember(key, row[0])
+                    self.stats["hits"] += 1
+                    self.stats["disk_hits"] += 1
+                    return json.loads(row[0])
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, result):
+        # 호출한 쪽이 결과 dict를 고쳐도 캐시가 바뀌지 않도록 JSON 문자열로 보관
+        encoded = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, encoded)
+            self.stats["stores"] += 1
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO grading_cache (key, result) VALUES (?, ?)", (key, encoded))
+                self._conn.commit()
+
+    def _remember(self, key, encoded):
+        self._entries[key] = encoded
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def hit_rate(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class CachedGrader:
+    """채점기 앞에 GradingCache를 둔 래퍼 (실패한 채점은 캐시하지 않음)"""
+
+    def __init__(self, grader, cache, rubric_version=WRITING_RUBRIC_VERSION):
+        self.grader = grader
+        self.cache = cache
+        self.rubric_version = rubric_version
+        self.model_name = grader.model_name
+
+    def grade(self, question_text, user_writing):
+        key = grading_cache_key(self.model_name, self.rubric_version, question_text, user_writing)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        with metrics.span('model.grade'):
+            metrics.count('external_calls', service='model')
+            result = self.grader.grade(question_text, user_writing)
+        self.cache.put(key, result)
+        return result
@@ -0,0 +1,372 @@
+from collections import OrderedDict
+import heapq
+import itertools
+import queue
+import random
+import threading
+import time
+
+import aggregates
+from grading import default_writing_analysis
+import metrics
+
+# --- [설정] 채점 작업 큐 ---
+JOBS_COLLECTION = 'grading_jobs'
+RESULTS_COLLECTION = 'korean_test_results'
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+LEASE_SEC = 300  # 작업을 가져간 프로세스가 처리 중으로 보는 시간
+
+
+def job_is_live(job, now=None, lease_sec=LEASE_SEC):
+    """어느 프로세스의 채점 큐가 아직 처리하고 있을 작업인지 (grading_jobs 문서 dict)
+
+    실행 중이면 임대 시간이 남았을 때, 대기 중이면 다음 시도 시각이 아직 오지 않았거나
+    지난 지 임대 시간이 안 되었을 때 (워커를 기다리는 중) 처리 중으로 본다.
+    """
+    now = time.time() if now is None else now
+    if job.get('status') == STATUS_RUNNING:
+        return job.get('leased_until', 0) > now
+    if job.get('status') == STATUS_PENDING:
+        return job.get('next_attempt_at', 0) + lease_sec > now
+    return False
+
+
+def new_job(result_id, question_text, user_writing):
+    """grading_jobs 문서로 기록할 새 채점 작업"""
+    return {
+        "result_id": result_id,
+        "question_text": question_text,
+        "user_writing": user_writing,
+        "status": STATUS_PENDING,
+        "attempts": 0,
+        "next_attempt_at": time.time(),
+        "last_error": "",
+    }
+
+
+def add_job_to_batch(batch, db, job):
+    """채점 작업 문서를 기록하도록 batch(트랜잭션)에 추가 (쓰기 1건, ResultStore가 결과와 함께 기록)"""
+    batch.set(db.collection(JOBS_COLLECTION).document(job["result_id"]), job)
+
+
+class GradingQueue:
+    """쓰기 채점을 비동기로 처리하는 작업 큐
+
+    작업은 Firestore `grading_jobs` 컬렉션에 먼저 기록된 뒤(영속성) 프로세스 내
+    큐에 들어가고, 고정 개수의 워커 스레드가 꺼내 처리한다. 워커 수가 곧 모델
+    동시 호출 상한이다. 실패한 작업은 지수 백오프(+지터)로 재시도하며, 결과는
+    `korean_test_results` 문서에 다시 기록된다. 프로세스 재시작 시 완료되지 않은
+    작업은 `start()`에서 복구된다.
+
+    응시 화면의 작업은 `submit(hold=True)`로 메모리에만 등록한다 (DB 호출 없음). 작업 문서는
+    ResultStore가 결과 문서와 같은 트랜잭션에 기록하고 (`add_job_to_batch`), 그 기록 알림
+    (`release()`)이 오면 큐에 넣는다. 그래도 결과 문서가 없으면 채점 결과를 들고 기다렸다가
+    다시 쓰며, 이 대기는 채점 시도 횟수에 넣지 않는다. 대기가 max_result_waits회를 넘으면
+    (결과가 기록될 서버의 WAL이 사라진 경우 등) 작업을 실패로 기록해 재시작 때마다 되살아나지 않게 한다.
+    재시도 / 대기 / hold 만료 예약은 작업마다 스레드를 띄우지 않고 예약 스레드 1개가 힙으로 처리한다.
+    """
+
+    def __init__(self, db, grader, max_workers=4, max_attempts=5,
+                 base_delay_sec=2.0, max_delay_sec=60.0, lease_sec=LEASE_SEC,
+                 finished_cache_size=2000, hold_timeout_sec=120.0, max_result_waits=20):
+        self.db = db
+        self.grader = grader
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.base_delay_sec = base_delay_sec
+        self.max_delay_sec = max_delay_sec
+        self.lease_sec = lease_sec
+        self.finished_cache_size = finished_cache_size
+        self.hold_timeout_sec = hold_timeout_sec
+        self.max_result_waits = max_result_waits
+
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._finished = OrderedDict()  # 최근 완료된 작업 결과 (결과 화면 폴링용)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stopped = threading.Event()
+        self._timers = []  # (실행 시각, 순번, 함수, 인자) 힙
+        self._timer_cond = threading.Condition()
+        self._timer_seq = itertools.count()
+
+    # --- 생명주기 ---
+    def start(self):
+        """워커 스레드를 띄우고 남아 있는 작업을 복구 (복구는 예약 스레드에서, 호출한 쪽은 기다리지 않음)"""
+        if self._threads:
+            return
+        for i in range(self.max_workers):
+            t = threading.Thread(target=self._worker, name=f"grading-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._scheduler, name="grading-scheduler", daemon=True)
+        t.start()
+        self._threads.append(t)
+        self._call_later(0, self.recover)
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        with self._timer_cond:
+            self._timer_cond.notify_all()
+        for _ in range(self.max_workers):
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def recover(self):
+        """DB에 남아 있는 미완료 작업을 다시 큐에 넣음"""
+        now = time.time()
+        try:
+            docs = self.db.collection(JOBS_COLLECTION).where(
+                'status', 'in', [STATUS_PENDING, STATUS_RUNNING]).stream()
+            for doc in docs:
+                job = doc.to_dict()
+                # 다른 프로세스가 처리 중인 작업은 임대 시간이 지났을 때만 가져옴
+                if job.get('status') == STATUS_RUNNING and job.get('leased_until', 0) > now:
+                    continue
+                job['job_id'] = doc.id
+                self._enqueue(job, delay=max(0.0, job.get('next_attempt_at', now) - now))
+        except Exception as e:
+            print(f"채점 작업 복구 오류: {e}")
+
+    # --- 작업 제출 / 조회 ---
+    def submit(self, result_id, question_text, user_writing, hold=False):
+        """결과 문서 ID에 대한 쓰기 채점 작업 등록 (이미 등록된 ID면 무시)
+
+        hold: 작업 문서는 ResultStore가 결과와 함께 기록하므로 메모리에만 등록하고, `release()`가
+        불릴 때까지 대기 (DB 호출 없음). 알림을 놓쳐도 hold_timeout_sec마다 작업 문서를 확인한다.
+        hold가 아니면 작업 문서를 바로 기록하고 큐에 넣는다.
+        """
+        with self._lock:
+            if result_id in self._jobs or result_id in self._finished:
+                return result_id
+        job = new_job(result_id, question_text, user_writing)
+        if not hold:
+            self.db.collection(JOBS_COLLECTION).document(result_id).set(job)
+        job['job_id'] = result_id
+        if hold:
+            job['held'] = True
+            with self._lock:
+                self._jobs[result_id] = job
+            self._call_later(self.hold_timeout_sec, self._hold_expired, result_id)
+        else:
+            self._enqueue(job)
+        return result_id
+
+    def release(self, result_ids):
+        """결과 문서가 기록된 작업을 큐에 넣음 (ResultStore 기록 알림)
+
+        hold 된 작업은 바로 큐에 넣는다. 모르는 ID(재시작 후 WAL에서 복구되어 기록된 결과,
+        submit보다 먼저 온 알림)는 작업 문서가 대기 중이면 가져와 큐에 넣는다.
+        """
+        unknown = []
+        for result_id in result_ids:
+            with self._lock:
+                job = self._jobs.get(result_id)
+                if job is None and result_id not in self._finished:
+                    unknown.append(result_id)
+                if job is None or not job.pop('held', False):
+                    continue
+            self._queue.put(result_id)
+        if unknown:
+            references = [self.db.collection(JOBS_COLLECTION).document(result_id) for result_id in unknown]
+            for snapshot in self.db.get_all(references):
+                job = snapshot.to_dict() if snapshot.exists else None
+                if job is None or job.get('status') != STATUS_PENDING:
+                    continue
+                with self._lock:
+                    if snapshot.id in self._jobs or snapshot.id in self._finished:
+                        continue
+                job['job_id'] = snapshot.id
+                self._enqueue(job)
+
+    def _hold_expired(self, result_id):
+        """hold 시간이 지남: 작업 문서가 기록되었으면 (알림을 놓침) 큐에 넣고, 아니면 다시 대기"""
+        with self._lock:
+            job = self._jobs.get(result_id)
+            if job is None or not job.get('held'):
+                return
+        try:
+            stored = self.db.collection(JOBS_COLLECTION).document(result_id).get().exists
+        except Exception as e:
+            print(f"채점 작업 확인 오류 ({result_id}): {e}")
+            stored = False
+        if stored:
+            self.release([result_id])
+        else:
+            # 결과가 아직 기록되지 않음 (DB 장애 등): 결과 기록 알림 또는 다음 확인까지 대기
+            self._call_later(self.hold_timeout_sec, self._hold_expired, result_id)
+
+    def get_status(self, result_id):
+        """작업 상태와 (완료 시) 분석 결과를 반환"""
+        with self._lock:
+            job = self._jobs.get(result_id) or self._finished.get(result_id)
+            if job is not None:
+                return job['status'], job.get('writing_analysis')
+        doc = self.db.collection(RESULTS_COLLECTION).document(result_id).get()
+        if not doc.exists:
+            return STATUS_PENDING, None
+        data = doc.to_dict()
+        return data.get('writing_status', STATUS_DONE), data.get('writing_analysis')
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._jobs)
+
+    # --- 내부 처리 ---
+    def _enqueue(self, job, delay=0.0):
+        with self._lock:
+            self._jobs[job['job_id']] = job
+        if delay > 0:
+            self._call_later(delay, self._queue.put, job['job_id'])
+        else:
+            self._queue.put(job['job_id'])
+
+    def _call_later(self, delay, func, *args):
+        """delay초 뒤에 예약 스레드에서 func(*args) 실행"""
+        with self._timer_cond:
+            heapq.heappush(self._timers, (time.monotonic() + delay, next(self._timer_seq), func, args))
+            self._timer_cond.notify()
+
+    def _scheduler(self):
+        while True:
+            with self._timer_cond:
+                while not self._stopped.is_set():
+                    wait = self._timers[0][0] - time.monotonic() if self._timers else None
+                    if wait is not None and wait <= 0:
+                        break
+                    self._timer_cond.wait(wait)
+                if self._stopped.is_set():
+                    return
+                _, _, func, args = heapq.heappop(self._timers)
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"채점 작업 예약 실행 오류: {e}")
+
+    def _backoff(self, attempts):
+        delay = min(self.max_delay_sec, self.base_delay_sec * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _worker(self):
+        while not self._stopped.is_set():
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            with self._lock:
+                job = self._jobs.get(job_id)
+            if job is None or job['status'] in (STATUS_DONE, STATUS_FAILED):
+                continue
+            with metrics.span('grading.job'):
+                self._run(job)
+            if job['status'] in (STATUS_DONE, STATUS_FAILED):
+                self._finish(job)
+
+    def _finish(self, job):
+        """완료된 작업을 활성 목록에서 빼고, 제한된 크기의 완료 캐시에 보관"""
+        with self._lock:
+            self._jobs.pop(job['job_id'], None)
+            self._finished[job['job_id']] = {
+                "status": job['status'],
+                "writing_analysis": job.get('writing_analysis'),
+            }
+            while len(self._finished) > self.finished_cache_size:
+                self._finished.popitem(last=False)
+
+    def _run(self, job):
+        job_ref = self.db.collection(JOBS_COLLECTION).document(job['job_id'])
+        job['status'] = STATUS_RUNNING
+        graded = job.get('graded')  # (분석 결과, 상태): 채점은 끝났고 결과 문서 기록만 남은 경우
+        if graded is None:
+            job['attempts'] += 1
+        try:
+            job_ref.update({
+                "status": STATUS_RUNNING,
+                "attempts": job['attempts'],
+                "leased_until": time.time() + self.lease_sec,
+            })
+            if graded is None:
+                graded = job['graded'] = (self.grader.grade(job['question_text'], job['user_writing']), STATUS_DONE)
+            if not self._write_back(job, *graded):
+                self._wait_for_result(job, job_ref)
+                return
+            job_ref.update({"status": graded[1], "last_error": ""})
+            job['writing_analysis'], job['status'] = graded
+        except Exception as e:
+            print(f"쓰기 채점 오류 ({job['job_id']}, {job['attempts']}회차): {e}")
+            metrics.count('errors', stage='grading.job')
+            if job.get('graded') is None and job['attempts'] >= self.max_attempts:
+                analysis = default_writing_analysis("채점 중 오류가 발생했습니다.")
+                try:
+                    if not self._write_back(job, analysis, STATUS_FAILED):
+                        job['graded'] = (analysis, STATUS_FAILED)
+                        self._wait_for_result(job, job_ref)
+                        return
+                    job_ref.update({"status": STATUS_FAILED, "last_error": str(e)})
+                except Exception as write_error:
+                    print(f"채점 실패 기록 오류 ({job['job_id']}): {write_error}")
+                job['writing_analysis'] = analysis
+                job['status'] = STATUS_FAILED
+                metrics.count('grading_failed')
+                return
+            if job.get('graded') is None:
+                delay = self._backoff(job['attempts'])
+            else:
+                # 채점이 끝난 뒤의 기록 실패는 채점을 다시 하지 않고 기록만 재시도
+                job['waits'] = job.get('waits', 0) + 1
+                delay = self._backoff(job['waits'])
+            job['status'] = STATUS_PENDING
+            job['next_attempt_at'] = time.time() + delay
+            try:
+                job_ref.update({
+                    "status": STATUS_PENDING,
+                    "next_attempt_at": job['next_attempt_at'],
+                    "last_error": str(e),
+                })
+            except Exception:
+                pass
+            self._enqueue(job, delay=delay)
+
+    def _wait_for_result(self, job, job_ref):
+        """결과 문서가 아직 없음: 시도 횟수를 쓰지 않고 백오프 후 기록만 다시 시도
+
+        대기 횟수는 작업 문서에도 남기므로 재시작해도 이어서 센다. max_result_waits회를 넘으면
+        작업을 실패로 기록하고 끝낸다 (결과 문서가 없어 결과에는 기록할 수 없음).
+        """
+        job['waits'] = job.get('waits', 0) + 1
+        metrics.count('grading_result_waits')
+        if job['waits'] > self.max_result_waits:
+            print(f"쓰기 채점 결과를 기록할 결과 문서 없음 ({job['job_id']}, {job['waits'] - 1}회 대기): 실패 처리")
+            job['status'] = STATUS_FAILED
+            job['writing_analysis'] = default_writing_analysis("채점 결과를 기록할 결과 문서를 찾지 못했습니다.")
+            metrics.count('grading_failed')
+            try:
+                job_ref.update({"status": STATUS_FAILED, "waits": job['waits'], "last_error": "결과 문서 없음"})
+            except Exception as e:
+                print(f"채점 실패 기록 오류 ({job['job_id']}): {e}")
+            return
+        delay = self._backoff(job['waits'])
+        job['status'] = STATUS_PENDING
+        job['next_attempt_at'] = time.time() + delay
+        try:
+            job_ref.update({"status": STATUS_PENDING, "next_attempt_at": job['next_attempt_at'], "waits": job['waits']})
+        except Exception:
+            pass
+        self._enqueue(job, delay=delay)
+
+    def _write_back(self, job, analysis, status):
+        """결과 문서에 채점 결과 기록 (결과 문서가 아직 없으면 False)"""
+        # 집계 변경분과 총점은 저장된 결과 문서 기준 (복구된 작업이나 재채점된 결과를 다시 써도
+        # 한 번만 반영되고, 그 사이 재채점된 객관식 점수를 되돌리지 않음)
+        update = {
+            "writing_analysis": analysis,
+            "writing_status": status,
+            "score_writing": analysis.get("score", 0),
+        }
+        metrics.count('external_calls', service='firestore')
+        return not aggregates.update_results(self.db, {job['result_id']: update})
@@ -0,0 +1,275 @@
+"""문항 분석 (난이도, 변별도, 오답 선택률, 세트별 신뢰도)
+
+    python item_analysis.py --credentials firebase_key.json --out-dir analysis/
+    python item_analysis.py --input results.jsonl --out-dir analysis/   # export.py 결과 (jsonl/csv)
+
+응시자마다 다른 시험지를 받으므로 모든 통계는 해당 문항을 받은 응시자만으로 계산한다.
+- p: 정답률
+- r_pb: 점-이연 상관 (문항 정오 vs 해당 문항을 뺀 나머지 객관식 득점률)
+- 보기별 선택률 / 무응답률
+- KR-20: 세트(SET_A~E) 안의 문항 공분산을 쌍별 가용 자료로 추정해 계산 (세트 전체 문항 수 기준)
+
+출력: items.csv, summary.json, 난이도-변별도 산점도 / 난이도 분포 / 세트별 보기 선택률 차트 (png)
+"""
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+
+from item_details import ITEMS_FIELD, LEGACY_FIELD, unpack_details
+from question_bank import SET_KEYS
+from scoring import UNANSWERED, AnswerKey
+
+MAX_OPTIONS = 4
+# 차트 범례용 (기본 글꼴에 한글이 없는 환경이 많음)
+TYPE_LABELS = {"문법": "grammar", "어휘": "vocabulary", "읽기": "reading", "문맥": "context"}
+
+
+def build_matrix(key, records):
+    """결과 문서(dict) 목록을 (선택 행렬, 출제 여부 행렬)로 변환
+
+    `items` 배열 형식은 dict로 풀지 않고 행 단위로 바로 채우고, 예전 형식만 unpack_details를 거친다.
+    """
+    column = key.column
+    rows_choice = []
+    rows_cols = []
+    legacy = []
+    for data in records:
+        items = data.get(ITEMS_FIELD)
+        if items:
+            cols = [column.get(qid, -1) for qid in items["qid"]]
+            rows_cols.append(cols)
+            rows_choice.append(items["choice"])
+        else:
+            legacy.append(unpack_details(data))
+
+    matrix, presented = key.choice_matrix(legacy)
+    if not rows_cols:
+        return matrix, presented
+
+    lengths = np.fromiter((len(cols) for cols in rows_cols), dtype=np.int64, count=len(rows_cols))
+    row_index = np.repeat(np.arange(len(rows_cols)), lengths)
+    col_index = np.fromiter((c for cols in rows_cols for c in cols), dtype=np.int64, count=int(lengths.sum()))
+    choices = np.fromiter((c for row in rows_choice for c in row), dtype=np.int8, count=int(lengths.sum()))
+    known = col_index >= 0
+
+    packed = np.full((len(rows_cols), len(key.question_ids)), UNANSWERED, dtype=np.int8)
+    packed_presented = np.zeros(packed.shape, dtype=bool)
+    packed[row_index[known], col_index[known]] = choices[known]
+    packed_presented[row_index[known], col_index[known]] = True
+    return np.vstack([packed, matrix]), np.vstack([packed_presented, presented])
+
+
+def analyze(key, matrix, presented):
+    """문항별 통계와 세트별 KR-20 계산
+
+    반환: (문항 통계 dict 목록, {세트: {"kr20", "items", "examinees"}})
+    """
+    presented_f = presented.astype(np.float32)
+    correct = (matrix == key.answers[np.newaxis, :]) & presented
+    correct_f = correct.astype(np.float32)
+    points = key.points.astype(np.float32)
+
+    n_item = presented_f.sum(axis=0)
+    safe_n = np.where(n_item > 0, n_item, 1)
+    p_value = correct_f.sum(axis=0) / safe_n
+
+    # 나머지 득점률: (총 득점 - 이 문항 득점) / (총 배점 - 이 문항 배점)
+    earned = correct_f * points
+    possible = presented_f * points
+    total_earned = earned.sum(axis=1, keepdims=True)
+    total_possible = possible.sum(axis=1, keepdims=True)
+    rest_possible = total_possible - possible
+    rest = np.divide(total_earned - earned, rest_possible,
+                     out=np.zeros_like(earned), where=rest_possible > 0)
+
+    mean_c = p_value
+    mean_r = (rest * presented_f).sum(axis=0) / safe_n
+    dc = (correct_f - mean_c) * presented_f
+    dr = (rest - mean_r) * presented_f
+    cov = (dc * dr).sum(axis=0) / safe_n
+    std = np.sqrt((dc ** 2).sum(axis=0) / safe_n) * np.sqrt((dr ** 2).sum(axis=0) / safe_n)
+    r_pb = np.divide(cov, std, out=np.full_like(cov, np.nan), where=std > 0)
+
+    # 보기별 선택률 (문항 x 보기), 무응답률
+    option_counts = np.stack(
+        [((matrix == k) & presented).sum(axis=0) for k in range(MAX_OPTIONS)], axis=1)
+    option_rates = option_counts / safe_n[:, np.newaxis]
+    omit_rate = ((matrix == UNANSWERED) & presented).sum(axis=0) / safe_n
+
+    items = []
+    for j, qid in enumerate(key.question_ids):
+        item = {
+            "id": qid,
+            "set": _set_of(qid),
+            "type": key.types[j],
+            "answer": int(key.answers[j]),
+            "n": int(n_item[j]),
+            "p": _round(p_value[j]) if n_item[j] else None,
+            "r_pb": _round(r_pb[j]) if n_item[j] else None,
+            "omit_rate": _round(omit_rate[j]) if n_item[j] else None,
+        }
+        for k in range(MAX_OPTIONS):
+            item[f"option{k + 1}_rate"] = _round(option_rates[j, k]) if n_item[j] else None
+        items.append(item)
+
+    sets = {}
+    item_sets = [_set_of(qid) for qid in key.question_ids]
+    for set_name in SET_KEYS:
+        cols = np.array([j for j, s in enumerate(item_sets) if s == set_name])
+        if cols.size < 2:
+            continue
+        sets[set_name] = {
+            "kr20": _round(_kr20(correct_f[:, cols], presented_f[:, cols])),
+            "items": int(cols.size),
+            "examinees": int((presented_f[:, cols].sum(axis=1) > 0).sum()),
+        }
+    return items, sets
+
+
+def _set_of(qid):
+    """문항 ID 앞 글자로 세트 이름 찾기 (A_01 -> SET_A)"""
+    for set_name in SET_KEYS:
+        if qid.startswith(set_name[-1] + '_'):
+            return set_name
+    return ""
+
+
+def _kr20(correct_f, presented_f):
+    """쌍별 가용 자료로 추정한 문항 공분산 행렬로 KR-20 (= 이분 문항의 alpha) 계산"""
+    pair_n = presented_f.T @ presented_f
+    safe_n = np.where(pair_n > 0, pair_n, 1)
+    sum_both = correct_f.T @ correct_f
+    mean_j_given_l = (correct_f.T @ presented_f) / safe_n
+    cov = sum_both / safe_n - mean_j_given_l * mean_j_given_l.T
+    cov = np.where(pair_n > 1, cov, 0.0)
+    k = cov.shape[0]
+    total_var = cov.sum()
+    if total_var <= 0:
+        return float('nan')
+    return k / (k - 1) * (1 - np.trace(cov) / total_var)
+
+
+def _round(value, digits=4):
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
+
+
+# --- 입력 ---
+def iter_records_from_file(path):
+    """export.py 결과 파일의 각 행을 예전 형식(details_obj) 결과 dict로 변환"""
+    from export import unflatten_details
+    if path.endswith('.csv'):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                yield {LEGACY_FIELD: unflatten_details(row)}
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield {LEGACY_FIELD: unflatten_details(json.loads(line))}
+
+
+def iter_records_from_firestore(db):
+    from export import iter_result_docs
+    for doc in iter_result_docs(db):
+        yield doc.to_dict()
+
+
+# --- 출력 ---
+def write_outputs(items, sets, out_dir, charts=True):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, 'items.csv'), 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(items[0].keys()))
+        writer.writeheader()
+        writer.writerows(items)
+    with open(os.path.join(out_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump({"sets": sets, "items": items}, f, ensure_ascii=False, indent=2)
+    if charts:
+        write_charts(items, out_dir)
+
+
+def write_charts(items, out_dir):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import to_rgba
+
+    rated = [item for item in items if item["p"] is not None and item["r_pb"] is not None]
+    if not rated:
+        return
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    for item_type in sorted({item["type"] for item in rated}):
+        group = [item for item in rated if item["type"] == item_type]
+        ax.scatter([item["p"] for item in group], [item["r_pb"] for item in group], label=TYPE_LABELS.get(item_type, item_type), s=18)
+    ax.axhline(0.2, color='gray', linestyle='--', linewidth=0.8)
+    ax.set_xlabel("p (difficulty)")
+    ax.set_ylabel("point-biserial")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, 'difficulty_discrimination.png'), dpi=120)
+    plt.close(fig)
+
+    fig, ax = plt.subplots(figsize=(7, 4))
+    ax.hist([item["p"] for item in rated], bins=20, range=(0, 1))
+    ax.set_xlabel("p (difficulty)")
+    ax.set_ylabel("items")
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, 'difficulty_hist.png'), dpi=120)
+    plt.close(fig)
+
+    # 세트별 보기 선택률 (막대 하나가 문항 하나, 정답 보기는 진하게)
+    for set_name in SET_KEYS:
+        group = [item for item in items if item["set"] == set_name and item["n"]]
+        if not group:
+            continue
+        fig, ax = plt.subplots(figsize=(max(8, len(group) * 0.3), 4))
+        x = np.arange(len(group))
+        bottom = np.zeros(len(group))
+        for k in range(MAX_OPTIONS):
+            rates = np.array([item[f"option{k + 1}_rate"] or 0 for item in group])
+            colors = [to_rgba(f"C{k}", 1.0 if item["answer"] == k else 0.35) for item in group]
+            ax.bar(x, rates, bottom=bottom, color=colors, width=0.8)
+            bottom += rates
+        ax.bar(x, [item["omit_rate"] or 0 for item in group], bottom=bottom, color='lightgray', width=0.8)
+        ax.set_xticks(x)
+        ax.set_xticklabels([item["id"] for item in group], rotation=90, fontsize=7)
+        ax.set_ylim(0, 1)
+        ax.set_ylabel("selection rate (answer = solid)")
+        ax.set_title(set_name)
+        fig.tight_layout()
+        fig.savefig(os.path.join(out_dir, f'options_{set_name}.png'), dpi=120)
+        plt.close(fig)
+
+
+def main():
+    from question_bank import QuestionBank
+
+    parser = argparse.ArgumentParser(description="문항 분석")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--credentials', help="Firebase 서비스 계정 키(JSON) 경로")
+    source.add_argument('--input', help="export.py로 내보낸 결과 파일 (.jsonl / .csv)")
+    parser.add_argument('--problems', default='problems.json')
+    parser.add_argument('--out-dir', default='analysis')
+    parser.add_argument('--no-charts', action='store_true')
+    args = parser.parse_args()
+
+    key = AnswerKey(QuestionBank.from_file(args.problems))
+    if args.input:
+        records = iter_records_from_file(args.input)
+    else:
+        from export import init_firestore
+        records = iter_records_from_firestore(init_firestore(args.credentials))
+
+    matrix, presented = build_matrix(key, records)
+    items, sets = analyze(key, matrix, presented)
+    write_outputs(items, sets, args.out_dir, charts=not args.no_charts)
+    print(f"응시자 {matrix.shape[0]}명, 문항 {matrix.shape[1]}개 분석 -> {args.out_dir}")
+    for set_name, stats in sets.items():
+        print(f"  {set_name}: KR-20 {stats['kr20']} (문항 {stats['items']}, 응시자 {stats['examinees']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""문항별 응답 기록 형식
+
+결과 문서의 `items` 필드에 문항 순서대로 나란히 놓인 배열로 저장한다.
+
+    "items": {
+        "qid":     ["A_01", "C_07", ...],   # 문항 ID
+        "choice":  [1, -1, ...],            # 고른 보기 위치 (무응답 -1)
+        "correct": [True, False, ...],
+        "points":  [2, 0, ...],             # 획득 점수
+        "sec":     [35, -1, ...],           # 시험 시작 후 마지막으로 답을 고른 시각(초, 없으면 -1)
+    }
+
+예전 문서의 `details_obj`(dict의 repr 문자열)는 `unpack_details`가 함께 읽는다.
+"""
+import ast
+
+ITEMS_FIELD = 'items'
+LEGACY_FIELD = 'details_obj'
+NO_VALUE = -1
+
+
+def pack_details(details, answer_secs=None):
+    """{문항ID: 결과} dict를 배열 형식으로 변환"""
+    answer_secs = answer_secs or {}
+    qids = list(details)
+    return {
+        "qid": qids,
+        "choice": [_choice(details[qid]) for qid in qids],
+        "correct": [bool(details[qid].get("correct")) for qid in qids],
+        "points": [int(details[qid].get("score_earned") or 0) for qid in qids],
+        "sec": [int(answer_secs[qid]) if qid in answer_secs else NO_VALUE for qid in qids],
+    }
+
+
+def _choice(item):
+    choice = item.get("choice")
+    return NO_VALUE if choice is None else int(choice)
+
+
+def unpack_items(items):
+    """배열 형식을 {문항ID: 결과} dict로 변환"""
+    secs = items.get("sec") or [NO_VALUE] * len(items["qid"])
+    return {
+        qid: {
+            "choice": None if choice == NO_VALUE else choice,
+            "correct": correct,
+            "score_earned": points,
+            "sec": None if sec == NO_VALUE else sec,
+        }
+        for qid, choice, correct, points, sec in zip(
+            items["qid"], items["choice"], items["correct"], items["points"], secs)
+    }
+
+
+def parse_legacy_details(details_obj):
+    """예전 `details_obj`(dict 또는 repr 문자열)를 dict로 변환 (eval 대신 literal_eval)"""
+    if isinstance(details_obj, dict):
+        return details_obj
+    if not details_obj:
+        return {}
+    try:
+        return ast.literal_eval(details_obj)
+    except (ValueError, SyntaxError):
+        return {}
+
+
+def unpack_details(data):
+    """결과 문서에서 문항별 결과 dict를 꺼냄 (새 형식 우선, 없으면 예전 형식)"""
+    items = data.get(ITEMS_FIELD)
+    if items:
+        return unpack_items(items)
+    return parse_legacy_details(data.get(LEGACY_FIELD))
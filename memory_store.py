@@ -0,0 +1,304 @@
+"""Firestore 클라이언트의 메모리 대체 구현 (로컬 개발 / 오프라인 실행용)
+
+앱이 사용하는 범위(collection/document, get/set/update/delete/add, where/order_by/
+limit/start_after/stream, batch, transaction)만 흉내 낸다. 프로세스가 끝나면 데이터는 사라진다.
+"""
+import copy
+import datetime
+import operator
+import sys
+import threading
+import uuid
+
+# Firestore 특수 값 모듈. 호출한 쪽이 특수 값을 만들었다면 이미 import 되어 있으므로,
+# 메모리 DB만 쓸 때 google-cloud-firestore를 불러오는 비용을 치르지 않도록 직접 import 하지 않는다.
+_TRANSFORMS_MODULE = 'google.cloud.firestore_v1.transforms'
+
+_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, candidates: value in candidates,
+    'array_contains': lambda value, item: item in (value or []),
+}
+
+
+class Increment:
+    """google-cloud-firestore가 없을 때 쓰는 Increment 대체 (값만 보관)"""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _ServerTimestamp:
+    """google-cloud-firestore가 없을 때 쓰는 SERVER_TIMESTAMP 대체"""
+
+
+SERVER_TIMESTAMP = _ServerTimestamp()
+
+
+def _is_increment(value, transforms):
+    return isinstance(value, Increment) or (transforms is not None and isinstance(value, transforms.Increment))
+
+
+def _apply_write(current, data, field_paths=False, merge=False):
+    """set/update 값에 포함된 Firestore 특수 값(DELETE_FIELD, SERVER_TIMESTAMP, Increment) 처리
+
+    field_paths: update처럼 "a.b" 키를 중첩 필드 경로로 해석
+    merge: set(merge=True)처럼 중첩 map을 덮어쓰지 않고 합침
+    """
+    transforms = sys.modules.get(_TRANSFORMS_MODULE)
+    for field, value in data.items():
+        parts = field.split('.') if field_paths else [field]
+        target = current
+        for part in parts[:-1]:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        key = parts[-1]
+        if transforms is not None and value is transforms.DELETE_FIELD:
+            target.pop(key, None)
+        elif value is SERVER_TIMESTAMP or (transforms is not None and value is transforms.SERVER_TIMESTAMP):
+            target[key] = datetime.datetime.now(datetime.timezone.utc)
+        elif _is_increment(value, transforms):
+            target[key] = (target.get(key) or 0) + value.value
+        elif isinstance(value, dict):
+            # 중첩 map 안의 특수 값도 처리 (merge면 기존 map에 합침)
+            base = target.get(key) if merge and isinstance(target.get(key), dict) else {}
+            target[key] = _apply_write(base, value, merge=merge)
+        else:
+            target[key] = copy.deepcopy(value)
+    return current
+
+
+class NotFound(Exception):
+    """존재하지 않는 문서를 update 했을 때 (google.api_core.exceptions.NotFound 대응)"""
+
+
+class MemorySnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class MemoryDocument:
+    def __init__(self, client, path, doc_id):
+        self._client = client
+        self._path = path
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f"{self._path}/{self.id}"
+
+    def _docs(self):
+        return self._client._collection_data(self._path)
+
+    def get(self, transaction=None):
+        self._client.stats["reads"] += 1
+        with self._client._lock:
+            data = self._docs().get(self.id)
+            return MemorySnapshot(self, copy.deepcopy(data) if data is not None else None)
+
+    def set(self, data, merge=False):
+        self._client.stats["writes"] += 1
+        with self._client._lock:
+            docs = self._docs()
+            if merge and self.id in docs:
+                _apply_write(docs[self.id], data, merge=True)
+            else:
+                docs[self.id] = _apply_write({}, data)
+        self._client._notify(self)
+
+    def create(self, data):
+        with self._client._lock:
+            if self.id in self._docs():
+                raise ValueError(f"이미 존재하는 문서: {self.path}")
+        self.set(data)
+
+    def update(self, data):
+        self._client.stats["writes"] += 1
+        with self._client._lock:
+            docs = self._docs()
+            if self.id not in docs:
+                raise NotFound(f"문서 없음: {self.path}")
+            _apply_write(docs[self.id], data, field_paths=True)
+        self._client._notify(self)
+
+    def delete(self):
+        self._client.stats["writes"] += 1
+        with self._client._lock:
+            self._docs().pop(self.id, None)
+
+    def collection(self, name):
+        return MemoryCollection(self._client, f"{self.path}/{name}")
+
+    def on_snapshot(self, callback):
+        return self._client._watch(self, callback)
+
+
+class MemoryQuery:
+    def __init__(self, client, path, filters=(), order=None, limit=None, start_after=None):
+        self._client = client
+        self._path = path
+        self._filters = list(filters)
+        self._order = order
+        self._limit = limit
+        self._start_after = start_after
+
+    def _copy(self, **changes):
+        params = dict(filters=self._filters, order=self._order, limit=self._limit,
+                      start_after=self._start_after)
+        params.update(changes)
+        return MemoryQuery(self._client, self._path, **params)
+
+    def where(self, field, op, value):
+        return self._copy(filters=self._filters + [(field, _OPERATORS[op], value)])
+
+    def order_by(self, field, direction='ASCENDING'):
+        return self._copy(order=(field, direction in ('DESCENDING', 'desc')))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, snapshot):
+        return self._copy(start_after=snapshot)
+
+    def stream(self, transaction=None):
+        with self._client._lock:
+            items = [
+                (doc_id, data) for doc_id, data in self._client._collection_data(self._path).items()
+                if all(field in data and op(data[field], value) for field, op, value in self._filters)
+            ]
+            if self._order:
+                field, descending = self._order
+                items = [item for item in items if field in item[1]]
+                items.sort(key=lambda item: (item[1][field], item[0]), reverse=descending)
+            if self._start_after is not None:
+                ids = [doc_id for doc_id, _ in items]
+                if self._start_after.id in ids:
+                    items = items[ids.index(self._start_after.id) + 1:]
+            if self._limit is not None:
+                items = items[:self._limit]
+            snapshots = [
+                MemorySnapshot(MemoryDocument(self._client, self._path, doc_id), copy.deepcopy(data))
+                for doc_id, data in items
+            ]
+        self._client.stats["reads"] += max(1, len(snapshots))
+        return iter(snapshots)
+
+    def get(self, transaction=None):
+        return list(self.stream())
+
+
+class MemoryCollection(MemoryQuery):
+    def __init__(self, client, path):
+        super().__init__(client, path)
+        self.id = path.rsplit('/', 1)[-1]
+
+    def document(self, doc_id=None):
+        return MemoryDocument(self._client, self._path, doc_id or uuid.uuid4().hex[:20])
+
+    def add(self, data):
+        doc = self.document()
+        doc.set(data)
+        return None, doc
+
+
+class MemoryWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def set(self, reference, data, merge=False):
+        self._ops.append(lambda: reference.set(data, merge=merge))
+
+    def update(self, reference, data):
+        self._ops.append(lambda: reference.update(data))
+
+    def delete(self, reference):
+        self._ops.append(reference.delete)
+
+    def commit(self):
+        self._client.stats["commits"] += 1
+        with self._client._lock:
+            for op in self._ops:
+                op()
+        self._ops = []
+
+
+class MemoryTransaction(MemoryWriteBatch):
+    """db.transaction() 대체 (쓰기는 batch처럼 모았다가 `transactional` 함수가 끝날 때 반영)"""
+
+
+def transactional(func):
+    """firestore.transactional 대체
+
+    Firestore는 읽은 문서가 commit 전에 바뀌면 함수를 다시 실행하지만, 메모리 DB는 함수
+    실행부터 commit까지 DB 잠금을 쥐고 있어 다른 쓰기가 끼어들 수 없으므로 재시도가 필요 없다.
+    """
+    def wrapper(transaction, *args, **kwargs):
+        with transaction._client._lock:
+            result = func(transaction, *args, **kwargs)
+            transaction.commit()
+        return result
+    return wrapper
+
+
+class _Watch:
+    def __init__(self, client, key):
+        self._client = client
+        self._key = key
+
+    def unsubscribe(self):
+        with self._client._lock:
+            self._client._watchers.pop(self._key, None)
+
+
+class MemoryFirestore:
+    """firestore.client() 대체 객체"""
+
+    def __init__(self):
+        self._data = {}
+        self._watchers = {}
+        self._lock = threading.RLock()
+        self.stats = {"reads": 0, "writes": 0, "commits": 0}
+
+    def _collection_data(self, path):
+        return self._data.setdefault(path, {})
+
+    def collection(self, name):
+        return MemoryCollection(self, name)
+
+    def batch(self):
+        return MemoryWriteBatch(self)
+
+    def transaction(self):
+        return MemoryTransaction(self)
+
+    def get_all(self, references, transaction=None):
+        for reference in references:
+            yield reference.get(transaction=transaction)
+
+    def _watch(self, document, callback):
+        key = uuid.uuid4().hex
+        with self._lock:
+            self._watchers[key] = (document.path, document, callback)
+        callback([document.get()], [], None)
+        return _Watch(self, key)
+
+    def _notify(self, document):
+        for path, watched, callback in list(self._watchers.values()):
+            if path == document.path:
+                callback([watched.get()], [], None)
@@ -0,0 +1,211 @@
+from collections import defaultdict, deque
+from contextlib import contextmanager
+import threading
+import time
+
+# --- [설정] 지표 ---
+METRIC_PREFIX = 'leveltest'
+SAMPLE_SIZE = 1024  # 구간별로 보관하는 최근 소요 시간 수 (백분위 계산용)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Metrics:
+    """프로세스 전역 지표 (구간 소요 시간, 횟수, 현재 값)
+
+    - `span(name)`: with 블록의 소요 시간을 구간별 최근 `SAMPLE_SIZE`개까지 보관하고,
+      예외가 나면 `errors{stage=name}`을 하나 올린다 (예외는 그대로 전달).
+    - `count(name, n, **labels)`: 외부 호출 수, 실패 수 등 누적 횟수.
+    - `gauge(name, fn)`: 조회할 때마다 `fn()`을 불러 현재 값을 얻음 (응시 중 세션 수 등).
+
+    `render_prometheus()`는 Prometheus 텍스트 형식을, `summary()`는 로그용 한 줄 요약을
+    만든다. `serve(port)`로 /metrics HTTP 엔드포인트를, `start_reporter()`로 주기적인
+    로그 요약을 켤 수 있다.
+    """
+
+    def __init__(self, sample_size=SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)  # (이름, 라벨 tuple) -> 횟수
+        self._samples = {}  # 구간 이름 -> 최근 소요 시간(초) deque
+        self._totals = defaultdict(lambda: [0, 0.0])  # 구간 이름 -> [횟수, 합계(초)]
+        self._gauges = {}
+        self._reporter = None
+        self._server = None
+
+    # --- 기록 ---
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            # st.stop() / st.rerun() 같은 제어 흐름 예외는 실패로 세지 않음
+            if isinstance(e, Exception) and not type(e).__module__.startswith('streamlit'):
+                self.count('errors', stage=name)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.sample_size)
+            samples.append(seconds)
+            total = self._totals[name]
+            total[0] += 1
+            total[1] += seconds
+
+    def count(self, name, n=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += n
+
+    def gauge(self, name, fn):
+        """현재 값 함수 등록 (같은 이름이면 교체)"""
+        self._gauges[name] = fn
+
+    # --- 조회 ---
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def counters(self, name):
+        """이름이 같은 횟수 전체 ({라벨 dict tuple: 횟수})"""
+        with self._lock:
+            return {labels: n for (key, labels), n in self._counters.items() if key == name}
+
+    def gauges(self):
+        values = {}
+        for name, fn in list(self._gauges.items()):
+            try:
+                values[name] = fn()
+            except Exception:
+                values[name] = None
+        return values
+
+    def quantile(self, name, q):
+        """구간 소요 시간 백분위 (초, 기록이 없으면 None)"""
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def stages(self):
+        """구간별 {횟수, 합계, p50, p95} (이름순)"""
+        with self._lock:
+            snapshot = {name: (sorted(samples), tuple(self._totals[name]))
+                        for name, samples in self._samples.items()}
+        stages = {}
+        for name in sorted(snapshot):
+            samples, (total_count, total_sum) = snapshot[name]
+            stages[name] = {
+                "count": total_count,
+                "sum": total_sum,
+                "p50": samples[int(0.5 * len(samples))],
+                "p95": samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+            }
+        return stages
+
+    # --- 내보내기 ---
+    def render_prometheus(self):
+        """Prometheus 텍스트 형식 (구간은 summary, 횟수는 counter, 현재 값은 gauge)"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+        names = []
+        for (name, _), _ in counters:
+            if name not in names:
+                names.append(name)
+        for name in names:
+            metric = f"{METRIC_PREFIX}_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (key, labels), n in counters:
+                if key == name:
+                    lines.append(f"{metric}{_labels(labels)} {n}")
+
+        stages = self.stages()
+        if stages:
+            metric = f"{METRIC_PREFIX}_stage_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for name, stage in stages.items():
+                for q in QUANTILES:
+                    value = self.quantile(name, q)
+                    lines.append(f"{metric}{_labels((('stage', name), ('quantile', q)))} {value:.6f}")
+                lines.append(f"{metric}_sum{_labels((('stage', name),))} {stage['sum']:.6f}")
+                lines.append(f"{metric}_count{_labels((('stage', name),))} {stage['count']}")
+
+        for name, value in sorted(self.gauges().items()):
+            if value is None:
+                continue
+            metric = f"{METRIC_PREFIX}_{_metric_name(name)}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """로그용 한 줄 요약"""
+        parts = [f"{name}={value}" for name, value in sorted(self.gauges().items())]
+        parts += [f"{name} n={s['count']} p50={s['p50'] * 1e3:.1f}ms p95={s['p95'] * 1e3:.1f}ms"
+                  for name, s in self.stages().items()]
+        errors = sum(self.counters('errors').values())
+        if errors:
+            parts.append(f"errors={errors}")
+        return " | ".join(parts)
+
+    def start_reporter(self, interval_sec=60.0):
+        """`interval_sec`마다 요약을 로그(stdout)로 출력"""
+        if self._reporter is not None or interval_sec <= 0:
+            return
+
+        def report():
+            while True:
+                time.sleep(interval_sec)
+                print(f"[metrics] {self.summary()}")
+
+        self._reporter = threading.Thread(target=report, name="metrics-reporter", daemon=True)
+        self._reporter.start()
+
+    def serve(self, port, host='0.0.0.0'):
+        """GET /metrics 로 Prometheus 텍스트를 내보내는 HTTP 서버 (별도 스레드)"""
+        if self._server is not None:
+            return self._server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        return self._server
+
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+# 프로세스 전역 지표 (모듈 어디서든 `metrics.span(...)` / `metrics.count(...)`)
+REGISTRY = Metrics()
+span = REGISTRY.span
+count = REGISTRY.count
+gauge = REGISTRY.gauge
@@ -0,0 +1,72 @@
+"""예전 결과 문서의 `details_obj`(repr 문자열)를 배열 형식 `items`로 변환
+
+    python migrate_details.py --credentials firebase_key.json --dry-run
+    python migrate_details.py --credentials firebase_key.json
+    python migrate_details.py --credentials firebase_key.json --keep-legacy
+"""
+import argparse
+
+from export import RESULTS_COLLECTION, init_firestore, iter_result_docs
+from item_details import ITEMS_FIELD, LEGACY_FIELD, pack_details, parse_legacy_details
+from question_bank import QuestionBank
+from scoring import AnswerKey
+
+BATCH_LIMIT = 500  # Firestore batch 최대 쓰기 수
+
+
+def convert(data, key):
+    """예전 details_obj를 items로 변환 (변환할 것이 없으면 None)"""
+    if data.get(ITEMS_FIELD) or not data.get(LEGACY_FIELD):
+        return None
+    details = parse_legacy_details(data[LEGACY_FIELD])
+    for qid, item in details.items():
+        if item.get("choice") is None:
+            choice = key.choice_index(qid, item.get("user_ans"))
+            item["choice"] = None if choice < 0 else choice
+    return pack_details(details)
+
+
+def migrate(db, key, keep_legacy=False, dry_run=False):
+    """전체 결과를 훑으며 변환 후 batch로 기록, (검사 수, 변환 수) 반환"""
+    from firebase_admin import firestore
+
+    scanned = converted = 0
+    batch = None if dry_run else db.batch()
+    pending = 0
+    for doc in iter_result_docs(db):
+        scanned += 1
+        items = convert(doc.to_dict(), key)
+        if items is None:
+            continue
+        converted += 1
+        if dry_run:
+            continue
+        update = {ITEMS_FIELD: items}
+        if not keep_legacy:
+            update[LEGACY_FIELD] = firestore.DELETE_FIELD
+        batch.update(db.collection(RESULTS_COLLECTION).document(doc.id), update)
+        pending += 1
+        if pending >= BATCH_LIMIT:
+            batch.commit()
+            batch, pending = db.batch(), 0
+    if pending:
+        batch.commit()
+    return scanned, converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="details_obj -> items 변환")
+    parser.add_argument('--credentials', required=True, help="Firebase 서비스 계정 키(JSON) 경로")
+    parser.add_argument('--problems', default='problems.json')
+    parser.add_argument('--keep-legacy', action='store_true', help="details_obj 필드를 지우지 않음")
+    parser.add_argument('--dry-run', action='store_true', help="변환 대상 수만 확인")
+    args = parser.parse_args()
+
+    key = AnswerKey(QuestionBank.from_file(args.problems))
+    scanned, converted = migrate(init_firestore(args.credentials), key,
+                                 keep_legacy=args.keep_legacy, dry_run=args.dry_run)
+    print(f"{scanned}건 검사, {converted}건 {'변환 대상' if args.dry_run else '변환 완료'}")
+
+
+if __name__ == '__main__':
+    main()
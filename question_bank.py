@@ -0,0 +1,139 @@
+import json
+import random
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
+
+# --- [설정] 문제 세트 ---
+SET_KEYS = ['SET_A', 'SET_B', 'SET_C', 'SET_D', 'SET_E']
+
+# --- [출제 설계] 100점 만점 구성 (풀 이름, 문항 수) ---
+BLUEPRINT = [
+    ("grammar", 5),
+    ("vocab", 5),
+    ("reading_graph", 1),
+    ("reading_2pt", 19),
+    ("reading_3pt", 9),
+    ("writing", 1),
+]
+
+
+def has_graph(question):
+    return '그래프' in question.get('question', '')
+
+
+def _sample(rng, pool, k):
+    """pool에서 k개를 비복원 추출 (k에 비례하는 비용)"""
+    n = len(pool)
+    if k > n:
+        raise ValueError(f"표본 크기({k})가 풀 크기({n})보다 큽니다.")
+    picked = []
+    seen = set()
+    rand = rng.random
+    while len(picked) < k:
+        i = int(rand() * n)
+        if i not in seen:
+            seen.add(i)
+            picked.append(pool[i])
+    return picked
+
+
+class QuestionBank:
+    """문제 은행
+
+    `problems.json`을 한 번만 읽어 (type, score, has_graph, set) 별 버킷(tuple)으로
+    색인하고, 출제 설계(BLUEPRINT)에 필요한 풀을 미리 만들어 둔다. 세션마다
+    전체 문제를 다시 훑지 않고 `draw_form(rng)`로 바로 시험지를 뽑는다.
+    """
+
+    def __init__(self, problems_by_set):
+        buckets = defaultdict(list)
+        by_id = {}
+        for set_key in SET_KEYS:
+            for q in problems_by_set.get(set_key, []):
+                # 모든 세션이 공유하는 읽기 전용 문항
+                q = MappingProxyType(dict(q, options=tuple(q.get('options') or ())))
+                by_id[q['id']] = q
+                buckets[(q['type'], q['score'], has_graph(q), set_key)].append(q)
+        self.by_id = MappingProxyType(by_id)
+        self.buckets = {key: tuple(qs) for key, qs in buckets.items()}
+        self.split_form = lru_cache(maxsize=4096)(self._split_form)
+
+        self.pools = {
+            "grammar": self._collect(lambda t, s, g: t == '문법'),
+            "vocab": self._collect(lambda t, s, g: t == '어휘'),
+            "reading_graph": self._collect(lambda t, s, g: t == '읽기' and g),
+            "reading_2pt": self._collect(lambda t, s, g: t == '읽기' and s == 2 and not g),
+            "reading_3pt": self._collect(lambda t, s, g: t == '읽기' and s == 3),
+            "writing": self._collect(lambda t, s, g: t == '쓰기'),
+        }
+        self.validate()
+
+    @classmethod
+    def from_file(cls, path='problems.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_bytes(cls, source):
+        """problems.json 내용(bytes)으로 생성 (버전 해시와 같은 바이트를 파싱)"""
+        return cls(json.loads(source.decode('utf-8')))
+
+    def _collect(self, match):
+        return tuple(
+            q
+            for (q_type, score, graph, _), qs in sorted(self.buckets.items(), key=lambda kv: kv[0][3])
+            if match(q_type, score, graph)
+            for q in qs
+        )
+
+    def __len__(self):
+        return sum(len(qs) for qs in self.buckets.values())
+
+    def validate(self):
+        """출제 설계를 만족할 만큼 문제가 있는지 확인 (부족하면 ValueError)"""
+        required = dict(BLUEPRINT)
+        if not self.pools["reading_graph"]:
+            # 그래프 문항이 없으면 일반 2점 읽기로 대체
+            required["reading_2pt"] += required.pop("reading_graph")
+        shortages = [
+            f"{name}: 필요 {count}개 / 보유 {len(self.pools[name])}개"
+            for name, count in required.items()
+            if len(self.pools[name]) < count
+        ]
+        if shortages:
+            raise ValueError("문제 데이터 부족 - " + ", ".join(shortages))
+
+    def draw_form_ids(self, seed):
+        """시드로 시험지를 뽑아 문항 ID tuple로 반환 (세션에는 이것만 저장)"""
+        return tuple(q['id'] for q in self.draw_form(random.Random(seed)))
+
+    def resolve(self, question_ids):
+        """문항 ID tuple을 공유 문항 객체로 변환"""
+        return [self.by_id[qid] for qid in question_ids]
+
+    def _split_form(self, question_ids):
+        """시험지를 (객관식 문항 tuple, 쓰기 문항 또는 None)으로 분리"""
+        questions = self.resolve(question_ids)
+        obj_questions = tuple(q for q in questions if q.get('type') != '쓰기')
+        writing_questions = [q for q in questions if q.get('type') == '쓰기']
+        return obj_questions, (writing_questions[0] if writing_questions else None)
+
+    def draw_form(self, rng):
+        """시험지 1부 추출: 문법 + 어휘 + 읽기(섞음) + 쓰기"""
+        counts = dict(BLUEPRINT)
+        sel_grammar = _sample(rng, self.pools["grammar"], counts["grammar"])
+        sel_vocab = _sample(rng, self.pools["vocab"], counts["vocab"])
+
+        if self.pools["reading_graph"]:
+            sel_reading_2 = (_sample(rng, self.pools["reading_graph"], counts["reading_graph"])
+                             + _sample(rng, self.pools["reading_2pt"], counts["reading_2pt"]))
+        else:
+            sel_reading_2 = _sample(rng, self.pools["reading_2pt"],
+                                    counts["reading_2pt"] + counts["reading_graph"])
+
+        sel_reading = sel_reading_2 + _sample(rng, self.pools["reading_3pt"], counts["reading_3pt"])
+        rng.shuffle(sel_reading)
+        sel_writing = _sample(rng, self.pools["writing"], counts["writing"])
+
+        return sel_grammar + sel_vocab + sel_reading + sel_writing
@@ -0,0 +1,112 @@
+"""시험 화면 문항 표시 (지문 HTML 등은 문항 ID 별로 한 번만 생성)
+
+app.py는 Streamlit이 rerun 할 때마다 다시 실행되므로, 캐시는 한 번만 import 되는
+이 모듈에 둔다.
+"""
+import os
+import time
+from functools import lru_cache
+
+import streamlit as st
+
+PASSAGE_STYLE = "background-color: #333333; color: #ffffff; padding: 15px; border-radius: 10px; margin-bottom: 10px;"
+
+
+def question_html(number, q):
+    """문항 제목 (번호는 세션마다 다르므로 캐시하지 않음)"""
+    label = f"{number}. [{q.get('type', '일반')}]" if number else f"[{q.get('type', '일반')}]"
+    return f"""<div class="prevent-copy notranslate" translate="no">
+    <strong>{label}</strong> {q['question']}
+    </div>"""
+
+
+@lru_cache(maxsize=None)
+def _passage_html(qid, passage):
+    body = passage.replace('\n', '<br>')
+    return f"""
+    <div class="prevent-copy notranslate" translate="no" style="{PASSAGE_STYLE}">
+        {body}
+    </div>
+    """
+
+
+def passage_html(q):
+    """지문 HTML (없으면 None)"""
+    if not q.get('passage'):
+        return None
+    return _passage_html(q['id'], q['passage'])
+
+
+@lru_cache(maxsize=None)
+def _existing_image(path):
+    return path if os.path.exists(path) else None
+
+
+def image_path(q):
+    """표시할 이미지 경로 (파일이 없으면 None, 존재 여부는 경로당 한 번만 확인)"""
+    if not q.get('image'):
+        return None
+    return _existing_image(q['image'])
+
+
+@lru_cache(maxsize=None)
+def _option_positions(qid, count):
+    return tuple(range(count))
+
+
+def option_positions(q):
+    """라디오 버튼 값으로 쓰는 보기 위치 tuple (답은 보기 문자열 대신 위치로 저장)"""
+    return _option_positions(q['id'], len(q.get('options') or ()))
+
+
+def _render_image(q, assets):
+    image = assets.image(q) if assets is not None else image_path(q)
+    if image:
+        st.image(image)
+
+
+def render_question(number, q, answers, answer_times=None, assets=None):
+    """객관식 문항 1개를 그리고 선택한 답을 answers에 (답을 바꾼 시각은 answer_times에) 기록
+
+    assets(AssetManager)를 주면 이미지는 미리 최적화해 둔 바이트로 보낸다.
+    """
+    st.markdown(question_html(number, q), unsafe_allow_html=True)
+
+    passage = passage_html(q)
+    if passage:
+        st.markdown(passage, unsafe_allow_html=True)
+
+    _render_image(q, assets)
+
+    qid = q['id']
+    previous = answers.get(qid, None)
+    choice = st.radio(
+        f"{number}번 답안 선택",
+        option_positions(q),
+        key=f"q_{qid}",
+        index=previous,
+        format_func=q['options'].__getitem__,
+        label_visibility="collapsed"
+    )
+    answers[qid] = choice
+    if answer_times is not None and choice != previous:
+        answer_times[qid] = time.time()
+    st.markdown("---")
+
+
+def render_writing_question(q, answers, assets=None):
+    """쓰기 문항을 그리고 작성한 답안을 answers['writing']에 기록"""
+    st.markdown(question_html(None, q), unsafe_allow_html=True)
+
+    passage = passage_html(q)
+    if passage:
+        st.markdown(passage, unsafe_allow_html=True)
+
+    _render_image(q, assets)
+
+    answers['writing'] = st.text_area(
+        "답안을 작성하세요 (200~300자)",
+        height=200,
+        key="writing_area",
+        value=answers.get('writing', '')
+    )
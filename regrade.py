@@ -0,0 +1,302 @@
+"""쓰기 답안 일괄 (재)채점
+
+    python regrade.py --credentials firebase_key.json --apply                 # 대기/실패 답안 채점 후 DB 반영
+    python regrade.py --credentials firebase_key.json --all --apply --rate 60 # 전체 재채점 (분당 60건)
+    python regrade.py --input results.jsonl --grader fake --output regraded.csv   # 오프라인 (가짜 채점기)
+
+진행 상황은 --checkpoint 파일(JSONL)에 한 건씩 기록되므로, 중단 후 같은 명령을 다시
+실행하면 끝난 답안은 건너뛴다. --apply 이면 DB 반영이 끝난 답안만 기록한다.
+미리 보기(--apply 없음)는 기본 체크포인트 파일이 따로 있어서, 미리 본 답안을 나중에
+--apply 로 실행할 때 건너뛰지 않는다.
+DB에는 쓰기 점수만 보내고 총점은 저장된 문서 기준으로 계산하므로, 입력 파일이 오래되어도
+그 사이 재채점된 객관식 점수를 되돌리지 않는다. 채점 대기(pending) 답안 중 앱의 채점 큐가
+아직 처리하고 있는 답안(grading_jobs 임대 / 다음 시도 시각이 살아 있음)은 건너뛴다.
+"""
+import argparse
+import csv
+import json
+import os
+import queue
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aggregates
+from grading import DEFAULT_WRITING_QUESTION, make_grader
+from grading_queue import JOBS_COLLECTION, STATUS_DONE, STATUS_FAILED, STATUS_PENDING, job_is_live
+
+WRITE_BATCH_SIZE = 100  # Firestore batch 한도(500) 이하
+CHECKPOINT_PATHS = {True: 'regrade_checkpoint.jsonl', False: 'regrade_preview_checkpoint.jsonl'}  # --apply 여부별
+
+
+class RateLimiter:
+    """분당 호출 수 제한 (여러 스레드가 공유, 호출 간격을 고르게 배분)"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def load_checkpoint(path):
+    """체크포인트 파일에서 이미 끝난 답안 {doc_id: 기록} 읽기"""
+    done = {}
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 중단 시 마지막 줄이 잘렸을 수 있음
+                done[entry["doc_id"]] = entry
+    return done
+
+
+def question_text_for(data, question_bank):
+    qid = data.get("writing_qid")
+    if qid and question_bank is not None and qid in question_bank.by_id:
+        return question_bank.by_id[qid]['question']
+    return DEFAULT_WRITING_QUESTION
+
+
+def select_records(records, statuses, done, jobs_db=None, stats=None):
+    """채점할 답안만 고름 (답안 없음 / 상태 불일치 / 체크포인트에 있음 / 채점 큐가 처리 중 제외)"""
+    for doc_id, data in records:
+        if not data.get("writing_original") or doc_id in done:
+            continue
+        status = data.get("writing_status") or STATUS_DONE
+        if statuses and status not in statuses:
+            continue
+        if status == STATUS_PENDING and jobs_db is not None:
+            job = jobs_db.collection(JOBS_COLLECTION).document(doc_id).get()
+            if job.exists and job_is_live(job.to_dict()):
+                if stats is not None:
+                    stats["in_queue"] += 1
+                continue
+        yield doc_id, data
+
+
+def regrade(records, grader, question_bank=None, db=None, checkpoint_path=None,
+            statuses=(STATUS_PENDING, STATUS_FAILED), rate_per_min=0, max_in_flight=4,
+            max_attempts=3, base_delay_sec=2.0, jobs_db=None):
+    """답안들을 동시에 채점하고 (db가 있으면) 결과 문서에 반영
+
+    동시에 진행 중인 채점은 max_in_flight개, 모델 호출은 분당 rate_per_min회로 제한한다.
+    DB 반영과 체크포인트 기록은 호출한 스레드에서 WRITE_BATCH_SIZE건씩 묶어 처리한다.
+    jobs_db(기본: db)의 grading_jobs로 앱의 채점 큐가 처리 중인 대기 답안을 건너뛴다.
+    반환: 통계 dict
+    """
+    done = load_checkpoint(checkpoint_path)
+    limiter = RateLimiter(rate_per_min)
+    slots = threading.Semaphore(max_in_flight)
+    completed = queue.Queue()
+    stats = {"skipped": len(done), "in_queue": 0, "graded": 0, "failed": 0, "applied": 0, "latencies": []}
+
+    def grade_one(doc_id, data):
+        question_text = question_text_for(data, question_bank)
+        try:
+            for attempt in range(1, max_attempts + 1):
+                limiter.acquire()
+                started = time.perf_counter()
+                try:
+                    analysis = grader.grade(question_text, data["writing_original"])
+                    completed.put((doc_id, data, analysis, time.perf_counter() - started, None))
+                    return
+                except Exception as e:
+                    if attempt == max_attempts:
+                        completed.put((doc_id, data, None, time.perf_counter() - started, e))
+                        return
+                    time.sleep(base_delay_sec * (2 ** (attempt - 1)) * random.uniform(0.5, 1.0))
+        finally:
+            slots.release()
+
+    checkpoint = open(checkpoint_path, 'a', encoding='utf-8') if checkpoint_path else None
+    pending_writes = []
+
+    def flush_writes():
+        if not pending_writes:
+            return
+        if db is not None:
+            # 총점과 집계 변경분은 입력 파일이 아니라 DB에 저장된 문서 기준
+            written = {}
+            missing = aggregates.update_results(db, dict(pending_writes), written)
+            for doc_id in missing:
+                print(f"결과 문서 없음 ({doc_id}): 반영하지 않음")
+            pending_writes[:] = [(doc_id, written[doc_id]) for doc_id, _ in pending_writes if doc_id in written]
+            stats["applied"] += len(pending_writes)
+        if checkpoint is not None:
+            for doc_id, update in pending_writes:
+                checkpoint.write(json.dumps(dict(update, doc_id=doc_id), ensure_ascii=False) + "\n")
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        for doc_id, update in pending_writes:
+            done[doc_id] = dict(update, doc_id=doc_id)
+        pending_writes.clear()
+
+    def drain(block):
+        while True:
+            try:
+                doc_id, data, analysis, latency, error = completed.get(block=block, timeout=0.2)
+            except queue.Empty:
+                return
+            block = False
+            if error is not None:
+                print(f"채점 실패 ({doc_id}): {error}")
+                stats["failed"] += 1
+                continue
+            stats["graded"] += 1
+            stats["latencies"].append(latency)
+            update = {
+                "writing_analysis": analysis,
+                "writing_status": STATUS_DONE,
+                "score_writing": analysis.get("score", 0),
+            }
+            if db is None:
+                # 미리 보기: 입력 파일 기준 총점 (DB 반영 시에는 저장된 문서 기준으로 계산)
+                update = aggregates.with_total(data, update)
+            pending_writes.append((doc_id, update))
+            if len(pending_writes) >= WRITE_BATCH_SIZE:
+                flush_writes()
+
+    started_at = time.perf_counter()
+    submitted = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="regrade") as pool:
+            for doc_id, data in select_records(records, statuses, done, jobs_db or db, stats):
+                while not slots.acquire(timeout=0.2):
+                    drain(block=False)
+                pool.submit(grade_one, doc_id, data)
+                submitted += 1
+                drain(block=False)
+            while stats["graded"] + stats["failed"] < submitted:
+                drain(block=True)
+        flush_writes()
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    elapsed = time.perf_counter() - started_at
+    latencies = sorted(stats.pop("latencies"))
+    stats.update({
+        "submitted": submitted,
+        "elapsed_sec": elapsed,
+        "per_minute": stats["graded"] / elapsed * 60 if elapsed > 0 else 0.0,
+        "latency_p50": statistics.median(latencies) if latencies else 0.0,
+        "latency_p95": latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else
+                       (latencies[-1] if latencies else 0.0),
+        "results": done,
+    })
+    return stats
+
+
+def _load_records(args):
+    if args.input:
+        if args.input.endswith('.csv'):
+            with open(args.input, 'r', encoding='utf-8-sig', newline='') as f:
+                for row in csv.DictReader(f):
+                    for field in ("total_score", "score_writing"):
+                        row[field] = int(row[field]) if row.get(field) else 0
+                    yield row.get("doc_id"), row
+        else:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                for line in f:
+                    data = json.loads(line)
+                    yield data.get("doc_id"), data
+        return
+    from export import init_firestore, iter_result_docs
+    for doc in iter_result_docs(init_firestore(args.credentials)):
+        yield doc.id, doc.to_dict()
+
+
+def main():
+    from question_bank import QuestionBank
+
+    parser = argparse.ArgumentParser(description="쓰기 답안 일괄 (재)채점")
+    parser.add_argument('--credentials', help="Firebase 서비스 계정 키(JSON) 경로 (조회 및 --apply 대상)")
+    parser.add_argument('--input', help="export.py로 내보낸 결과 파일 (.jsonl / .csv), 주면 DB 대신 읽음")
+    parser.add_argument('--problems', default='problems.json')
+    parser.add_argument('--all', action='store_true', help="이미 채점된 답안도 다시 채점")
+    parser.add_argument('--apply', action='store_true', help="채점 결과를 Firestore에 반영")
+    parser.add_argument('--output', help="채점 결과 CSV 경로 (체크포인트의 이전 결과 포함)")
+    parser.add_argument('--checkpoint', help=f"진행 기록 파일 (기본: --apply 이면 {CHECKPOINT_PATHS[True]}, "
+                                             f"아니면 {CHECKPOINT_PATHS[False]})")
+    parser.add_argument('--grader', choices=['gemini', 'fake'], default='gemini')
+    parser.add_argument('--fake-delay', type=float, default=0.0, help="가짜 채점기 응답 지연(초)")
+    parser.add_argument('--rate', type=float, default=0, help="분당 최대 모델 호출 수 (0 = 제한 없음)")
+    parser.add_argument('--max-in-flight', type=int, default=4)
+    parser.add_argument('--max-attempts', type=int, default=3)
+    parser.add_argument('--cache-path', help="쓰기 채점 캐시 SQLite 파일 (같은 답안 재호출 방지)")
+    args = parser.parse_args()
+
+    if not args.input and not args.credentials:
+        parser.error("--credentials 또는 --input 이 필요합니다.")
+    if args.apply and not args.credentials:
+        parser.error("--apply 는 --credentials 와 함께 사용해야 합니다.")
+
+    if args.grader == 'fake':
+        grader = make_grader('fake', delay_sec=args.fake_delay)
+    else:
+        import google.generativeai as genai
+        genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+        grader = make_grader('gemini')
+    if args.cache_path:
+        from grading_cache import CachedGrader, GradingCache
+        grader = CachedGrader(grader, GradingCache(path=args.cache_path))
+
+    db = None
+    if args.credentials:
+        from export import init_firestore
+        db = init_firestore(args.credentials)
+
+    stats = regrade(
+        _load_records(args), grader,
+        question_bank=QuestionBank.from_file(args.problems),
+        db=db if args.apply else None,
+        jobs_db=db,
+        checkpoint_path=args.checkpoint or CHECKPOINT_PATHS[args.apply],
+        statuses=() if args.all else (STATUS_PENDING, STATUS_FAILED),
+        rate_per_min=args.rate,
+        max_in_flight=args.max_in_flight,
+        max_attempts=args.max_attempts,
+    )
+    print(f"채점 {stats['graded']}건, 실패 {stats['failed']}건, DB 반영 {stats['applied']}건, "
+          f"이전 실행에서 완료 {stats['skipped']}건, 채점 큐에서 처리 중 {stats['in_queue']}건")
+    print(f"처리량 {stats['per_minute']:.1f}건/분 ({stats['elapsed_sec']:.1f}초), "
+          f"채점 지연 p50 {stats['latency_p50']:.2f}초 / p95 {stats['latency_p95']:.2f}초")
+
+    if args.output and stats["results"]:
+        with open(args.output, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=[
+                "doc_id", "score_writing", "total_score", "content", "structure", "grammar", "feedback"])
+            writer.writeheader()
+            for doc_id, entry in stats["results"].items():
+                analysis = entry["writing_analysis"]
+                breakdown = analysis.get("breakdown") or {}
+                writer.writerow({
+                    "doc_id": doc_id,
+                    "score_writing": entry["score_writing"],
+                    "total_score": entry["total_score"],
+                    "content": breakdown.get("content"),
+                    "structure": breakdown.get("structure"),
+                    "grammar": breakdown.get("grammar"),
+                    "feedback": analysis.get("feedback"),
+                })
+
+
+if __name__ == '__main__':
+    main()
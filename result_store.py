@@ -0,0 +1,229 @@
+from collections import OrderedDict
+import datetime
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+
+import aggregates
+import exam_codes
+import grading_queue
+from firestore_ops import run_transaction, server_timestamp
+import metrics
+
+# --- [설정] 결과 저장 ---
+RESULTS_COLLECTION = 'korean_test_results'
+WAL_FILENAME = 'results.wal'
+ACK_FILENAME = 'results.ack'
+RECENT_IDS_SIZE = 10000  # 이미 기록된 결과 ID 보관 수 (중복 저장 무시용)
+
+
+def submission_id(code, start_time):
+    """응시 1회의 결과 문서 ID (수험번호 + 시작 시각에서 결정, Firestore 자동 ID와 같은 20자)"""
+    return hashlib.sha256(f"{code}|{start_time!r}".encode('utf-8')).hexdigest()[:20]
+
+
+class ResultStore:
+    """시험 결과 저장 계층 (로컬 WAL + 백그라운드 일괄 기록)
+
+    `save()`는 결과를 로컬 로그 파일(WAL)에 append + fsync 한 뒤 바로 반환한다.
+    백그라운드 flusher 스레드가 쌓인 결과를 Firestore batch로 묶어 기록하고, 성공한
+    문서 ID를 ack 파일에 남긴다. 실패하면 지수 백오프로 재시도하며, 재시작 시
+    `start()`가 ack 되지 않은 기록을 다시 올린다. 모든 기록이 ack 되면 로그를 비운다.
+    같은 결과 ID를 다시 저장하면 (rerun 등) 무시한다.
+    결과 집계(`aggregates`) 변경분과 수험번호 색인(`exam_codes`)은 같은 트랜잭션에 함께 기록되어
+    결과와 함께 반영된다. 이미 저장된 결과 문서(commit 후 ack 전에 중단되어 다시 올리는 기록 등)는
+    건너뛰므로 집계에 두 번 더해지거나 채점 결과를 덮어쓰지 않는다.
+    결과와 함께 저장한 쓰기 채점 작업(`grading_job`)도 같은 트랜잭션에 기록되므로, 제출 시점에는
+    DB를 전혀 부르지 않는다. 기록이 끝난 결과 ID는 `add_commit_listener()`로 등록한 함수에
+    알린다 (쓰기 채점 시작 등).
+    `timestamp`는 제출 시각(정렬용), `stored_at`은 처음 기록된 서버 시각, `updated_at`은 마지막으로
+    기록된 서버 시각(증분 내보내기 기준, 이후 갱신은 `aggregates.update_results`가 올림)이다.
+    """
+
+    def __init__(self, db, wal_dir='.wal', batch_size=100, flush_interval_sec=1.0,
+                 base_delay_sec=1.0, max_delay_sec=60.0):
+        self.db = db
+        self.wal_dir = wal_dir
+        self.batch_size = min(batch_size, 166)  # Firestore batch 최대 500건 (결과당 색인 + 채점 작업 + 집계 문서 1건)
+        self.flush_interval_sec = flush_interval_sec
+        self.base_delay_sec = base_delay_sec
+        self.max_delay_sec = max_delay_sec
+
+        os.makedirs(wal_dir, exist_ok=True)
+        self._wal_path = os.path.join(wal_dir, WAL_FILENAME)
+        self._ack_path = os.path.join(wal_dir, ACK_FILENAME)
+        self._file_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._unacked = set()
+        self._recent = OrderedDict()  # 최근 ack 된 결과 ID
+        self._listeners = []
+        self._thread = None
+        self._stopped = threading.Event()
+        self.stats = {"saved": 0, "duplicates": 0, "flushed": 0, "batches": 0, "failures": 0, "replayed": 0,
+                      "already_stored": 0}
+
+    # --- 생명주기 ---
+    def start(self):
+        """미기록 결과를 복구하고 flusher 스레드 시작"""
+        if self._thread is not None:
+            return
+        for record in self._replay():
+            if record["id"] in self._unacked:
+                continue
+            self._unacked.add(record["id"])
+            self._queue.put(record)
+            self.stats["replayed"] += 1
+        self._thread = threading.Thread(target=self._flusher, name="result-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """남은 결과를 기록하고 flusher 종료"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _replay(self):
+        if not os.path.exists(self._wal_path):
+            return []
+        acked = set()
+        if os.path.exists(self._ack_path):
+            with open(self._ack_path, 'r', encoding='utf-8') as f:
+                acked = {line.strip() for line in f if line.strip()}
+        records = {}
+        with open(self._wal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 도중 종료되어 잘린 마지막 줄
+                    continue
+                if record["id"] not in acked:
+                    records[record["id"]] = record
+        return list(records.values())
+
+    # --- 저장 ---
+    def save(self, result_id, doc_data, grading_job=None):
+        """결과를 WAL에 기록하고 Firestore 기록은 flusher에 맡김 (이미 저장한 ID면 무시)
+
+        grading_job: 결과 문서와 함께 기록할 쓰기 채점 작업 (`grading_queue.new_job`)
+        """
+        record = {"id": result_id, "submitted_at": time.time(), "data": doc_data}
+        if grading_job is not None:
+            record["grading_job"] = grading_job
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with metrics.span('result.wal_append'), self._file_lock:
+            if result_id in self._unacked or result_id in self._recent:
+                self.stats["duplicates"] += 1
+                return result_id
+            with open(self._wal_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._unacked.add(result_id)
+        self._queue.put(record)
+        self.stats["saved"] += 1
+        return result_id
+
+    def add_commit_listener(self, callback):
+        """결과가 Firestore에 기록될 때마다 callback(결과 ID 목록) 호출 (flusher 스레드에서)"""
+        self._listeners.append(callback)
+
+    def pending(self):
+        with self._file_lock:
+            return len(self._unacked)
+
+    # --- 백그라운드 기록 ---
+    def _next_batch(self):
+        batch = []
+        deadline = time.time() + self.flush_interval_sec
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flusher(self):
+        failures = 0
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if self._stopped.is_set():
+                    return
+                continue
+            try:
+                with metrics.span('firestore.results_commit'):
+                    self._commit(batch)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                self.stats["failures"] += 1
+                print(f"결과 일괄 기록 오류 ({len(batch)}건, {failures}회차): {e}")
+                for record in batch:
+                    self._queue.put(record)
+                if self._stopped.is_set():
+                    return
+                time.sleep(min(self.max_delay_sec, self.base_delay_sec * (2 ** (failures - 1))))
+
+    def _commit(self, records):
+        metrics.count('external_calls', service='firestore')
+        already_stored = run_transaction(self.db, self._write_records, records)
+
+        self.stats["already_stored"] += already_stored
+        self.stats["batches"] += 1
+        self.stats["flushed"] += len(records)
+        result_ids = [record["id"] for record in records]
+        self._ack(result_ids)
+        for callback in self._listeners:
+            try:
+                callback(result_ids)
+            except Exception as e:
+                print(f"결과 기록 알림 오류: {e}")
+
+    def _write_records(self, transaction, records):
+        """아직 없는 결과 문서만 기록 (트랜잭션 함수라 재실행될 수 있음, 반환: 이미 있던 문서 수)"""
+        collection = self.db.collection(RESULTS_COLLECTION)
+        references = [collection.document(record["id"]) for record in records]
+        stored = {snapshot.id for snapshot in self.db.get_all(references, transaction=transaction) if snapshot.exists}
+        delta = {}
+        for record, reference in zip(records, references):
+            if reference.id in stored:
+                continue
+            data = dict(record["data"])
+            data["timestamp"] = datetime.datetime.fromtimestamp(record["submitted_at"], datetime.timezone.utc)
+            data["stored_at"] = data["updated_at"] = server_timestamp()
+            transaction.set(reference, data)
+            if data.get("univ_enc"):
+                exam_codes.add_index_to_batch(transaction, self.db, data["univ_enc"], record["id"], data["timestamp"])
+            if record.get("grading_job"):
+                grading_queue.add_job_to_batch(transaction, self.db, record["grading_job"])
+            aggregates.merge_delta(delta, aggregates.result_delta(data))
+        aggregates.add_to_batch(transaction, self.db, delta)
+        return len(stored)
+
+    def _ack(self, result_ids):
+        with self._file_lock:
+            with open(self._ack_path, 'a', encoding='utf-8') as f:
+                f.write("".join(f"{result_id}\n" for result_id in result_ids))
+                f.flush()
+                os.fsync(f.fileno())
+            self._unacked.difference_update(result_ids)
+            for result_id in result_ids:
+                self._recent[result_id] = None
+            while len(self._recent) > RECENT_IDS_SIZE:
+                self._recent.popitem(last=False)
+            if not self._unacked:
+                self._compact()
+
+    def _compact(self):
+        """모든 결과가 기록되었으면 로그 파일을 비움 (_file_lock 보유 상태에서 호출)"""
+        for path in (self._wal_path, self._ack_path):
+            with open(path, 'w', encoding='utf-8'):
+                pass
@@ -0,0 +1,236 @@
+"""객관식 채점 (정답 키 배열 + 집단 일괄 재채점)
+
+    python scoring.py --credentials firebase_key.json --output rescored.csv
+    python scoring.py --input results.jsonl --output rescored.csv   # export.py --format jsonl 결과
+    python scoring.py --credentials firebase_key.json --apply   # 바뀐 점수를 DB에 반영
+    python scoring.py --credentials firebase_key.json --as-submitted   # 응시 당시 문제 은행 버전으로 재현
+"""
+import argparse
+import csv
+import json
+
+import numpy as np
+
+from item_details import unpack_details
+
+# --- [설정] 영역별 점수 필드 ---
+SECTION_TYPES = ["문법", "어휘", "읽기", "쓰기"]
+SCORE_FIELDS = {"문법": "score_grammar", "어휘": "score_vocab", "읽기": "score_reading", "쓰기": "score_writing"}
+UNANSWERED = -1
+APPLY_BATCH_SIZE = 400  # --apply 트랜잭션 1회당 결과 수 (집계 문서를 더해도 Firestore 쓰기 한도 500건 이하)
+
+
+class AnswerKey:
+    """문제 은행 전체의 정답 키 (문항 ID -> 열 번호, 정답 위치/배점/영역 배열)"""
+
+    def __init__(self, question_bank):
+        questions = [q for q in question_bank.by_id.values() if q.get('type') != '쓰기']
+        self.question_ids = tuple(q['id'] for q in questions)
+        self.column = {qid: i for i, qid in enumerate(self.question_ids)}
+        self.answers = np.array([q['answer'] for q in questions], dtype=np.int8)
+        self.points = np.array([q['score'] for q in questions], dtype=np.int16)
+        self.types = tuple(q.get('type') for q in questions)
+        self.options = {q['id']: q['options'] for q in questions}
+        # 문항 x 영역 원-핫 행렬 (점수 행렬과 곱해 영역별 소계 계산)
+        self.type_matrix = np.array(
+            [[1 if t == section else 0 for section in SECTION_TYPES] for t in self.types], dtype=np.int16)
+
+    def choice_index(self, qid, user_ans):
+        """저장된 답(보기 위치 또는 보기 문자열)을 보기 위치로 변환"""
+        if user_ans is None or isinstance(user_ans, bool):
+            return UNANSWERED
+        if isinstance(user_ans, int):
+            return user_ans
+        try:
+            return self.options[qid].index(user_ans)
+        except (KeyError, ValueError):
+            return UNANSWERED
+
+    def score_form(self, questions, answers):
+        """세션 1명 채점: (영역별 점수, 객관식 합계, 영역별 만점, 총 만점, 문항별 결과)"""
+        scores = {t: 0 for t in SECTION_TYPES}
+        max_scores = {t: 0 for t in SECTION_TYPES}
+        total_max_score = 0
+        details = {}
+
+        for q in questions:
+            q_type = q.get('type')
+            total_max_score += q['score']
+            if q_type in max_scores:
+                max_scores[q_type] += q['score']
+            if q_type == '쓰기':
+                continue
+
+            choice = answers.get(q['id'])
+            is_correct = choice is not None and choice == q['answer']
+            if is_correct and q_type in scores:
+                scores[q_type] += q['score']
+            details[q['id']] = {
+                "type": q_type,
+                "user_ans": q['options'][choice] if choice is not None else None,
+                "choice": choice,
+                "correct": is_correct,
+                "score_earned": q['score'] if is_correct else 0
+            }
+
+        score_obj = sum(d["score_earned"] for d in details.values())
+        return scores, score_obj, max_scores, total_max_score, details
+
+    def choice_matrix(self, details_list):
+        """문항별 결과 목록을 (응시자 x 문항) 선택 행렬로 변환 (미출제/무응답은 -1)"""
+        matrix = np.full((len(details_list), len(self.question_ids)), UNANSWERED, dtype=np.int8)
+        presented = np.zeros(matrix.shape, dtype=bool)
+        for row, details in enumerate(details_list):
+            for qid, item in details.items():
+                col = self.column.get(qid)
+                if col is None:
+                    continue
+                presented[row, col] = True
+                choice = item.get("choice")
+                if choice is None:
+                    choice = self.choice_index(qid, item.get("user_ans"))
+                matrix[row, col] = choice
+        return matrix, presented
+
+    def score_matrix(self, matrix):
+        """선택 행렬을 한 번에 채점: (정오 행렬, 영역별 소계 행렬 [응시자 x 영역])"""
+        correct = matrix == self.answers[np.newaxis, :]
+        earned = correct * self.points[np.newaxis, :]
+        return correct, earned @ self.type_matrix, earned.sum(axis=1)
+
+
+def rescore(key, records):
+    """저장된 결과들을 현재 정답 키로 다시 채점
+
+    records: (doc_id, 결과 dict) 목록. 결과 dict에는 문항별 결과(items 또는 details_obj)와
+    기존 점수 필드가 있어야 한다.
+    반환: 행 dict 목록 (doc_id, 기존/새 점수 필드, changed 여부)
+    """
+    records = list(records)
+    details_list = [unpack_details(data) for _, data in records]
+    matrix, _ = key.choice_matrix(details_list)
+    _, subtotals, score_obj = key.score_matrix(matrix)
+
+    rows = []
+    for i, (doc_id, data) in enumerate(records):
+        row = {"doc_id": doc_id}
+        for j, section in enumerate(SECTION_TYPES[:3]):
+            field = SCORE_FIELDS[section]
+            row[f"old_{field}"] = data.get(field)
+            row[field] = int(subtotals[i, j])
+        score_writing = data.get("score_writing") or 0
+        row["score_writing"] = score_writing
+        row["old_total_score"] = data.get("total_score")
+        row["total_score"] = int(score_obj[i]) + score_writing
+        row["changed"] = row["total_score"] != row["old_total_score"] or any(
+            row[SCORE_FIELDS[s]] != row[f"old_{SCORE_FIELDS[s]}"] for s in SECTION_TYPES[:3])
+        rows.append(row)
+    return rows
+
+
+def rescore_as_submitted(records, fallback_key, snapshot_dir, db=None):
+    """결과마다 저장된 bank_version의 보관본(로컬 사본 / db 공유 보관본) 정답 키로 다시 채점
+
+    bank_version이 없는 (버전 관리 이전) 결과는 fallback_key로 채점한다.
+    보관본이 없는 버전이 하나라도 있으면 다른 키로 대신하지 않고 UnknownBankVersion.
+    반환: 행 dict 목록
+    """
+    from bank_snapshots import UnknownBankVersion, load_archived
+    from question_bank import QuestionBank
+
+    groups = {}
+    for doc_id, data in records:
+        groups.setdefault(data.get("bank_version"), []).append((doc_id, data))
+
+    keys = {None: fallback_key}
+    for version in groups:
+        if version:
+            source = load_archived(version, snapshot_dir, db)
+            keys[version] = AnswerKey(QuestionBank.from_bytes(source)) if source is not None else None
+    missing = sorted(version for version, key in keys.items() if key is None)
+    if missing:
+        raise UnknownBankVersion(f"보관본이 없는 문제 은행 버전: {', '.join(missing)}")
+
+    rows = []
+    for version, group in groups.items():
+        for row in rescore(keys[version or None], group):
+            row["bank_version"] = version
+            rows.append(row)
+    return rows
+
+
+def _load_records(args):
+    if args.input:
+        from export import unflatten_details
+        with open(args.input, 'r', encoding='utf-8') as f:
+            for line in f:
+                data = json.loads(line)
+                if "details_obj" not in data:
+                    data["details_obj"] = unflatten_details(data)
+                yield data.get("doc_id"), data
+        return
+    from export import init_firestore, iter_result_docs
+    for doc in iter_result_docs(init_firestore(args.credentials)):
+        yield doc.id, doc.to_dict()
+
+
+def main():
+    from bank_snapshots import SNAPSHOT_DIR, UnknownBankVersion
+    from question_bank import QuestionBank
+
+    parser = argparse.ArgumentParser(description="정답 키 수정 후 전체 결과 일괄 재채점")
+    parser.add_argument('--credentials', help="Firebase 서비스 계정 키(JSON) 경로 "
+                                              "(--input이 없으면 결과 조회, --as-submitted 보관본 조회, --apply 대상)")
+    parser.add_argument('--input', help="export.py로 내보낸 결과 JSONL 파일 (주면 DB 대신 읽음)")
+    parser.add_argument('--problems', default='problems.json')
+    parser.add_argument('--output', help="재채점 결과 CSV 경로")
+    parser.add_argument('--apply', action='store_true', help="바뀐 점수를 Firestore에 반영")
+    parser.add_argument('--as-submitted', action='store_true',
+                        help="결과별 bank_version의 보관본으로 채점 (응시 당시 점수 재현)")
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR, help="문제 은행 버전 보관 폴더")
+    args = parser.parse_args()
+    if not args.input and not args.credentials:
+        parser.error("--credentials 또는 --input 이 필요합니다.")
+
+    key = AnswerKey(QuestionBank.from_file(args.problems))
+    if args.as_submitted:
+        db = None
+        if args.credentials:
+            from export import init_firestore
+            db = init_firestore(args.credentials)
+        try:
+            rows = rescore_as_submitted(_load_records(args), key, args.snapshot_dir, db)
+        except UnknownBankVersion as e:
+            parser.exit(1, f"{e}\n")
+    else:
+        rows = rescore(key, _load_records(args))
+    changed = [row for row in rows if row["changed"]]
+    print(f"{len(rows)}건 재채점, 점수 변경 {len(changed)}건")
+
+    if args.output and rows:
+        with open(args.output, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if args.apply:
+        if not args.credentials:
+            parser.error("--apply 는 --credentials 와 함께 사용해야 합니다.")
+        import aggregates
+        from export import init_firestore
+        db = init_firestore(args.credentials)
+        # 영역 점수만 보내고 총점은 트랜잭션 안에서 저장된 문서 기준으로 계산 (그 사이 반영된
+        # 쓰기 점수를 덮어쓰지 않음), 집계 문서도 같은 트랜잭션에서 갱신
+        missing = []
+        for start in range(0, len(changed), APPLY_BATCH_SIZE):
+            missing += aggregates.update_results(db, {
+                row["doc_id"]: {field: row[field] for field in ["score_grammar", "score_vocab", "score_reading"]}
+                for row in changed[start:start + APPLY_BATCH_SIZE]
+            })
+        for doc_id in missing:
+            print(f"결과 문서 없음 ({doc_id}): 반영하지 않음")
+        print(f"{len(changed) - len(missing)}건 반영 완료")
+
+
+if __name__ == '__main__':
+    main()
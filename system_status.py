@@ -0,0 +1,118 @@
+import threading
+import time
+
+import metrics
+
+# --- [설정] 시스템 상태 문서 ---
+CONFIG_COLLECTION = 'config'
+SETTINGS_DOCUMENT = 'settings'
+
+
+class SystemStatusCache:
+    """시험 활성화 여부(`is_active`)의 프로세스 전역 캐시
+
+    평소에는 메모리 값을 그대로 돌려주고, TTL이 지났을 때만 Firestore를 다시 읽는다.
+    Firestore 스냅샷 리스너가 붙어 있으면 관리자의 변경이 TTL을 기다리지 않고 즉시
+    반영된다. DB에 접근할 수 없으면 마지막으로 알던 값(없으면 기본값)을 사용한다.
+    """
+
+    def __init__(self, db, ttl_sec=5.0, error_ttl_sec=2.0, default=True):
+        self.db = db
+        self.ttl_sec = ttl_sec
+        self.error_ttl_sec = error_ttl_sec
+        self.default = default
+
+        self._state = {"is_active": None, "expires_at": 0.0}
+        self._refresh_lock = threading.Lock()
+        self._watch = None
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "errors": 0,
+            "stale_served": 0,
+            "listener_updates": 0,
+        }
+
+    @property
+    def _doc_ref(self):
+        return self.db.collection(CONFIG_COLLECTION).document(SETTINGS_DOCUMENT)
+
+    def get(self):
+        """현재 시험 활성화 여부"""
+        state = self._state
+        if time.time() < state["expires_at"]:
+            self.metrics["hits"] += 1
+            return state["is_active"]
+
+        # 이미 다른 스레드가 갱신 중이면 기존 값으로 응답 (동시 조회 폭주 방지)
+        if state["is_active"] is not None and not self._refresh_lock.acquire(blocking=False):
+            self.metrics["stale_served"] += 1
+            return state["is_active"]
+        if state["is_active"] is None:
+            self._refresh_lock.acquire()
+        try:
+            if time.time() < self._state["expires_at"]:
+                self.metrics["hits"] += 1
+                return self._state["is_active"]
+            self.metrics["misses"] += 1
+            return self._refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self):
+        try:
+            with metrics.span('firestore.status_read'):
+                metrics.count('external_calls', service='firestore')
+                doc = self._doc_ref.get()
+            if doc.exists:
+                is_active = doc.to_dict().get('is_active', True)
+            else:
+                self._doc_ref.set({'is_active': True})
+                is_active = True
+            self._publish(is_active, self.ttl_sec)
+        except Exception as e:
+            # 오류 시 마지막 값 유지 (없으면 기본값: 접속 허용)
+            print(f"시스템 상태 조회 오류: {e}")
+            self.metrics["errors"] += 1
+            is_active = self._state["is_active"]
+            if is_active is None:
+                is_active = self.default
+            self._publish(is_active, self.error_ttl_sec)
+        return is_active
+
+    def _publish(self, is_active, ttl_sec):
+        self._state = {"is_active": is_active, "expires_at": time.time() + ttl_sec}
+
+    def set(self, is_active):
+        """시험 활성화 여부를 DB에 저장하고 캐시에 바로 반영"""
+        self._doc_ref.set({'is_active': is_active}, merge=True)
+        self._publish(is_active, self.ttl_sec)
+
+    def invalidate(self):
+        self._state = {"is_active": self._state["is_active"], "expires_at": 0.0}
+
+    def start_listener(self):
+        """Firestore 스냅샷 리스너로 변경 사항을 즉시 반영 (실패 시 TTL 폴링만 사용)"""
+        if self._watch is not None:
+            return True
+        try:
+            self._watch = self._doc_ref.on_snapshot(self._on_snapshot)
+            return True
+        except Exception as e:
+            print(f"시스템 상태 리스너 등록 오류: {e}")
+            return False
+
+    def stop_listener(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+    def _on_snapshot(self, doc_snapshots, changes, read_time):
+        for doc in doc_snapshots:
+            if doc.exists:
+                self.metrics["listener_updates"] += 1
+                self._publish(doc.to_dict().get('is_active', True), self.ttl_sec)
+
+    def hit_rate(self):
+        total = self.metrics["hits"] + self.metrics["misses"]
+        return self.metrics["hits"] / total if total else 0.0
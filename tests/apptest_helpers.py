@@ -0,0 +1,66 @@
+"""AppTest 공용 도구: app.py를 메모리 DB / 가짜 채점기로 실행하는 세션과 응시 단계
+
+tests/ 와 benchmarks/ 가 함께 쓴다. AppTest는 같은 프로세스에서 app.py를 실행하므로
+cache_resource 싱글턴(DB, 결과 저장소, 채점 큐 등)은 세션 사이에 공유되며, 여기서는
+gc로 찾아서 관찰한다.
+"""
+import gc
+import os
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+APP = os.path.join(ROOT, 'app.py')
+
+
+def new_session(wal_dir=None, **secrets):
+    """메모리 DB / 가짜 채점기를 쓰는 app.py 세션 (아직 실행 전)"""
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.secrets['GEMINI_API_KEY'] = 'unused'
+    at.secrets['DB_BACKEND'] = 'memory'
+    at.secrets['GRADER_BACKEND'] = 'fake'
+    at.secrets['RESULT_WAL_DIR'] = wal_dir or tempfile.mkdtemp(prefix='apptest_wal_')
+    for key, value in secrets.items():
+        at.secrets[key] = value
+    return at
+
+
+def find(cls):
+    """프로세스 전역 싱글턴 객체 (cache_resource로 만들어진 것, 없으면 None)"""
+    found = [obj for obj in gc.get_objects() if isinstance(obj, cls)]
+    return found[0] if found else None
+
+
+def login(at, number, univ_index=0):
+    """로그인 화면에서 응시자 정보를 입력하고 주의사항 화면으로"""
+    at.text_input[0].set_value(f"응시자{number}")
+    options = at.selectbox[0].options
+    at.selectbox[0].set_value(options[univ_index % len(options)])
+    at.text_input[1].set_value(f"user{number}")
+    at.selectbox[1].set_value('gmail.com')
+    next(b for b in at.button if b.label == '다음 단계로').click().run()
+
+
+def start_exam(at):
+    """주의사항 화면에서 시험 시작"""
+    next(b for b in at.button if b.label.startswith('✅')).click().run()
+
+
+def submit(at):
+    """시험 화면에서 답안 제출"""
+    next(b for b in at.button if b.label.startswith('🏁')).click().run()
+
+
+def wait_for_background(timeout=60):
+    """결과 flush와 쓰기 채점이 모두 끝날 때까지 대기 (시간 안에 끝나면 True)"""
+    from grading_queue import GradingQueue
+    from result_store import ResultStore
+    result_store, grading_queue = find(ResultStore), find(GradingQueue)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if not (result_store and result_store.pending()) and not (grading_queue and grading_queue.in_flight()):
+            return True
+        time.sleep(0.1)
+    return False
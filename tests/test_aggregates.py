@@ -0,0 +1,65 @@
+"""결과 갱신(update_results): 총점은 저장된 문서 기준, 집계는 결과와 항상 일치"""
+import time
+
+import aggregates
+from memory_store import MemoryFirestore
+from result_store import RESULTS_COLLECTION, ResultStore
+
+
+def stored(db, result_id):
+    return db.collection(RESULTS_COLLECTION).document(result_id).get().to_dict()
+
+
+def without_empty_bins(stats):
+    """증분 집계에 남는 0인 구간을 뺀 집계 (다시 만든 집계와 비교용)"""
+    return dict(stats, **{key: {k: v for k, v in stats[key].items() if v}
+                          for key in ("score_hist", "duration_hist")})
+
+
+def rebuilt_stats(db):
+    copy = MemoryFirestore()
+    for doc in db.collection(RESULTS_COLLECTION).stream():
+        copy.collection(RESULTS_COLLECTION).document(doc.id).set(doc.to_dict())
+    aggregates.rebuild(copy)
+    return without_empty_bins(aggregates.read_stats(copy))
+
+
+def make_result(tmp_path):
+    db = MemoryFirestore()
+    ResultStore(db, wal_dir=str(tmp_path))._commit([{"id": "r1", "submitted_at": time.time(), "data": {
+        "univ_enc": "AA대0001", "score_grammar": 10, "score_vocab": 10, "score_reading": 20,
+        "score_writing": 0, "total_score": 40, "writing_status": "pending"}}])
+    return db
+
+
+def test_section_update_recomputes_total_from_stored_doc(tmp_path):
+    db = make_result(tmp_path)
+    # 쓰기 채점 반영이 먼저 끝난 뒤, 그보다 먼저 읽은 문서로 만든 객관식 재채점이 반영됨
+    aggregates.update_results(db, {"r1": {"score_writing": 12, "writing_status": "done"}})
+    aggregates.update_results(db, {"r1": {"score_grammar": 15, "score_vocab": 10, "score_reading": 20}})
+
+    data = stored(db, "r1")
+    assert data["score_writing"] == 12
+    assert data["total_score"] == 15 + 10 + 20 + 12
+    assert without_empty_bins(aggregates.read_stats(db)) == rebuilt_stats(db)
+
+
+def test_explicit_total_is_kept(tmp_path):
+    db = make_result(tmp_path)
+    aggregates.update_results(db, {"r1": {"score_writing": 5, "total_score": 99}})
+    assert stored(db, "r1")["total_score"] == 99
+
+
+def test_repeated_update_changes_stats_once(tmp_path):
+    db = make_result(tmp_path)
+    for _ in range(3):
+        aggregates.update_results(db, {"r1": {"score_writing": 8, "writing_status": "done"}})
+    stats = aggregates.read_stats(db)
+    assert stats["completed"] == 1
+    assert stats["avg_total"] == 48
+    assert without_empty_bins(stats) == rebuilt_stats(db)
+
+
+def test_missing_documents_are_reported(tmp_path):
+    db = make_result(tmp_path)
+    assert aggregates.update_results(db, {"nope": {"score_writing": 1}}) == ["nope"]
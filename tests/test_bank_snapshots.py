@@ -0,0 +1,61 @@
+"""문제 은행 버전: 버전은 보관되는 problems.json으로만 정해지고, 이미지는 버전에 고정되지 않음"""
+import json
+import os
+import shutil
+
+import pytest
+
+from bank_snapshots import BankRegistry, UnknownBankVersion, content_version
+from memory_store import MemoryFirestore
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(ROOT, 'problems.json'), tmp_path)
+    shutil.copytree(os.path.join(ROOT, 'assets'), tmp_path / 'assets')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def first_image(registry):
+    return next(q for q in registry.current().bank.by_id.values() if q.get('image'))
+
+
+def test_version_is_hash_of_archived_source(workdir):
+    registry = BankRegistry(MemoryFirestore(), image_cache_bytes=0)
+    assert registry.current().version == content_version((workdir / 'problems.json').read_bytes())
+
+
+def test_image_change_keeps_version_and_refreshes_every_snapshot(workdir):
+    registry = BankRegistry(MemoryFirestore())
+    pinned = registry.current()
+    question = first_image(registry)
+    before = pinned.assets.image(question)
+
+    problems = json.loads((workdir / 'problems.json').read_text(encoding='utf-8'))
+    problems[next(iter(problems))][0]['answer'] ^= 1
+    (workdir / 'problems.json').write_text(json.dumps(problems, ensure_ascii=False), encoding='utf-8')
+    assert registry.reload() != pinned.version
+
+    # 그림 파일만 교체 (다른 문항 그림으로 덮어씀)
+    other = next(q['image'] for q in registry.current().bank.by_id.values()
+                 if q.get('image') and q['image'] != question['image'])
+    shutil.copy(other, question['image'])
+    version = registry.current().version
+    assert registry.reload() == version
+
+    assert registry.get(pinned.version).assets.image(question) != before
+    assert registry.current().assets.image(question) == registry.get(pinned.version).assets.image(question)
+
+
+def test_other_replica_restores_pinned_version_from_db(workdir):
+    db = MemoryFirestore()
+    registry = BankRegistry(db, image_cache_bytes=0)
+    other = BankRegistry(db, snapshot_dir=str(workdir / 'other'), image_cache_bytes=0)
+    other._snapshots.clear()
+    shutil.rmtree(other.snapshot_dir)  # 로컬 사본 없음: 공유 보관본에서 복원
+    assert other.get(registry.current().version).source == registry.current().source
+    with pytest.raises(UnknownBankVersion):
+        other.get('000000000000')
@@ -0,0 +1,47 @@
+"""증분 내보내기: 늦게 기록되거나 기록 후 바뀐 결과도 다음 증분 내보내기에 나오는지 확인"""
+import time
+
+import aggregates
+from export import EXPORT_STATE_DOCUMENT, export_results
+from memory_store import MemoryFirestore
+from result_store import ResultStore
+
+
+def record(result_id, submitted_at, **data):
+    return {"id": result_id, "submitted_at": submitted_at, "data": dict(univ_enc=f"AA대{result_id}", **data)}
+
+
+def incremental(db, tmp_path):
+    return export_results(db, str(tmp_path / "out.jsonl"), fmt='jsonl', incremental=True)[0]
+
+
+def test_late_stored_result_is_exported(tmp_path):
+    db = MemoryFirestore()
+    store = ResultStore(db, wal_dir=str(tmp_path / "wal"))
+    now = time.time()
+    store._commit([record("0002", now + 5, total_score=2)])
+    assert incremental(db, tmp_path) == 1
+    store._commit([record("0001", now, total_score=1)])  # 제출은 먼저, 기록은 내보내기 이후
+    assert incremental(db, tmp_path) == 1
+    assert incremental(db, tmp_path) == 0
+
+
+def test_updated_result_is_exported_again(tmp_path):
+    db = MemoryFirestore()
+    store = ResultStore(db, wal_dir=str(tmp_path / "wal"))
+    store._commit([record("0001", time.time(), total_score=50, writing_status="pending")])
+    assert incremental(db, tmp_path) == 1
+
+    aggregates.update_results(db, {"0001": {"score_writing": 10, "total_score": 60, "writing_status": "done"}})
+    assert incremental(db, tmp_path) == 1
+    assert '"total_score": 60' in (tmp_path / "out.jsonl").read_text(encoding='utf-8')
+    assert incremental(db, tmp_path) == 0
+
+
+def test_watermark_saved_for_another_field_starts_over(tmp_path):
+    db = MemoryFirestore()
+    store = ResultStore(db, wal_dir=str(tmp_path / "wal"))
+    store._commit([record("0001", time.time(), total_score=1)])
+    db.collection(EXPORT_STATE_DOCUMENT[0]).document(EXPORT_STATE_DOCUMENT[1]).set(
+        {"last_exported_at": "stored_at 기준 값"})
+    assert incremental(db, tmp_path) == 1
@@ -0,0 +1,164 @@
+"""쓰기 채점 큐: hold / release, 재시도 / 백오프, 복구, 결과 문서가 없는 작업의 대기 상한"""
+import time
+
+import pytest
+
+from grading import FakeGrader
+from grading_queue import (JOBS_COLLECTION, RESULTS_COLLECTION, STATUS_DONE, STATUS_FAILED, STATUS_PENDING,
+                           STATUS_RUNNING, GradingQueue, new_job)
+from memory_store import MemoryFirestore
+from result_store import ResultStore
+
+WRITING = "그래프를 보면 대학생의 독서 시간이 해마다 줄어들고 있다."
+
+
+def make_queue(db, grader=None, **options):
+    options = dict(dict(max_workers=2, base_delay_sec=0.01, max_delay_sec=0.05), **options)
+    grading_queue = GradingQueue(db, grader or FakeGrader(), **options)
+    grading_queue.start()
+    return grading_queue
+
+
+def wait_idle(grading_queue, timeout=10):
+    deadline = time.time() + timeout
+    while grading_queue.in_flight() and time.time() < deadline:
+        time.sleep(0.01)
+    return not grading_queue.in_flight()
+
+
+def job_doc(db, result_id):
+    return db.collection(JOBS_COLLECTION).document(result_id).get().to_dict()
+
+
+def result_doc(db, result_id):
+    return db.collection(RESULTS_COLLECTION).document(result_id).get().to_dict()
+
+
+def store_result(db, result_id, job=None):
+    db.collection(RESULTS_COLLECTION).document(result_id).set(
+        {"total_score": 40, "score_writing": 0, "writing_status": STATUS_PENDING})
+    if job is not None:
+        db.collection(JOBS_COLLECTION).document(result_id).set(job)
+
+
+@pytest.fixture
+def db():
+    return MemoryFirestore()
+
+
+def test_held_job_starts_when_result_is_stored(db, tmp_path):
+    grader = FakeGrader()
+    grading_queue = make_queue(db, grader)
+    result_store = ResultStore(db, wal_dir=str(tmp_path), flush_interval_sec=0.05)
+    result_store.add_commit_listener(grading_queue.release)
+
+    grading_queue.submit("r1", "문제", WRITING, hold=True)
+    time.sleep(0.2)
+    assert grader.calls == 0
+    assert grading_queue.get_status("r1")[0] == STATUS_PENDING
+    assert not db.collection(JOBS_COLLECTION).document("r1").get().exists  # 제출 시 DB 쓰기 없음
+
+    result_store.save("r1", {"total_score": 40, "score_writing": 0, "writing_status": STATUS_PENDING},
+                      grading_job=new_job("r1", "문제", WRITING))
+    result_store.start()
+    assert wait_idle(grading_queue)
+    grading_queue.stop()
+    result_store.stop()
+
+    assert grader.calls == 1
+    assert job_doc(db, "r1")["status"] == STATUS_DONE
+    data = result_doc(db, "r1")
+    assert data["writing_status"] == STATUS_DONE
+    assert data["total_score"] == 40 + data["score_writing"]
+
+
+def test_release_before_submit_loads_job_from_db(db):
+    grading_queue = make_queue(db)
+    store_result(db, "r1", new_job("r1", "문제", WRITING))
+    grading_queue.release(["r1"])  # WAL 복구로 기록된 결과 등 메모리에 없는 작업
+    grading_queue.submit("r1", "문제", WRITING, hold=True)
+    assert wait_idle(grading_queue)
+    grading_queue.stop()
+    assert job_doc(db, "r1")["status"] == STATUS_DONE
+
+
+def test_hold_expiry_starts_job_only_after_job_is_stored(db):
+    grader = FakeGrader()
+    grading_queue = make_queue(db, grader, hold_timeout_sec=0.05)
+    grading_queue.submit("r1", "문제", WRITING, hold=True)
+    time.sleep(0.3)  # 결과가 아직 기록되지 않음: hold 유지
+    assert grader.calls == 0 and grading_queue.in_flight() == 1
+
+    store_result(db, "r1", new_job("r1", "문제", WRITING))  # 기록 알림은 놓침
+    assert wait_idle(grading_queue)
+    grading_queue.stop()
+    assert grader.calls == 1
+    assert result_doc(db, "r1")["writing_status"] == STATUS_DONE
+
+
+def test_failed_attempt_is_retried(db):
+    grader = FakeGrader(fail_every=2)
+    grader.grade("문제", "앞선 호출")  # 다음 호출(2번째)이 실패하도록
+    grading_queue = make_queue(db, grader)
+    grading_queue.submit("r1", "문제", WRITING)
+    store_result(db, "r1")
+    assert wait_idle(grading_queue)
+    grading_queue.stop()
+
+    job = job_doc(db, "r1")
+    assert (job["status"], job["attempts"]) == (STATUS_DONE, 2)
+    assert result_doc(db, "r1")["writing_status"] == STATUS_DONE
+
+
+def test_job_fails_after_max_attempts(db):
+    grader = FakeGrader(fail_every=1)
+    grading_queue = make_queue(db, grader, max_attempts=3)
+    grading_queue.submit("r1", "문제", WRITING)
+    store_result(db, "r1")
+    assert wait_idle(grading_queue)
+    grading_queue.stop()
+
+    assert grader.calls == 3
+    assert job_doc(db, "r1")["status"] == STATUS_FAILED
+    data = result_doc(db, "r1")
+    assert (data["writing_status"], data["score_writing"], data["total_score"]) == (STATUS_FAILED, 0, 40)
+    assert grading_queue.get_status("r1")[0] == STATUS_FAILED
+
+
+def test_recover_resumes_unfinished_jobs(db):
+    now = time.time()
+    store_result(db, "pending", new_job("pending", "문제", WRITING))
+    store_result(db, "expired", dict(new_job("expired", "문제", WRITING), status=STATUS_RUNNING,
+                                     leased_until=now - 1))
+    store_result(db, "leased", dict(new_job("leased", "문제", WRITING), status=STATUS_RUNNING,
+                                    leased_until=now + 600))
+    grader = FakeGrader()
+    grading_queue = make_queue(db, grader)
+    time.sleep(0.1)
+    assert wait_idle(grading_queue)
+    grading_queue.stop()
+
+    assert grader.calls == 2
+    assert job_doc(db, "pending")["status"] == STATUS_DONE
+    assert job_doc(db, "expired")["status"] == STATUS_DONE
+    assert job_doc(db, "leased")["status"] == STATUS_RUNNING  # 다른 프로세스가 처리 중
+
+
+def test_job_without_result_fails_after_max_waits(db):
+    db.collection(JOBS_COLLECTION).document("lost").set(new_job("lost", "문제", WRITING))
+    grader = FakeGrader()
+    grading_queue = make_queue(db, grader, max_result_waits=3)
+    time.sleep(0.1)
+    assert wait_idle(grading_queue)
+    grading_queue.stop()
+
+    assert grader.calls == 1  # 대기는 다시 채점하지 않음
+    job = job_doc(db, "lost")
+    assert (job["status"], job["waits"]) == (STATUS_FAILED, 4)
+    assert grading_queue.get_status("lost")[0] == STATUS_FAILED
+
+    # 재시작해도 되살아나지 않음
+    restarted = make_queue(db, grader)
+    time.sleep(0.1)
+    assert restarted.in_flight() == 0
+    restarted.stop()
@@ -0,0 +1,55 @@
+"""쓰기 채점 응답 파싱: 모델이 실제로 돌려준 적이 있는 형태의 응답에서 채점 결과를 얻는지 확인
+
+깨진 응답도 가능한 한 점수를 살리고, 점수는 항상 만점 / 세부 만점 범위 안으로 맞춘다.
+benchmarks/bench_parse_writing.py가 같은 응답 모음으로 기존 방식과 비교한다.
+"""
+import pytest
+
+from grading import WRITING_BREAKDOWN_MAX, WRITING_MAX_SCORE, WritingResponseError, parse_writing_response
+
+VALID = '{"score": 9, "breakdown": {"content": 4, "structure": 3, "grammar": 2}, "feedback": "좋습니다.", "correction": "교정본"}'
+
+# (설명, 응답 텍스트, 기대 총점 또는 None = 채점 결과 없음)
+CORPUS = [
+    ("정상", VALID, 9),
+    ("코드 펜스", "```json\n" + VALID + "\n```", 9),
+    ("앞 설명", "채점 결과는 다음과 같습니다.\n" + VALID, 9),
+    ("뒤 설명", VALID + "\n\n참고: 문법 오류가 몇 군데 있습니다.", 9),
+    ("앞뒤 설명 + 펜스", "네, 채점하겠습니다.\n```json\n" + VALID + "\n```\n추가 질문이 있으면 말씀하세요.", 9),
+    ("펜스 언어 표기 없음", "```\n" + VALID + "\n```", 9),
+    ("뒤쪽 쉼표", '{"score": 7, "breakdown": {"content": 3, "structure": 2, "grammar": 2,}, "feedback": "보통", "correction": "",}', 7),
+    ("문자열 안 중괄호", '{"score": 6, "breakdown": {"content": 2, "structure": 2, "grammar": 2}, "feedback": "{주제}에 대한 내용이 부족합니다 }", "correction": "x"}', 6),
+    ("문자열 안 줄바꿈", '{"score": 5, "breakdown": {"content": 2, "structure": 2, "grammar": 1}, "feedback": "첫째 줄\n둘째 줄", "correction": ""}', 5),
+    ("범위 초과 점수", '{"score": 20, "breakdown": {"content": 7, "structure": 5, "grammar": 4}, "feedback": "", "correction": ""}', 13),
+    ("음수 점수", '{"score": -1, "breakdown": {"content": -1, "structure": 0, "grammar": 0}, "feedback": "", "correction": ""}', 0),
+    ("문자열 점수", '{"score": "8", "breakdown": {"content": "3", "structure": "3/4", "grammar": 2.4}, "feedback": "", "correction": ""}', 8),
+    ("총점-세부 불일치", '{"score": 12, "breakdown": {"content": 3, "structure": 2, "grammar": 2}, "feedback": "", "correction": ""}', 7),
+    ("세부 점수 없음", '{"score": 10, "feedback": "좋음", "correction": ""}', 10),
+    ("feedback 누락", '{"score": 4, "breakdown": {"content": 2, "structure": 1, "grammar": 1}}', 4),
+    ("correction이 목록", '{"score": 4, "breakdown": {"content": 2, "structure": 1, "grammar": 1}, "feedback": "", "correction": ["a", "b"]}', 4),
+    ("끝이 잘림", '{"score": 8, "breakdown": {"content": 3, "structure": 3, "grammar": 2}, "feedback": "좋습니다"', 8),
+    ("예시 + 실제 결과", '출력 형식 예: {"example": true}\n실제 결과: ' + VALID, 9),
+    ("JSON 없음", "죄송합니다. 이 답안은 채점할 수 없습니다.", None),
+    ("빈 응답", "", None),
+]
+
+
+GRADABLE = [case for case in CORPUS if case[2] is not None]
+UNGRADABLE = [case for case in CORPUS if case[2] is None]
+
+
+@pytest.mark.parametrize("label,text,expected", GRADABLE, ids=[case[0] for case in GRADABLE])
+def test_parses_score_within_range(label, text, expected):
+    result = parse_writing_response(text)
+    assert result["score"] == expected
+    assert 0 <= result["score"] <= WRITING_MAX_SCORE
+    for key, maximum in WRITING_BREAKDOWN_MAX.items():
+        assert 0 <= result["breakdown"][key] <= maximum
+    assert isinstance(result["feedback"], str)
+    assert isinstance(result["correction"], str)
+
+
+@pytest.mark.parametrize("label,text,expected", UNGRADABLE, ids=[case[0] for case in UNGRADABLE])
+def test_rejects_response_without_result(label, text, expected):
+    with pytest.raises(WritingResponseError):
+        parse_writing_response(text)
@@ -0,0 +1,58 @@
+"""쓰기 일괄 재채점: 총점은 저장된 문서 기준, 채점 큐가 처리 중인 답안은 건너뜀"""
+import time
+
+import aggregates
+from grading import FakeGrader
+from grading_queue import JOBS_COLLECTION, STATUS_FAILED, STATUS_PENDING, STATUS_RUNNING
+from memory_store import MemoryFirestore
+from regrade import regrade
+from result_store import RESULTS_COLLECTION, ResultStore
+
+RESULT = {"univ_enc": "AA대0001", "score_grammar": 10, "score_vocab": 10, "score_reading": 20,
+          "score_writing": 0, "total_score": 40, "writing_status": STATUS_FAILED,
+          "writing_original": "그래프를 보면 대학생의 독서 시간이 해마다 줄어들고 있다."}
+
+
+def make_db(tmp_path, **changes):
+    db = MemoryFirestore()
+    ResultStore(db, wal_dir=str(tmp_path / "wal"))._commit(
+        [{"id": "r1", "submitted_at": time.time(), "data": dict(RESULT, **changes)}])
+    return db
+
+
+def stored(db):
+    return db.collection(RESULTS_COLLECTION).document("r1").get().to_dict()
+
+
+def test_stale_input_does_not_restore_old_objective_score(tmp_path):
+    db = make_db(tmp_path)
+    stale = stored(db)
+    # 입력 파일을 내보낸 뒤 객관식이 재채점됨 (scoring.py --apply)
+    aggregates.update_results(db, {"r1": {"score_grammar": 20}})
+
+    stats = regrade([("r1", stale)], FakeGrader(), db=db)
+    data = stored(db)
+    assert stats["applied"] == 1
+    assert data["score_grammar"] == 20
+    assert data["total_score"] == 20 + 10 + 20 + data["score_writing"]
+    assert stats["results"]["r1"]["total_score"] == data["total_score"]
+
+
+def test_preview_uses_input_totals(tmp_path):
+    stats = regrade([("r1", dict(RESULT))], FakeGrader())
+    entry = stats["results"]["r1"]
+    assert entry["total_score"] == 40 + entry["score_writing"]
+
+
+def test_pending_answer_held_by_live_queue_is_skipped(tmp_path):
+    db = make_db(tmp_path, writing_status=STATUS_PENDING)
+    jobs = db.collection(JOBS_COLLECTION)
+    grader = FakeGrader()
+
+    jobs.document("r1").set({"status": STATUS_RUNNING, "leased_until": time.time() + 60})
+    stats = regrade([("r1", stored(db))], grader, db=db)
+    assert (grader.calls, stats["in_queue"]) == (0, 1)
+
+    jobs.document("r1").set({"status": STATUS_PENDING, "next_attempt_at": time.time() - 3600})
+    stats = regrade([("r1", stored(db))], grader, db=db)
+    assert (grader.calls, stats["applied"]) == (1, 1)
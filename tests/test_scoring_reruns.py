@@ -0,0 +1,54 @@
+"""채점 화면을 여러 번 다시 실행해도 채점 / 저장은 제출 1건당 한 번만 일어나는지 확인
+
+cache_resource 싱글턴은 같은 프로세스의 다른 테스트와 공유되므로, 제출 전후의 차이로 센다.
+"""
+import uuid
+
+import aggregates
+from grading import FakeGrader
+from grading_queue import JOBS_COLLECTION, RESULTS_COLLECTION
+from memory_store import MemoryFirestore
+from result_store import ResultStore
+
+from tests.apptest_helpers import find, login, new_session, start_exam, submit, wait_for_background
+
+RERUNS = 20
+
+
+def count_docs(db, collection):
+    return len(list(db.collection(collection).stream()))
+
+
+def counters():
+    db, result_store, grader = find(MemoryFirestore), find(ResultStore), find(FakeGrader)
+    return {
+        "grader_calls": grader.calls if grader else 0,
+        "results": count_docs(db, RESULTS_COLLECTION),
+        "jobs": count_docs(db, JOBS_COLLECTION),
+        "wal_saved": result_store.stats["saved"] if result_store else 0,
+        "completed": aggregates.read_stats(db)["completed"],
+    }
+
+
+def test_reruns_after_submit_grade_and_store_once():
+    at = new_session()
+    at.run()
+    login(at, uuid.uuid4().hex[:6])
+    start_exam(at)
+    for radio in at.radio:
+        radio.set_value(0)
+    # 같은 답안은 채점 캐시에서 꺼내므로 모델 호출 수를 세려면 답안이 매번 달라야 함
+    at.text_area(key='writing_area').set_value(
+        f"그래프를 보면 대학생의 독서 시간이 해마다 줄어들고 있다. ({uuid.uuid4().hex})")
+    assert wait_for_background()
+    before = counters()
+
+    submit(at)
+    for _ in range(RERUNS):
+        at.run()
+    assert wait_for_background()
+
+    after = counters()
+    assert not at.exception
+    assert {key: after[key] - before[key] for key in after} == {
+        "grader_calls": 1, "results": 1, "jobs": 1, "wal_saved": 1, "completed": 1}
@@ -0,0 +1,40 @@
+"""DB 쓰기가 실패해도 제출한 결과는 WAL에 남고, DB가 돌아오면 결과와 채점이 기록되는지 확인"""
+import uuid
+
+from grading_queue import JOBS_COLLECTION, RESULTS_COLLECTION
+from memory_store import MemoryDocument, MemoryFirestore
+from result_store import ResultStore
+
+from tests.apptest_helpers import find, login, new_session, start_exam, submit, wait_for_background
+
+
+def fail_writes(*args, **kwargs):
+    raise RuntimeError("DB 쓰기 실패 (테스트)")
+
+
+def test_submit_reaches_wal_when_db_writes_fail(monkeypatch):
+    at = new_session()
+    at.run()
+    login(at, uuid.uuid4().hex[:6])
+    start_exam(at)
+    at.text_area(key='writing_area').set_value(f"DB 장애 중에 제출한 답안입니다. ({uuid.uuid4().hex})")
+    at.run()
+    assert wait_for_background()
+
+    monkeypatch.setattr(MemoryDocument, 'set', fail_writes)
+    monkeypatch.setattr(MemoryDocument, 'update', fail_writes)
+    submit(at)
+
+    assert not at.exception
+    result_id = at.session_state.result["result_id"]
+    result_store = find(ResultStore)
+    with open(result_store._wal_path, encoding='utf-8') as f:
+        assert result_id in f.read()
+    assert result_store.pending()
+
+    monkeypatch.undo()  # DB 복구: flusher 재시도로 결과와 채점 작업이 기록되고 채점이 끝남
+    assert wait_for_background()
+    db = find(MemoryFirestore)
+    result = db.collection(RESULTS_COLLECTION).document(result_id).get().to_dict()
+    assert result["writing_status"] == "done"
+    assert db.collection(JOBS_COLLECTION).document(result_id).get().to_dict()["status"] == "done"